@@ -0,0 +1,42 @@
+"""Add numbers_mask bitmask column to tickets
+
+Revision ID: d4e5f6g7h8i9
+Revises: c3d4e5f6g7h8
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6g7h8i9'
+down_revision: Union[str, Sequence[str], None] = 'c3d4e5f6g7h8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Number n sets bit n-1; 6-of-45 fits into BIGINT
+    op.add_column('tickets', sa.Column('numbers_mask', sa.BigInteger(), nullable=True))
+    
+    # Backfill from numbers array
+    op.execute("""
+        UPDATE tickets
+        SET numbers_mask = (
+            SELECT bit_or(CAST(1 AS BIGINT) << (n - 1))
+            FROM unnest(numbers) AS n
+        )
+        WHERE numbers IS NOT NULL AND cardinality(numbers) > 0
+    """)
+    
+    op.create_index('ix_tickets_draw_id_numbers_mask', 'tickets', ['draw_id', 'numbers_mask'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_draw_id_numbers_mask', table_name='tickets')
+    op.drop_column('tickets', 'numbers_mask')
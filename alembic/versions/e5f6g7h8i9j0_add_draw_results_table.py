@@ -0,0 +1,43 @@
+"""Add draw_results table and draws.results_at
+
+Revision ID: e5f6g7h8i9j0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6g7h8i9j0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6g7h8i9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per-user results, written once per draw after settlement
+    op.create_table('draw_results',
+        sa.Column('draw_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('ticket_count', sa.Integer(), nullable=False),
+        sa.Column('winning_count', sa.Integer(), nullable=False),
+        sa.Column('best_match', sa.Integer(), nullable=False),
+        sa.Column('total_prize', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('draw_id', 'user_id')
+    )
+    
+    op.add_column('draws', sa.Column('results_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('draws', 'results_at')
+    op.drop_table('draw_results')
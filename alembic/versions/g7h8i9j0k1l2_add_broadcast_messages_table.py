@@ -0,0 +1,50 @@
+"""Add broadcast_messages table
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'g7h8i9j0k1l2'
+down_revision: Union[str, Sequence[str], None] = 'f6g7h8i9j0k1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Persistent queue of outgoing broadcast messages
+    op.create_table('broadcast_messages',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('broadcast', sa.String(length=100), nullable=False),
+        sa.Column('telegram_id', sa.BigInteger(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    
+    # One message per recipient and broadcast
+    op.create_index('ux_broadcast_messages_broadcast_telegram_id', 'broadcast_messages', ['broadcast', 'telegram_id'], unique=True)
+    
+    # Senders claim unfinished messages in queue order
+    op.create_index('ix_broadcast_messages_status_id', 'broadcast_messages', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_broadcast_messages_status_id', table_name='broadcast_messages')
+    op.drop_index('ux_broadcast_messages_broadcast_telegram_id', table_name='broadcast_messages')
+    op.drop_table('broadcast_messages')
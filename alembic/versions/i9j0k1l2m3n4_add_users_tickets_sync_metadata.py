@@ -0,0 +1,31 @@
+"""Add users.tickets_synced_at and users.tickets_payload_hash
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i9j0k1l2m3n4'
+down_revision: Union[str, Sequence[str], None] = 'h8i9j0k1l2m3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Last API sync of user's tickets view and hash of the payload it applied
+    op.add_column('users', sa.Column('tickets_synced_at', sa.DateTime(), nullable=True))
+    op.add_column('users', sa.Column('tickets_payload_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'tickets_payload_hash')
+    op.drop_column('users', 'tickets_synced_at')
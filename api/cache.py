@@ -0,0 +1,160 @@
+"""In-memory response cache for external API reads."""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with freshness deadlines."""
+    value: Any
+    fresh_until: float
+    stale_until: float
+    tags: Set[str] = field(default_factory=set)
+    
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+    
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with TTL and a stale-while-revalidate window.
+    
+    An entry is fresh for `ttl` seconds, then may still be served as stale
+    for `stale_ttl` more seconds while the caller refreshes it. Entries can
+    carry tags (e.g. "customer:42") to invalidate related keys together.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._tag_index: Dict[str, Set[Hashable]] = {}
+        # Last invalidation time per tag/key; writes fetched before it are dropped
+        self._invalidated_at: Dict[Hashable, float] = {}
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+    
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Look up usable entry and record hit/miss.
+        
+        Returns:
+            CacheEntry (check is_fresh() to decide on refresh) or None on miss
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        
+        if entry is None or not entry.is_usable(now):
+            if entry is not None:
+                self._remove(key)
+            self.stats["misses"] += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        if entry.is_fresh(now):
+            self.stats["hits"] += 1
+        else:
+            self.stats["stale_hits"] += 1
+        return entry
+    
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        stale_ttl: float = 0,
+        tags: Iterable[str] = (),
+        fetched_at: Optional[float] = None
+    ) -> None:
+        """
+        Store value for key.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds the value may be served stale
+            tags: Invalidation tags for the entry
+            fetched_at: time.monotonic() taken before fetching the value;
+                the write is skipped if the key or one of its tags was
+                invalidated while the fetch was in flight
+        """
+        tags = set(tags)
+        if fetched_at is not None and any(
+            self._invalidated_at.get(marker, 0) >= fetched_at
+            for marker in (key, *tags)
+        ):
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        
+        now = time.monotonic()
+        entry = CacheEntry(
+            value=value,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            tags=tags
+        )
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+        
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Remove single key."""
+        self._mark_invalidated(key)
+        if key in self._entries:
+            self._remove(key)
+            self.stats["invalidations"] += 1
+    
+    def invalidate_tag(self, tag: str) -> None:
+        """Remove all entries carrying tag."""
+        self._mark_invalidated(tag)
+        keys = list(self._tag_index.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        self.stats["invalidations"] += len(keys)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self._tag_index.clear()
+    
+    def _mark_invalidated(self, marker: Hashable) -> None:
+        """Remember invalidation time so in-flight fetches do not re-cache old data."""
+        now = time.monotonic()
+        self._invalidated_at[marker] = now
+        
+        # Markers only matter for fetches still in flight; drop old ones
+        if len(self._invalidated_at) > self.max_entries:
+            cutoff = now - 300
+            self._invalidated_at = {
+                m: ts for m, ts in self._invalidated_at.items() if ts >= cutoff
+            }
+    
+    def _remove(self, key: Hashable) -> None:
+        """Remove entry and its tag index references."""
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
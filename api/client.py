@@ -1,8 +1,16 @@
 """API client for external lottery system."""
 import aiohttp
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import re
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable, Set, Tuple
 from config import settings
+from api.cache import TTLCache
+from api.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, RETRYABLE_STATUSES, parse_retry_after
+)
+from api.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +44,315 @@ class LotteryAPIClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        
+        # Shared HTTP session, opened lazily on first request (see start/close)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pool_counters = {
+            "connections_created": 0,
+            "connections_reused": 0,
+            "waits": 0,
+            "waiting": 0,
+        }
+        
+        # Identical concurrent reads share one upstream request
+        self._single_flight = SingleFlight()
+        
+        # Short-lived cache for customer/draw reads, see _cached_read
+        self._cache = TTLCache(max_entries=settings.api_cache_max_entries)
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        
+        # Retry policy for idempotent GETs and per-endpoint circuit breakers
+        self._retry_policy = RetryPolicy(
+            max_attempts=settings.api_retry_attempts,
+            base_delay=settings.api_retry_base_delay,
+            max_delay=settings.api_retry_max_delay,
+            max_retry_after=settings.api_retry_after_max
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._retry_counters = {
+            "retries": 0,
+            "retry_after_honored": 0,
+            "exhausted": 0,
+            "short_circuited": 0,
+        }
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create pooled HTTP session with keep-alive and DNS caching."""
+        connector = aiohttp.TCPConnector(
+            limit=settings.api_pool_limit,
+            limit_per_host=settings.api_pool_limit_per_host,
+            keepalive_timeout=settings.api_keepalive_timeout,
+            ttl_dns_cache=settings.api_dns_cache_ttl
+        )
+        
+        # Trace connection pool events for pool_stats()
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        trace_config.on_connection_queued_start.append(self._on_connection_queued)
+        trace_config.on_connection_queued_end.append(self._on_connection_dequeued)
+        
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.api_request_timeout),
+            trace_configs=[trace_config]
+        )
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get shared HTTP session, creating it if not opened yet."""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+    
+    async def start(self) -> None:
+        """Open shared HTTP session. Safe to call multiple times."""
+        self._get_session()
+        logger.info(
+            f"API client session opened (limit={settings.api_pool_limit}, "
+            f"limit_per_host={settings.api_pool_limit_per_host})"
+        )
+    
+    async def close(self) -> None:
+        """Close shared HTTP session and all pooled connections."""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("API client session closed")
+        self._session = None
+    
+    async def _on_connection_created(self, session, context, params) -> None:
+        self._pool_counters["connections_created"] += 1
+    
+    async def _on_connection_reused(self, session, context, params) -> None:
+        self._pool_counters["connections_reused"] += 1
+    
+    async def _on_connection_queued(self, session, context, params) -> None:
+        self._pool_counters["waits"] += 1
+        self._pool_counters["waiting"] += 1
+    
+    async def _on_connection_dequeued(self, session, context, params) -> None:
+        self._pool_counters["waiting"] -= 1
+    
+    def pool_stats(self) -> Dict[str, int]:
+        """
+        Get connection pool statistics.
+        
+        Returns:
+            Dict with 'in_use', 'idle', 'limit', 'limit_per_host', 'waiting'
+            (requests currently queued for a free connection), 'waits'
+            (total requests that had to queue), 'connections_created'
+            and 'connections_reused'.
+        """
+        in_use = 0
+        idle = 0
+        if self._session is not None and not self._session.closed:
+            connector = self._session.connector
+            # aiohttp exposes no public API for pool occupancy
+            in_use = len(getattr(connector, "_acquired", ()))
+            idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        
+        return {
+            "in_use": in_use,
+            "idle": idle,
+            "limit": settings.api_pool_limit,
+            "limit_per_host": settings.api_pool_limit_per_host,
+            **self._pool_counters
+        }
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        """
+        Get request coalescing statistics.
+        
+        Returns:
+            Dict with 'calls', 'executed' (went upstream), 'collapsed'
+            (served by an identical in-flight request) and 'in_flight'.
+        """
+        return {**self._single_flight.stats, "in_flight": self._single_flight.in_flight}
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get response cache statistics.
+        
+        Returns:
+            Dict with 'hits', 'stale_hits', 'misses', 'evictions',
+            'invalidations', 'entries' and 'refreshing'.
+        """
+        return {
+            **self._cache.stats,
+            "entries": len(self._cache),
+            "refreshing": len(self._refresh_tasks)
+        }
+    
+    def invalidate_customer(self, customer_id: int) -> None:
+        """Drop cached customer data and tickets after a write for this customer."""
+        self._cache.invalidate_tag(f"customer:{customer_id}")
+    
+    def invalidate_current_draw(self) -> None:
+        """Drop cached current draw (e.g. once its results are known)."""
+        self._cache.invalidate(("get_current_draw",))
+    
+    async def _cached_read(
+        self,
+        key: tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        tags: Callable[[Any], Iterable[str]] = lambda value: ()
+    ) -> Any:
+        """
+        Serve read from cache with stale-while-revalidate.
+        
+        Fresh entries are returned as is. Stale entries are returned immediately
+        while a background refresh runs. Misses are fetched through single-flight,
+        so concurrent misses for the same key make one upstream call.
+        
+        Args:
+            key: Cache and coalescing key
+            fetch: Coroutine function performing the upstream call
+            ttl: Seconds the result stays fresh
+            tags: Function returning invalidation tags for a result
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            if not entry.is_fresh(time.monotonic()):
+                self._schedule_refresh(key, fetch, ttl, tags)
+            return entry.value
+        
+        return await self._single_flight.do(
+            key, lambda: self._fetch_and_store(key, fetch, ttl, tags)
+        )
+    
+    async def _fetch_and_store(self, key: tuple, fetch, ttl: float, tags) -> Any:
+        """Fetch value and store it in cache. Failed reads (None) are not cached."""
+        fetched_at = time.monotonic()
+        value = await fetch()
+        if value is not None:
+            self._cache.set(
+                key,
+                value,
+                ttl=ttl,
+                stale_ttl=settings.api_cache_stale_ttl,
+                tags=tags(value),
+                fetched_at=fetched_at
+            )
+        return value
+    
+    def _schedule_refresh(self, key: tuple, fetch, ttl: float, tags) -> None:
+        """Refresh stale entry in background (deduplicated by single-flight)."""
+        task = asyncio.create_task(self._single_flight.do(
+            key, lambda: self._fetch_and_store(key, fetch, ttl, tags)
+        ))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._on_refresh_done)
+    
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+    
+    def resilience_stats(self) -> Dict[str, Any]:
+        """
+        Get retry and circuit breaker statistics.
+        
+        Returns:
+            Dict with retry counters and 'breakers' mapping endpoint name
+            to its state ('closed', 'open', 'half_open') and counters.
+        """
+        return {
+            **self._retry_counters,
+            "breakers": {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+        }
+    
+    def _get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get circuit breaker for endpoint, creating it on first use."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=settings.api_breaker_failure_threshold,
+                reset_timeout=settings.api_breaker_reset_timeout
+            )
+            self._breakers[endpoint] = breaker
+        return breaker
+    
+    async def _get(self, endpoint: str, url: str, params: dict = None) -> Tuple[int, Any]:
+        """
+        Idempotent GET with retries and circuit breaker.
+        
+        Connection errors, timeouts and 429/5xx responses are retried with
+        decorrelated jitter backoff, honoring Retry-After. While the endpoint's
+        circuit is open, calls fail fast without touching the network.
+        
+        Args:
+            endpoint: Endpoint name for the circuit breaker (e.g. "customers")
+            url: Request URL
+            params: Query parameters
+        
+        Returns:
+            Tuple of (status, data): parsed JSON for 200, response text otherwise.
+            After exhausted retries the last retryable response is returned.
+        
+        Raises:
+            aiohttp.ClientError: Connection failure after all retries,
+                or CircuitOpenError if the circuit is open
+        """
+        session = self._get_session()
+        breaker = self._get_breaker(endpoint)
+        policy = self._retry_policy
+        delay = policy.base_delay
+        
+        for attempt in range(1, policy.max_attempts + 1):
+            if not breaker.allow_request():
+                self._retry_counters["short_circuited"] += 1
+                raise CircuitOpenError(f"Circuit open for endpoint '{endpoint}'")
+            
+            retry_after = None
+            try:
+                async with session.get(url, headers=self.headers, params=params) as response:
+                    status = response.status
+                    if status == 200:
+                        data = await response.json()
+                    else:
+                        data = await response.text()
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                if attempt == policy.max_attempts:
+                    self._retry_counters["exhausted"] += 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise aiohttp.ServerTimeoutError(f"Timeout requesting {url}") from e
+                    raise
+                logger.warning(f"API {endpoint} attempt {attempt} failed: {e!r}")
+            except Exception:
+                # Unexpected error (e.g. invalid JSON body): a failure, not retried
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled: no verdict on the endpoint, but a half-open probe slot must be freed
+                breaker.release()
+                raise
+            else:
+                if status not in RETRYABLE_STATUSES:
+                    breaker.record_success()
+                    return status, data
+                
+                breaker.record_failure()
+                if attempt == policy.max_attempts:
+                    self._retry_counters["exhausted"] += 1
+                    return status, data
+                logger.warning(f"API {endpoint} attempt {attempt} returned {status}")
+            
+            delay = policy.next_delay(delay)
+            if retry_after is not None:
+                if retry_after > policy.max_retry_after:
+                    # Upstream asks to back off longer than a user can wait
+                    self._retry_counters["exhausted"] += 1
+                    return status, data
+                self._retry_counters["retry_after_honored"] += 1
+                delay = max(delay, retry_after)
+            
+            self._retry_counters["retries"] += 1
+            await asyncio.sleep(delay)
     
     async def get_ticket_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
         """
@@ -52,27 +369,21 @@ class LotteryAPIClient:
             return MOCK_TICKETS[normalized]
         
         # Real API call (currently returns None)
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    f"{self.base_url}/tickets/{phone}/current",
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 404:
-                        return None
-                    
-                    if response.status == 200:
-                        return await response.json()
-                    
-                    # Log error for other status codes
-                    text = await response.text()
-                    print(f"API error: {response.status}, {text}")
-                    return None
-                    
-            except aiohttp.ClientError as e:
-                print(f"API connection error: {e}")
+        try:
+            status, data = await self._get("tickets/current", f"{self.base_url}/tickets/{phone}/current")
+            if status == 404:
                 return None
+            
+            if status == 200:
+                return data
+            
+            # Log error for other status codes
+            print(f"API error: {status}, {data}")
+            return None
+        
+        except aiohttp.ClientError as e:
+            print(f"API connection error: {e}")
+            return None
     
     async def get_current_draw(self) -> Optional[Dict[str, Any]]:
         # Mock data for testing (remove in production)
@@ -86,20 +397,15 @@ class LotteryAPIClient:
             Draw data dict with 'draw_id', 'winning_numbers', 'status', etc.
             None if no current draw or API error.
         """
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    f"{self.base_url}/draws/current",
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
-                    
-            except aiohttp.ClientError as e:
-                print(f"API connection error: {e}")
-                return None
+        try:
+            status, data = await self._get("draws/current", f"{self.base_url}/draws/current")
+            if status == 200:
+                return data
+            return None
+        
+        except aiohttp.ClientError as e:
+            print(f"API connection error: {e}")
+            return None
     
     async def get_customer_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
         """
@@ -114,57 +420,56 @@ class LotteryAPIClient:
             None if customer not found or API error.
         """
         # Normalize phone to digits only
-        import re
         normalized_phone = re.sub(r'\D', '', phone)
-        
+        return await self._cached_read(
+            ("get_customer_by_phone", normalized_phone),
+            lambda: self._fetch_customer_by_phone(phone, normalized_phone),
+            ttl=settings.api_cache_customer_ttl,
+            tags=lambda customer: [f"customer:{customer.get('id')}"]
+        )
+    
+    async def _fetch_customer_by_phone(self, phone: str, normalized_phone: str) -> Optional[Dict[str, Any]]:
+        """Request customer by phone from API (uncoalesced)."""
         logger.info(f"Requesting customer data for phone: {phone} (normalized: {normalized_phone})")
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/customers"
-                params = {"phone": f"+{normalized_phone}"}  # API expects phone with +
-                logger.debug(f"API Request: GET {url} with params={params}")
+        try:
+            url = f"{self.base_url}/customers"
+            params = {"phone": f"+{normalized_phone}"}  # API expects phone with +
+            logger.debug(f"API Request: GET {url} with params={params}")
+            
+            status, data = await self._get("customers", url, params=params)
+            logger.debug(f"API Response status: {status}")
+            
+            if status == 200:
+                logger.debug(f"API Response data: {data}")
                 
-                async with session.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    logger.debug(f"API Response status: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.debug(f"API Response data: {data}")
-                        
-                        # Check for single customer response
-                        if data.get("success") and data.get("customer"):
-                            customer = data["customer"]
-                            logger.info(f"Customer found: {customer.get('name', 'N/A')} (ID: {customer.get('id')})")
-                            return customer
-                        
-                        # Check for list response with pagination
-                        if data.get("success") and data.get("data"):
-                            customers = data["data"]
-                            if customers and len(customers) > 0:
-                                customer = customers[0]
-                                logger.info(f"Customer found: {customer.get('name', 'N/A')} (ID: {customer.get('id')})")
-                                return customer
-                        
-                        logger.warning(f"No customer data in response for phone: {normalized_phone}")
-                        return None
-                    
-                    if response.status == 404:
-                        logger.info(f"Customer not found for phone: {phone}")
-                        return None
-                    
-                    # Log error for other status codes
-                    text = await response.text()
-                    logger.error(f"API error getting customer: {response.status}, {text}")
-                    return None
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"API connection error getting customer: {e}")
+                # Check for single customer response
+                if data.get("success") and data.get("customer"):
+                    customer = data["customer"]
+                    logger.info(f"Customer found: {customer.get('name', 'N/A')} (ID: {customer.get('id')})")
+                    return customer
+                
+                # Check for list response with pagination
+                if data.get("success") and data.get("data"):
+                    customers = data["data"]
+                    if customers and len(customers) > 0:
+                        customer = customers[0]
+                        logger.info(f"Customer found: {customer.get('name', 'N/A')} (ID: {customer.get('id')})")
+                        return customer
+                
+                logger.warning(f"No customer data in response for phone: {normalized_phone}")
+                return None
+            
+            if status == 404:
+                logger.info(f"Customer not found for phone: {phone}")
                 return None
+            
+            # Log error for other status codes
+            logger.error(f"API error getting customer: {status}, {data}")
+            return None
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"API connection error getting customer: {e}")
+            return None
     
     async def get_current_draw(self) -> Optional[Dict[str, Any]]:
         """
@@ -174,42 +479,43 @@ class LotteryAPIClient:
             Draw data dict with 'id', 'name', 'status', 'winning_numbers', etc.
             None if no current draw or API error.
         """
+        return await self._cached_read(
+            ("get_current_draw",),
+            self._fetch_current_draw,
+            ttl=settings.api_cache_draw_ttl
+        )
+    
+    async def _fetch_current_draw(self) -> Optional[Dict[str, Any]]:
+        """Request current draw from API (uncoalesced)."""
         logger.info("Requesting current draw data")
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/draws/current"
-                logger.debug(f"API Request: GET {url}")
+        try:
+            url = f"{self.base_url}/draws/current"
+            logger.debug(f"API Request: GET {url}")
+            
+            status, data = await self._get("draws/current", url)
+            logger.debug(f"API Response status: {status}")
+            
+            if status == 200:
+                logger.debug(f"API Response data: {data}")
                 
-                async with session.get(
-                    url,
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    logger.debug(f"API Response status: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.debug(f"API Response data: {data}")
-                        
-                        if data.get("success") and data.get("draw"):
-                            draw = data["draw"]
-                            logger.info(f"Current draw found: {draw.get('name', 'N/A')} (ID: {draw.get('id')})")
-                            return draw
-                        logger.warning("No current draw data in response")
-                        return None
-                    
-                    if response.status == 404:
-                        logger.info("No current draw found")
-                        return None
-                    
-                    # Log error for other status codes
-                    text = await response.text()
-                    logger.error(f"API error getting current draw: {response.status}, {text}")
-                    return None
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"API connection error getting current draw: {e}")
+                if data.get("success") and data.get("draw"):
+                    draw = data["draw"]
+                    logger.info(f"Current draw found: {draw.get('name', 'N/A')} (ID: {draw.get('id')})")
+                    return draw
+                logger.warning("No current draw data in response")
+                return None
+            
+            if status == 404:
+                logger.info("No current draw found")
                 return None
+            
+            # Log error for other status codes
+            logger.error(f"API error getting current draw: {status}, {data}")
+            return None
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"API connection error getting current draw: {e}")
+            return None
     
     async def get_draw_by_id(self, draw_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -221,38 +527,38 @@ class LotteryAPIClient:
         Returns:
             Draw data dict or None if not found or API error.
         """
+        return await self._single_flight.do(
+            ("get_draw_by_id", draw_id),
+            lambda: self._fetch_draw_by_id(draw_id)
+        )
+    
+    async def _fetch_draw_by_id(self, draw_id: int) -> Optional[Dict[str, Any]]:
+        """Request draw by ID from API (uncoalesced)."""
         logger.info(f"Requesting draw data for ID: {draw_id}")
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/draws/{draw_id}"
-                logger.debug(f"API Request: GET {url}")
-                
-                async with session.get(
-                    url,
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    logger.debug(f"API Response status: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("success") and data.get("draw"):
-                            draw = data["draw"]
-                            logger.info(f"Draw found: {draw.get('name', 'N/A')} (ID: {draw.get('id')})")
-                            return draw
-                        return None
-                    
-                    if response.status == 404:
-                        logger.info(f"Draw {draw_id} not found")
-                        return None
-                    
-                    text = await response.text()
-                    logger.error(f"API error getting draw {draw_id}: {response.status}, {text}")
-                    return None
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"API connection error getting draw {draw_id}: {e}")
+        try:
+            url = f"{self.base_url}/draws/{draw_id}"
+            logger.debug(f"API Request: GET {url}")
+            
+            status, data = await self._get("draws/{id}", url)
+            logger.debug(f"API Response status: {status}")
+            
+            if status == 200:
+                if data.get("success") and data.get("draw"):
+                    draw = data["draw"]
+                    logger.info(f"Draw found: {draw.get('name', 'N/A')} (ID: {draw.get('id')})")
+                    return draw
                 return None
+            
+            if status == 404:
+                logger.info(f"Draw {draw_id} not found")
+                return None
+            
+            logger.error(f"API error getting draw {draw_id}: {status}, {data}")
+            return None
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"API connection error getting draw {draw_id}: {e}")
+            return None
     
     async def get_customer_tickets(self, customer_id: int, draw_id: int = None) -> Optional[list]:
         """
@@ -265,47 +571,48 @@ class LotteryAPIClient:
         Returns:
             List of ticket dicts or None if error.
         """
+        return await self._cached_read(
+            ("get_customer_tickets", customer_id, draw_id),
+            lambda: self._fetch_customer_tickets(customer_id, draw_id),
+            ttl=settings.api_cache_tickets_ttl,
+            tags=lambda tickets: [f"customer:{customer_id}"]
+        )
+    
+    async def _fetch_customer_tickets(self, customer_id: int, draw_id: int = None) -> Optional[list]:
+        """Request customer's tickets from API (uncoalesced)."""
         logger.info(f"Requesting tickets for customer {customer_id}")
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/customers/{customer_id}/tickets"
-                params = {}
-                if draw_id:
-                    params["draw_id"] = str(draw_id)
-                
-                logger.debug(f"API Request: GET {url} with params={params}")
+        try:
+            url = f"{self.base_url}/customers/{customer_id}/tickets"
+            params = {}
+            if draw_id:
+                params["draw_id"] = str(draw_id)
+            
+            logger.debug(f"API Request: GET {url} with params={params}")
+            
+            status, data = await self._get("customers/tickets", url, params=params)
+            logger.debug(f"API Response status: {status}")
+            
+            if status == 200:
+                logger.debug(f"API Response data: {data}")
                 
-                async with session.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    logger.debug(f"API Response status: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.debug(f"API Response data: {data}")
-                        
-                        if data.get("success") and data.get("data"):
-                            tickets = data["data"]
-                            logger.info(f"Found {len(tickets)} tickets for customer {customer_id}")
-                            return tickets
-                        logger.warning(f"No tickets data in response for customer {customer_id}")
-                        return []
-                    
-                    if response.status == 404:
-                        logger.info(f"No tickets found for customer {customer_id}")
-                        return []
-                    
-                    # Log error for other status codes
-                    text = await response.text()
-                    logger.error(f"API error getting tickets: {response.status}, {text}")
-                    return None
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"API connection error getting tickets: {e}")
-                return None
+                if data.get("success") and data.get("data"):
+                    tickets = data["data"]
+                    logger.info(f"Found {len(tickets)} tickets for customer {customer_id}")
+                    return tickets
+                logger.warning(f"No tickets data in response for customer {customer_id}")
+                return []
+            
+            if status == 404:
+                logger.info(f"No tickets found for customer {customer_id}")
+                return []
+            
+            # Log error for other status codes
+            logger.error(f"API error getting tickets: {status}, {data}")
+            return None
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"API connection error getting tickets: {e}")
+            return None
     
     async def create_ticket(self, customer_id: int, draw_id: int, numbers: list = None) -> Optional[dict]:
         """
@@ -320,51 +627,52 @@ class LotteryAPIClient:
             Created ticket data or None if error
         """
         logger.info(f"Creating ticket for customer {customer_id} in draw {draw_id}")
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/customers/{customer_id}/tickets"
-                payload = {"draw_id": draw_id}
-                if numbers:
-                    payload["numbers"] = numbers
+        session = self._get_session()
+        try:
+            url = f"{self.base_url}/customers/{customer_id}/tickets"
+            payload = {"draw_id": draw_id}
+            if numbers:
+                payload["numbers"] = numbers
+            
+            logger.debug(f"API Request: POST {url} with payload={payload}")
+            
+            async with session.post(
+                url,
+                headers=self.headers,
+                json=payload
+            ) as response:
+                logger.debug(f"API Response status: {response.status}")
                 
-                logger.debug(f"API Request: POST {url} with payload={payload}")
-                
-                async with session.post(
-                    url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    logger.debug(f"API Response status: {response.status}")
-                    
-                    if response.status in [200, 201]:
-                        data = await response.json()
-                        logger.debug(f"API Response data: {data}")
-                        
-                        if data.get("success") and data.get("ticket"):
-                            ticket = data["ticket"]
-                            logger.info(f"Ticket created successfully: ID {ticket.get('id')}")
-                            return ticket
-                        logger.warning(f"No ticket data in response")
-                        return None
+                if response.status in [200, 201]:
+                    # Customer's tickets changed upstream, drop cached reads
+                    self.invalidate_customer(customer_id)
+                    data = await response.json()
+                    logger.debug(f"API Response data: {data}")
                     
-                    if response.status == 403:
-                        logger.warning(f"Forbidden: Cannot create ticket for customer {customer_id}")
-                        return None
-                    
-                    if response.status == 409:
-                        text = await response.text()
-                        logger.warning(f"Conflict: {text}")
-                        return None
-                    
-                    # Log error for other status codes
+                    if data.get("success") and data.get("ticket"):
+                        ticket = data["ticket"]
+                        logger.info(f"Ticket created successfully: ID {ticket.get('id')}")
+                        return ticket
+                    logger.warning(f"No ticket data in response")
+                    return None
+                
+                if response.status == 403:
+                    logger.warning(f"Forbidden: Cannot create ticket for customer {customer_id}")
+                    return None
+                
+                if response.status == 409:
                     text = await response.text()
-                    logger.error(f"API error creating ticket: {response.status}, {text}")
+                    logger.warning(f"Conflict: {text}")
                     return None
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"API connection error creating ticket: {e}")
+                
+                # Log error for other status codes
+                text = await response.text()
+                logger.error(f"API error creating ticket: {response.status}, {text}")
                 return None
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"API connection error creating ticket: {e}")
+            return None
     
     async def fill_ticket(self, customer_id: int, draw_id: int, numbers: list) -> Optional[dict]:
         """
@@ -379,60 +687,76 @@ class LotteryAPIClient:
         Returns:
             First filled ticket data or None if error
         """
-        logger.info(f"Filling ticket for customer {customer_id} in draw {draw_id} with numbers {numbers}")
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/customers/{customer_id}/tickets/fill"
-                payload = {
-                    "draw_id": draw_id,
-                    "tickets": [numbers]  # Array of number arrays
-                }
-                
-                logger.debug(f"API Request: POST {url} with payload={payload}")
+        tickets = await self.fill_tickets(customer_id, draw_id, [numbers])
+        if not tickets:
+            return None
+        return tickets[0]  # Return first filled ticket
+    
+    async def fill_tickets(self, customer_id: int, draw_id: int, numbers_list: List[list]) -> Optional[list]:
+        """
+        Fill several available tickets in one API request.
+        API fills the customer's first unfilled tickets in order.
+        
+        Args:
+            customer_id: Customer ID
+            draw_id: Draw ID
+            numbers_list: List of number sets, each a list of 6 numbers (1-45)
+        
+        Returns:
+            List of filled ticket data or None if error
+        """
+        logger.info(f"Filling {len(numbers_list)} tickets for customer {customer_id} in draw {draw_id}")
+        session = self._get_session()
+        try:
+            url = f"{self.base_url}/customers/{customer_id}/tickets/fill"
+            payload = {
+                "draw_id": draw_id,
+                "tickets": numbers_list  # Array of number arrays
+            }
+            
+            logger.debug(f"API Request: POST {url} with payload={payload}")
+            
+            async with session.post(
+                url,
+                headers=self.headers,
+                json=payload
+            ) as response:
+                logger.debug(f"API Response status: {response.status}")
                 
-                async with session.post(
-                    url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    logger.debug(f"API Response status: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.debug(f"API Response data: {data}")
-                        
-                        if data.get("success") and data.get("tickets"):
-                            tickets = data["tickets"]
-                            if tickets and len(tickets) > 0:
-                                ticket = tickets[0]  # Return first filled ticket
-                                logger.info(f"Ticket filled successfully: ID {ticket.get('id')}")
-                                return ticket
-                        logger.warning(f"No tickets data in response")
-                        return None
-                    
-                    if response.status == 403:
-                        logger.warning(f"Forbidden: Cannot fill ticket for customer {customer_id}")
-                        return None
-                    
-                    if response.status == 404:
-                        logger.warning(f"No unfilled tickets found for customer {customer_id}")
-                        return None
-                    
-                    if response.status == 409:
-                        text = await response.text()
-                        logger.warning(f"Conflict: {text}")
-                        return None
+                if response.status == 200:
+                    # Customer's tickets changed upstream, drop cached reads
+                    self.invalidate_customer(customer_id)
+                    data = await response.json()
+                    logger.debug(f"API Response data: {data}")
                     
-                    # Log error for other status codes
+                    if data.get("success") and data.get("tickets"):
+                        tickets = data["tickets"]
+                        logger.info(f"Filled {len(tickets)} tickets for customer {customer_id}")
+                        return tickets
+                    logger.warning(f"No tickets data in response")
+                    return None
+                
+                if response.status == 403:
+                    logger.warning(f"Forbidden: Cannot fill ticket for customer {customer_id}")
+                    return None
+                
+                if response.status == 404:
+                    logger.warning(f"No unfilled tickets found for customer {customer_id}")
+                    return None
+                
+                if response.status == 409:
                     text = await response.text()
-                    logger.error(f"API error filling ticket: {response.status}, {text}")
+                    logger.warning(f"Conflict: {text}")
                     return None
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"API connection error filling ticket: {e}")
+                
+                # Log error for other status codes
+                text = await response.text()
+                logger.error(f"API error filling tickets: {response.status}, {text}")
                 return None
-
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"API connection error filling tickets: {e}")
+            return None
 
 # Singleton instance
 api_client = LotteryAPIClient()
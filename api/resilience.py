@@ -0,0 +1,149 @@
+"""Retry and circuit breaker policies for external API calls."""
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+
+# Statuses worth retrying for idempotent requests
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    
+    closed    -- requests pass; consecutive failures are counted
+    open      -- requests fail fast until reset_timeout has passed
+    half_open -- a limited number of probe requests pass; a success closes
+                 the circuit, a failure opens it again
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.stats = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+    
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent now."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                return False
+            # Reset timeout passed, let probes through
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+        
+        if self.state == self.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.stats["rejected"] += 1
+                return False
+            self.half_open_calls += 1
+        
+        return True
+    
+    def record_success(self) -> None:
+        """Register successful call."""
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+    
+    def release(self) -> None:
+        """Give back the probe slot of a call that ended without a verdict (e.g. cancelled)."""
+        if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+    
+    def record_failure(self) -> None:
+        """Register failed call, opening the circuit if needed."""
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["opened"] += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            **self.stats
+        }
+
+
+class RetryPolicy:
+    """Bounded retries with decorrelated jitter backoff."""
+    
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        max_retry_after: float = 5.0
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+    
+    def next_delay(self, previous_delay: float) -> float:
+        """
+        Decorrelated jitter: random between base and 3x previous delay, capped.
+        
+        Args:
+            previous_delay: Delay used before the previous attempt (base_delay for the first retry)
+        """
+        return min(self.max_delay, random.uniform(self.base_delay, previous_delay * 3))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse Retry-After header (seconds or HTTP date).
+    
+    Returns:
+        Delay in seconds or None if header missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
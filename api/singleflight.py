@@ -0,0 +1,59 @@
+"""Coalescing of identical concurrent API reads."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers with the same key.
+    
+    The first caller for a key starts the call as a task; callers arriving
+    while it is running await the same task instead of starting their own.
+    The key is forgotten once the call finishes, so later calls go upstream again.
+    """
+    
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {
+            "calls": 0,      # Total calls made through do()
+            "executed": 0,   # Calls that actually went upstream
+            "collapsed": 0,  # Calls served by another caller's in-flight request
+        }
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func() once per key for all concurrent callers.
+        
+        Args:
+            key: Hashable call identity (method name and arguments)
+            func: Zero-argument coroutine function performing the call
+        
+        Returns:
+            Result of the shared call (exceptions are shared as well)
+        """
+        self.stats["calls"] += 1
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats["executed"] += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.stats["collapsed"] += 1
+        
+        # Shield so a cancelled caller does not cancel the call for everyone else
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop finished task from in-flight map."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently in flight."""
+        return len(self._in_flight)
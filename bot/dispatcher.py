@@ -0,0 +1,45 @@
+"""Bot and dispatcher setup shared by polling and webhook modes."""
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config import settings
+from bot.fsm_storage import PostgresStorage
+from bot.middleware import DatabaseMiddleware, ThrottlingMiddleware
+from bot.handlers import start, ticket, create_ticket
+
+
+def create_bot() -> Bot:
+    """Create bot with default HTML parse mode."""
+    return Bot(
+        token=settings.telegram_bot_token,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+    )
+
+
+def create_fsm_storage() -> BaseStorage:
+    """FSM storage selected by settings.fsm_storage."""
+    if settings.fsm_storage == "memory":
+        return MemoryStorage()
+    return PostgresStorage()
+
+
+def create_dispatcher() -> Dispatcher:
+    """Create dispatcher with FSM storage, middleware and routers registered."""
+    dp = Dispatcher(storage=create_fsm_storage())
+    
+    # Register middleware (throttling first: dropped updates get no session)
+    throttling = ThrottlingMiddleware()
+    dp["throttling"] = throttling
+    dp.message.middleware(throttling)
+    dp.callback_query.middleware(throttling)
+    dp.message.middleware(DatabaseMiddleware())
+    dp.callback_query.middleware(DatabaseMiddleware())
+    
+    # Register routers
+    dp.include_router(start.router)
+    dp.include_router(create_ticket.router)
+    dp.include_router(ticket.router)
+    return dp
@@ -0,0 +1,264 @@
+"""PostgreSQL-backed aiogram FSM storage shared by all bot processes."""
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_GET_STATEMENT = "SELECT state, data FROM fsm_states WHERE key = $1"
+
+_SET_STATE_STATEMENT = """
+    INSERT INTO fsm_states (key, state, data, updated_at)
+    VALUES ($1, $2, '{}', timezone('utc', now()))
+    ON CONFLICT (key) DO UPDATE SET state = EXCLUDED.state, updated_at = EXCLUDED.updated_at
+    """
+
+_SET_DATA_STATEMENT = """
+    INSERT INTO fsm_states (key, state, data, updated_at)
+    VALUES ($1, NULL, $2, timezone('utc', now()))
+    ON CONFLICT (key) DO UPDATE SET data = EXCLUDED.data, updated_at = EXCLUDED.updated_at
+    """
+
+# Abandoned states and cleared rows (no state, no data)
+_EXPIRE_STATEMENT = """
+    DELETE FROM fsm_states
+    WHERE updated_at < timezone('utc', now()) - make_interval(secs => $1)
+       OR (state IS NULL AND data = '{}')
+    """
+
+# Cache entry fields
+_STATE, _DATA, _EXPIRES = 0, 1, 2
+
+# Marker for data not loaded into the cache entry
+_UNKNOWN = object()
+
+
+def _key_string(key: StorageKey) -> str:
+    """Row key for a storage key."""
+    return (
+        f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:"
+        f"{key.business_connection_id or ''}:{key.destiny}"
+    )
+
+
+class PostgresStorage(BaseStorage):
+    """
+    FSM storage on the fsm_states table.
+    
+    Statements run directly on a few asyncpg connections kept for the
+    storage's lifetime: no pool checkout or transaction per call, every
+    write is a single UPSERT committed on its own (one round trip,
+    asynchronous commit), reads load state and data together. Recently
+    read or written keys are served from a small in-process cache for
+    cache_ttl seconds: one update usually reads the state several times
+    (filters, FSMContext), and a conversation's next update is handled
+    within seconds. With several bot processes a key may be stale for at
+    most cache_ttl; set it to 0 to always read the database.
+    
+    Rows untouched for state_ttl seconds and cleared rows are deleted by a
+    background task started on first use.
+    
+    By default the connections come from an engine of the storage's own, so
+    they are not taken out of the handlers' pool (settings.db_pool_size).
+    An engine passed in must have a larger pool than the storage keeps.
+    """
+    
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine] = None,
+        cache_ttl: Optional[float] = None,
+        cache_max_entries: Optional[int] = None,
+        connections: Optional[int] = None,
+        state_ttl: Optional[int] = None,
+        cleanup_interval: Optional[int] = None
+    ):
+        """
+        Args:
+            engine: Database engine to borrow connections from (default: own engine
+                with a pool of `connections`)
+            cache_ttl: Seconds a cached key is trusted (default settings.fsm_cache_ttl)
+            cache_max_entries: Cached keys limit (default settings.fsm_cache_max_entries)
+            connections: Database connections kept by the storage (default settings.fsm_connections)
+            state_ttl: Seconds before an untouched state expires (default settings.fsm_state_ttl)
+            cleanup_interval: Seconds between expiry runs (default settings.fsm_cleanup_interval)
+        
+        Raises:
+            ValueError: If engine's pool is not larger than connections
+        """
+        connections = connections or settings.fsm_connections
+        self._owns_engine = engine is None
+        if engine is None:
+            engine = create_async_engine(settings.database_url, pool_size=connections, max_overflow=0)
+        else:
+            pool_size = getattr(engine.pool, "size", None)
+            if callable(pool_size) and pool_size() <= connections:
+                raise ValueError(
+                    f"Engine pool ({pool_size()} connections) must be larger than "
+                    f"FSM storage connections ({connections}), or the storage takes all of it"
+                )
+        self._engine = engine
+        self._cache_ttl = settings.fsm_cache_ttl if cache_ttl is None else cache_ttl
+        self._cache_max_entries = cache_max_entries or settings.fsm_cache_max_entries
+        self._state_ttl = state_ttl or settings.fsm_state_ttl
+        self._cleanup_interval = cleanup_interval or settings.fsm_cleanup_interval
+        self._cache: Dict[str, list] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+        
+        # Idle connections, None slots are opened on demand
+        self._connections: asyncio.Queue = asyncio.Queue()
+        for _ in range(connections):
+            self._connections.put_nowait(None)
+        self.stats = {"reads": 0, "cache_hits": 0, "writes": 0, "expired": 0}
+    
+    # Cache
+    
+    def _cached(self, key: str) -> Optional[list]:
+        """Live cache entry for key."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[_EXPIRES] < time.monotonic():
+            del self._cache[key]
+            return None
+        return entry
+    
+    def _remember(self, key: str, state: Any, data: Any) -> None:
+        """Store or refresh cache entry (state/data may be _UNKNOWN)."""
+        if self._cache_ttl <= 0:
+            return
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            state = entry[_STATE] if state is _UNKNOWN else state
+            data = entry[_DATA] if data is _UNKNOWN else data
+        elif len(self._cache) >= self._cache_max_entries:
+            # Dicts keep insertion order: drop the least recently stored key
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = [state, data, time.monotonic() + self._cache_ttl]
+    
+    # Database
+    
+    async def _open(self) -> AsyncConnection:
+        """
+        Check out a connection for the storage.
+        
+        Commits don't wait for the WAL flush: a database crash may lose the
+        last fraction of a second of transitions (users repeat one step),
+        a restart keeps everything.
+        """
+        conn = await self._engine.connect()
+        await (await conn.get_raw_connection()).driver_connection.execute("SET synchronous_commit = off")
+        return conn
+    
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[Any]:
+        """Borrow an asyncpg connection, dropping it on errors."""
+        conn: Optional[AsyncConnection] = await self._connections.get()
+        try:
+            if conn is None:
+                conn = await self._open()
+            raw = await conn.get_raw_connection()
+            yield raw.driver_connection
+        except BaseException:
+            if conn is not None:
+                await conn.invalidate()
+                await conn.close()
+                conn = None
+            raise
+        finally:
+            self._connections.put_nowait(conn)
+    
+    def _ensure_cleanup(self) -> None:
+        """Start background expiry on first use."""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+    
+    async def _cleanup_loop(self) -> None:
+        """Periodically delete expired and cleared states."""
+        while True:
+            try:
+                await self.expire()
+            except Exception as e:
+                logger.error(f"Error expiring FSM states: {e}", exc_info=True)
+            await asyncio.sleep(self._cleanup_interval)
+    
+    async def expire(self) -> int:
+        """Delete states untouched for state_ttl seconds and cleared rows. Returns rows deleted."""
+        async with self._connection() as conn:
+            status = await conn.execute(_EXPIRE_STATEMENT, float(self._state_ttl))
+        deleted = int(status.split()[-1])
+        self.stats["expired"] += deleted
+        if deleted:
+            logger.info(f"Expired {deleted} FSM states")
+        return deleted
+    
+    async def _load(self, key: str) -> list:
+        """Cached entry for key, reading state and data from database on miss."""
+        self._ensure_cleanup()
+        entry = self._cached(key)
+        if entry is not None and entry[_STATE] is not _UNKNOWN and entry[_DATA] is not _UNKNOWN:
+            self.stats["cache_hits"] += 1
+            return entry
+        
+        self.stats["reads"] += 1
+        async with self._connection() as conn:
+            row = await conn.fetchrow(_GET_STATEMENT, key)
+        state, data = (row["state"], json.loads(row["data"])) if row else (None, {})
+        self._remember(key, state, data)
+        return [state, data]
+    
+    async def _write(self, statement: str, *args: Any) -> None:
+        """Run a single-statement write."""
+        self._ensure_cleanup()
+        self.stats["writes"] += 1
+        async with self._connection() as conn:
+            await conn.execute(statement, *args)
+    
+    # BaseStorage
+    
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        """Set state for key."""
+        row_key = _key_string(key)
+        value = state.state if isinstance(state, State) else state
+        await self._write(_SET_STATE_STATEMENT, row_key, value)
+        self._remember(row_key, value, _UNKNOWN)
+    
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        """Get state for key."""
+        return (await self._load(_key_string(key)))[_STATE]
+    
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        """Replace data for key."""
+        row_key = _key_string(key)
+        await self._write(_SET_DATA_STATEMENT, row_key, json.dumps(data))
+        self._remember(row_key, _UNKNOWN, dict(data))
+    
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        """Get a copy of data for key."""
+        return dict((await self._load(_key_string(key)))[_DATA])
+    
+    async def close(self) -> None:
+        """Stop background expiry, return connections to the engine and drop the cache."""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        for _ in range(self._connections.qsize()):
+            conn = self._connections.get_nowait()
+            if conn is not None:
+                if not self._owns_engine:
+                    # Back to the shared pool with default settings
+                    await (await conn.get_raw_connection()).driver_connection.execute("RESET synchronous_commit")
+                await conn.close()
+            self._connections.put_nowait(None)
+        if self._owns_engine:
+            await self._engine.dispose()
+        self._cache.clear()
@@ -9,11 +9,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot import messages, keyboards
 from db.crud import get_user_by_telegram_id
-from services.draw_service import generate_random_numbers, validate_numbers, parse_numbers_from_text
+from services.draw_service import (
+    generate_random_numbers, generate_random_combinations, validate_numbers, parse_numbers_from_text
+)
 from services.user_service import sync_user_data_from_api
 from api.client import api_client
-from db.crud_tickets import sync_user_tickets_from_api
+from db.crud_tickets import normalize_api_numbers, sync_user_tickets_from_api
 from db.crud_draws import get_current_draw
+from db.database import unit_of_work
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -31,7 +34,8 @@ class NumberSelection(StatesGroup):
 async def select_ticket_numbers(message: Message, session: AsyncSession, state: FSMContext):
     """Select numbers for existing ticket."""
     telegram_id = message.from_user.id
-    user = await get_user_by_telegram_id(session, telegram_id)
+    async with unit_of_work(session):
+        user = await get_user_by_telegram_id(session, telegram_id)
     
     if not user:
         await message.answer(
@@ -80,7 +84,7 @@ async def select_ticket_numbers(message: Message, session: AsyncSession, state:
         await message.answer(
             f"🎯 У вас {available_count} доступных ваучеров для заполнения\n\n"
             "Выберите способ заполнения:",
-            reply_markup=keyboards.get_number_selection_keyboard()
+            reply_markup=keyboards.get_number_selection_keyboard(show_fill_all=available_count > 1)
         )
         
     except Exception as e:
@@ -118,8 +122,9 @@ async def auto_generate_numbers(callback: CallbackQuery, session: AsyncSession,
     data = await state.get_data()
     customer_id = data.get("customer_id")
     
-    # Get current draw
-    current_draw = await get_current_draw(session)
+    # Get current draw (connection released before the API call)
+    async with unit_of_work(session):
+        current_draw = await get_current_draw(session)
     if not current_draw:
         await state.clear()
         await callback.message.edit_text(
@@ -144,21 +149,22 @@ async def auto_generate_numbers(callback: CallbackQuery, session: AsyncSession,
         if filled_ticket:
             # Update available_tickets count
             telegram_id = callback.from_user.id
-            user = await get_user_by_telegram_id(session, telegram_id)
-            if user:
-                # Decrease available tickets count
-                if user.available_tickets and user.available_tickets > 0:
-                    user.available_tickets -= 1
-                    session.add(user)
-                    await session.commit()
-                
-                # Sync filled ticket to local database
-                await sync_user_tickets_from_api(
-                    session,
-                    user.id,
-                    customer_id,
-                    [filled_ticket]  # Sync only this filled ticket
-                )
+            async with unit_of_work(session):
+                user = await get_user_by_telegram_id(session, telegram_id)
+                if user:
+                    # Decrease available tickets count, committed together with ticket sync below
+                    if user.available_tickets and user.available_tickets > 0:
+                        user.available_tickets -= 1
+                        session.add(user)
+                    
+                    # Sync filled ticket to local database
+                    await sync_user_tickets_from_api(
+                        session,
+                        user.id,
+                        customer_id,
+                        [filled_ticket],  # Sync only this filled ticket
+                        commit=False
+                    )
             
             await state.clear()
             await callback.message.edit_text(
@@ -205,6 +211,111 @@ async def auto_generate_numbers(callback: CallbackQuery, session: AsyncSession,
         )
 
 
+@router.callback_query(F.data == "auto_fill_all", NumberSelection.choosing_method)
+async def auto_fill_all_tickets(callback: CallbackQuery, session: AsyncSession, state: FSMContext):
+    """Fill all available tickets with random numbers in one API request."""
+    await callback.answer()
+    
+    data = await state.get_data()
+    customer_id = data.get("customer_id")
+    
+    # Get current draw (connection released before the API call)
+    async with unit_of_work(session):
+        current_draw = await get_current_draw(session)
+    if not current_draw:
+        await state.clear()
+        await callback.message.edit_text(
+            "❌ Нет активной акции.",
+            reply_markup=None
+        )
+        await callback.message.answer(
+            "Попробуйте позже.",
+            reply_markup=keyboards.get_main_keyboard()
+        )
+        return
+    
+    draw_id = int(current_draw.external_id)
+    
+    telegram_id = callback.from_user.id
+    async with unit_of_work(session):
+        user = await get_user_by_telegram_id(session, telegram_id)
+    available_count = user.available_tickets if user and user.available_tickets else 0
+    
+    if available_count == 0:
+        await state.clear()
+        await callback.message.edit_text(
+            "❌ У вас не осталось доступных ваучеров для заполнения!",
+            reply_markup=None
+        )
+        await callback.message.answer(
+            "Ваучеры начисляются за участие в маркетинговых акциях Termoland.",
+            reply_markup=keyboards.get_main_keyboard()
+        )
+        return
+    
+    # Generate combinations for all available tickets
+    numbers_list = generate_random_combinations(available_count)
+    
+    # Fill all tickets with a single API request
+    try:
+        filled_tickets = await api_client.fill_tickets(customer_id, draw_id, numbers_list)
+        
+        if filled_tickets:
+            async with unit_of_work(session):
+                # Update available_tickets count, committed together with ticket sync below
+                user.available_tickets = max(0, available_count - len(filled_tickets))
+                session.add(user)
+                
+                # Sync filled tickets to local database in one transaction
+                await sync_user_tickets_from_api(
+                    session,
+                    user.id,
+                    customer_id,
+                    filled_tickets,
+                    commit=False
+                )
+            
+            await state.clear()
+            # Numbers as filled by the API: it may skip tickets or reorder them
+            filled_numbers = [
+                numbers for numbers in (normalize_api_numbers(ticket.get("numbers")) for ticket in filled_tickets)
+                if numbers
+            ]
+            await callback.message.edit_text(
+                messages.ALL_NUMBERS_ASSIGNED_TEMPLATE.format(
+                    count=len(filled_tickets),
+                    numbers="\n".join(f"🎯 {messages.format_numbers(numbers)}" for numbers in filled_numbers)
+                ),
+                reply_markup=None
+            )
+            await callback.message.answer(
+                "✅ Все ваучеры заполнены!",
+                reply_markup=keyboards.get_main_keyboard()
+            )
+        else:
+            await state.clear()
+            await callback.message.edit_text(
+                "❌ Не удалось назначить числа для ваучеров.\n"
+                "Возможно, все ваучеры уже заполнены.",
+                reply_markup=None
+            )
+            await callback.message.answer(
+                "Попробуйте ещё раз или обратитесь в поддержку.",
+                reply_markup=keyboards.get_main_keyboard()
+            )
+    except Exception as e:
+        logger.error(f"Error filling all tickets for customer {customer_id}: {e}", exc_info=True)
+        await state.clear()
+        await callback.message.edit_text(
+            "❌ Произошла ошибка при назначении чисел.",
+            reply_markup=None
+        )
+        await callback.message.answer(
+            "Попробуйте позже.",
+            reply_markup=keyboards.get_main_keyboard()
+        )
+
+
 @router.callback_query(F.data == "manual_numbers", NumberSelection.choosing_method)
 async def enter_manual_numbers(callback: CallbackQuery, state: FSMContext):
     """Start manual number entry."""
@@ -236,8 +347,9 @@ async def process_manual_numbers(message: Message, session: AsyncSession, state:
     # Sort numbers for consistency
     sorted_numbers = sorted(numbers)
     
-    # Get current draw
-    current_draw = await get_current_draw(session)
+    # Get current draw (connection released before the API call)
+    async with unit_of_work(session):
+        current_draw = await get_current_draw(session)
     if not current_draw:
         await state.clear()
         await message.answer(
@@ -259,21 +371,22 @@ async def process_manual_numbers(message: Message, session: AsyncSession, state:
         if filled_ticket:
             # Update available_tickets count
             telegram_id = message.from_user.id
-            user = await get_user_by_telegram_id(session, telegram_id)
-            if user:
-                # Decrease available tickets count
-                if user.available_tickets and user.available_tickets > 0:
-                    user.available_tickets -= 1
-                    session.add(user)
-                    await session.commit()
-                
-                # Sync filled ticket to local database
-                await sync_user_tickets_from_api(
-                    session,
-                    user.id,
-                    customer_id,
-                    [filled_ticket]  # Sync only this filled ticket
-                )
+            async with unit_of_work(session):
+                user = await get_user_by_telegram_id(session, telegram_id)
+                if user:
+                    # Decrease available tickets count, committed together with ticket sync below
+                    if user.available_tickets and user.available_tickets > 0:
+                        user.available_tickets -= 1
+                        session.add(user)
+                    
+                    # Sync filled ticket to local database
+                    await sync_user_tickets_from_api(
+                        session,
+                        user.id,
+                        customer_id,
+                        [filled_ticket],  # Sync only this filled ticket
+                        commit=False
+                    )
             
             await state.clear()
             await message.answer(
@@ -321,7 +434,8 @@ async def fill_another_ticket(callback: CallbackQuery, session: AsyncSession, st
     await callback.answer()
     
     telegram_id = callback.from_user.id
-    user = await get_user_by_telegram_id(session, telegram_id)
+    async with unit_of_work(session):
+        user = await get_user_by_telegram_id(session, telegram_id)
     
     if not user:
         await callback.message.edit_text(
@@ -330,12 +444,10 @@ async def fill_another_ticket(callback: CallbackQuery, session: AsyncSession, st
         )
         return
     
-    # Sync user data from API to get latest available_tickets count
+    # Sync user data from API to get latest available_tickets count (updates
+    # the same identity-mapped user object, no re-read needed)
     await sync_user_data_from_api(session, telegram_id, api_client)
     
-    # Refresh user object to get updated data
-    user = await get_user_by_telegram_id(session, telegram_id)
-    
     # Check if user is linked to external customer
     if not user.external_id:
         await callback.message.edit_text(
@@ -369,7 +481,7 @@ async def fill_another_ticket(callback: CallbackQuery, session: AsyncSession, st
         await callback.message.edit_text(
             f"🎯 У вас {available_count} доступных ваучеров для заполнения\n\n"
             "Выберите способ заполнения:",
-            reply_markup=keyboards.get_number_selection_keyboard()
+            reply_markup=keyboards.get_number_selection_keyboard(show_fill_all=available_count > 1)
         )
         
     except Exception as e:
@@ -393,5 +505,5 @@ async def show_my_tickets_callback(callback: CallbackQuery, session: AsyncSessio
     # Import here to avoid circular dependency
     from bot.handlers.ticket import show_my_tickets
     
-    # Reuse the handler
-    await show_my_tickets(callback.message, session)
+    # Reuse the handler (it returns the reply to send)
+    return await show_my_tickets(callback.message, session)
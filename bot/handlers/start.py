@@ -37,14 +37,14 @@ async def cmd_start(message: Message, session: AsyncSession):
             logger.warning(f"Failed to sync user data for {telegram_id}, but user is registered")
         
         # User already registered, show welcome and main menu
-        await message.answer(
+        return message.answer(
             messages.WELCOME_MESSAGE,
             reply_markup=keyboards.get_main_keyboard()
         )
     else:
         logger.info(f"User {telegram_id} not registered, requesting phone number")
         # Request phone number
-        await message.answer(
+        return message.answer(
             messages.WELCOME_MESSAGE,
             reply_markup=keyboards.get_phone_keyboard()
         )
@@ -85,13 +85,13 @@ async def handle_contact(message: Message, session: AsyncSession):
         else:
             logger.warning(f"API sync failed for user {telegram_id}, but registration is OK")
         
-        await message.answer(
+        return message.answer(
             messages.PHONE_REGISTRATION_SUCCESS,
             reply_markup=keyboards.get_main_keyboard()
         )
     else:
         logger.error(f"User {telegram_id} registration failed")
-        await message.answer(
+        return message.answer(
             messages.PHONE_REGISTRATION_ERROR,
             reply_markup=keyboards.get_phone_keyboard()
         )
@@ -2,15 +2,18 @@
 from aiogram import Router, F
 from aiogram.types import Message
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import logging
+from typing import Any, Awaitable
 
 from bot import messages, keyboards
-from services.user_service import get_user_phone_number, sync_user_data_from_api
-from services.ticket_checker import check_ticket_result
 from services.draw_service import get_current_draw_id
-from services.ticket_sync import get_user_tickets_with_sync
-from db.crud import get_user_by_telegram_id
-from db.crud_draws import get_current_draw
+from services.ticket_sync import sync_user_and_tickets
+from bot.rendering import cache_render, get_cached_render, render_my_tickets
+from db.crud import get_tickets_version, get_user_by_telegram_id
+from db.crud_tickets import get_user_ticket_rows
+from db.crud_draws import get_current_draw, get_latest_draw_result
+from db.database import unit_of_work
 from api.client import api_client
 
 router = Router()
@@ -23,8 +26,10 @@ async def show_my_tickets(message: Message, session: AsyncSession):
     telegram_id = message.from_user.id
     logger.info(f"User {telegram_id} requested tickets")
     
-    # Get user
-    user = await get_user_by_telegram_id(session, telegram_id)
+    # Reads end before any API or Telegram call, releasing the connection
+    async with unit_of_work(session):
+        user = await get_user_by_telegram_id(session, telegram_id)
+        current_draw_obj = await get_current_draw(session) if user else None
     
     if not user:
         logger.warning(f"User {telegram_id} not found in database")
@@ -36,152 +41,91 @@ async def show_my_tickets(message: Message, session: AsyncSession):
     
     logger.info(f"User found: {user.phone}, available_tickets: {user.available_tickets}")
     
-    # Show loading message
-    loading_msg = await message.answer("⏳ Загрузка ваучеров...")
-    
-    # Sync user data from API to get latest available_tickets count
-    await sync_user_data_from_api(session, telegram_id, api_client)
-    
-    # Refresh user object to get updated data
-    user = await get_user_by_telegram_id(session, telegram_id)
-    logger.info(f"After sync: available_tickets={user.available_tickets}, external_id={user.external_id}")
+    async with asyncio.TaskGroup() as tasks:
+        # Loading message is sent while API data is synced
+        loading = tasks.create_task(_call(message.answer("⏳ Загрузка ваучеров...")))
+        current_draw_id = current_draw_obj.external_id if current_draw_obj else None
+        
+        # Customer data (available_tickets) and filled tickets, fetched concurrently
+        await sync_user_and_tickets(session, user, api_client, draw_id=current_draw_id)
+        logger.info(f"After sync: available_tickets={user.available_tickets}, external_id={user.external_id}")
     
-    # Get current draw
-    current_draw_obj = await get_current_draw(session)
+    async with asyncio.TaskGroup() as tasks:
+        tasks.create_task(_call(loading.result().delete()))
+        
+        # Unchanged tickets since the last view: serve rendered text without loading them
+        async with unit_of_work(session):
+            cache_key = (user.id, current_draw_id, await get_tickets_version(session, user.id))
+            response = get_cached_render(cache_key)
+            if response is None:
+                response = await _render_tickets_view(session, user, current_draw_obj)
+                cache_render(cache_key, response)
+            else:
+                logger.info(f"User {telegram_id}: tickets view served from render cache")
+    
+    return message.answer(
+        response,
+        reply_markup=keyboards.get_main_keyboard()
+    )
+
+
+async def _call(method: Awaitable[Any]) -> Any:
+    """Await Bot API method (awaitable, not a coroutine) so it can run as a task."""
+    return await method
+
+
+async def _render_tickets_view(session: AsyncSession, user, current_draw_obj) -> str:
+    """Load user's tickets of the current draw and render the tickets view."""
     current_draw_id = current_draw_obj.external_id if current_draw_obj else None
-    
-    # Sync and get filled tickets from API (only if user has external_id)
-    filled_tickets = []
-    if user.external_id:
-        filled_tickets = await get_user_tickets_with_sync(
-            session, 
-            telegram_id, 
-            api_client,
-            draw_id=current_draw_id,
-            force_sync=True
-        )
-    else:
-        logger.warning(f"User {telegram_id} has no external_id, skipping ticket sync")
-    
-    # Delete loading message
-    await loading_msg.delete()
+    filled_tickets = await get_user_ticket_rows(session, user.id, current_draw_id) if user.external_id else []
     
     # Count available (unfilled) tickets
     available_count = user.available_tickets or 0
     filled_count = len(filled_tickets)
-    total_count = available_count + filled_count
     
-    if total_count == 0:
-        logger.info(f"No tickets (filled or available) for user {telegram_id}")
-        await message.answer(
-            messages.NO_TICKET_MESSAGE,
-            reply_markup=keyboards.get_main_keyboard()
-        )
-        return
+    if available_count + filled_count == 0:
+        logger.info(f"No tickets (filled or available) for user {user.telegram_id}")
+        return messages.NO_TICKET_MESSAGE
     
-    logger.info(f"User {telegram_id}: {filled_count} filled, {available_count} available tickets")
-    
-    # Format tickets display
-    draw_name = current_draw_obj.name if current_draw_obj else "текущая акция"
-    response = f"🎫 <b>Ваши ваучеры</b>\n"
-    response += f"📋 {draw_name}\n"
-    response += f"Всего ваучеров: <b>{total_count}</b>\n\n"
-    
-    # Show filled tickets
-    if filled_tickets:
-        response += f"<b>✅ Заполненные ваучеры ({filled_count}):</b>\n\n"
-        for idx, ticket in enumerate(filled_tickets, 1):
-            response += f"<b>Ваучер #{idx}</b>\n"
-            
-            if ticket.numbers:
-                response += f"   🎯 Числа: {messages.format_numbers(ticket.numbers)}\n"
-                
-                if ticket.is_winner:
-                    response += f"   🏆 <b>ВЫИГРЫШ: {int(ticket.prize_amount)} руб!</b>\n"
-                    response += f"   ✅ Совпадений: {ticket.matched_count}\n"
-                elif current_draw_obj and current_draw_obj.status == "completed":
-                    response += f"   😔 Совпадений: {ticket.matched_count}\n"
-            
-            response += "\n"
-    
-    # Show available (unfilled) tickets
-    if available_count > 0:
-        response += f"<b>📝 Доступно для заполнения: {available_count}</b>\n"
-        response += f"💡 Выберите числа для своих ваучеров через раздел '🎯 Выбрать числа'\n\n"
-    
-    # Show winning info if any
-    winners = [t for t in filled_tickets if t.is_winner]
-    if winners:
-        total_prize = sum(t.prize_amount for t in winners)
-        response += f"\n💰 <b>Общий выигрыш: {int(total_prize)} руб!</b>\n"
-    
-    await message.answer(
-        response,
-        reply_markup=keyboards.get_main_keyboard()
+    logger.info(f"User {user.telegram_id}: {filled_count} filled, {available_count} available tickets")
+    
+    return render_my_tickets(
+        draw_name=current_draw_obj.name if current_draw_obj else "текущая акция",
+        draw_completed=current_draw_obj is not None and current_draw_obj.status == "completed",
+        tickets=filled_tickets,
+        available_count=available_count
     )
 
 
 @router.message(F.text == "🏆 Результаты акции")
 async def show_draw_results(message: Message, session: AsyncSession):
-    """Show current draw results and user's ticket status."""
+    """Show user's results of the latest completed draw (materialised after settlement)."""
     telegram_id = message.from_user.id
     
-    # Get user's phone
-    phone = await get_user_phone_number(session, telegram_id)
+    # Single indexed read, no API calls
+    async with unit_of_work(session):
+        result = await get_latest_draw_result(session, telegram_id)
     
-    if not phone:
+    if not result:
         await message.answer(
             messages.REQUEST_PHONE_MESSAGE,
             reply_markup=keyboards.get_phone_keyboard()
         )
         return
     
-    # Get current draw
-    draw = await api_client.get_current_draw()
-    
-    if not draw or not draw.get("winning_numbers"):
-        await message.answer(
-            "⏳ Розыгрыш еще не проведен.",
-            reply_markup=keyboards.get_main_keyboard()
-        )
-        return
-    
-    # Get user's ticket
-    ticket = await api_client.get_ticket_by_phone(phone)
-    
-    if not ticket:
-        await message.answer(
-            messages.NO_TICKET_MESSAGE,
-            reply_markup=keyboards.get_main_keyboard()
-        )
-        return
-    
-    # Calculate results
-    user_numbers = ticket.get("numbers", [])
-    winning_numbers = draw.get("winning_numbers", [])
-    
-    matches, prize = check_ticket_result(user_numbers, winning_numbers)
-    
-    # Display result
-    if matches >= 3:
-        await message.answer(
-            messages.TICKET_WON_TEMPLATE.format(
-                user_numbers=messages.format_numbers(user_numbers),
-                winning_numbers=messages.format_numbers(winning_numbers),
-                matches=matches,
-                prize=prize
-            ),
-            reply_markup=keyboards.get_main_keyboard()
-        )
+    if result.draw_id is None:
+        text = messages.DRAW_NOT_HELD_MESSAGE
+    elif result.results_at is None:
+        text = messages.DRAW_RESULTS_PENDING_MESSAGE
+    elif result.summary is None:
+        text = messages.NO_TICKET_MESSAGE
     else:
-        await message.answer(
-            messages.TICKET_LOST_TEMPLATE.format(
-                user_numbers=messages.format_numbers(user_numbers),
-                winning_numbers=messages.format_numbers(winning_numbers),
-                matches=matches
-            ),
-            reply_markup=keyboards.get_main_keyboard()
-        )
+        text = result.summary
+    
+    return message.answer(
+        text,
+        reply_markup=keyboards.get_main_keyboard()
+    )
 
 
 async def display_ticket(message: Message, ticket: dict):
@@ -231,7 +175,7 @@ async def display_ticket(message: Message, ticket: dict):
 @router.message(F.text == "❓ Частые вопросы")
 async def show_faq(message: Message):
     """Show frequently asked questions."""
-    await message.answer(
+    return message.answer(
         messages.FAQ_MESSAGE,
         reply_markup=keyboards.get_main_keyboard()
     )
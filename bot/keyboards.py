@@ -44,16 +44,18 @@ def get_ticket_selection_keyboard(tickets) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def get_number_selection_keyboard() -> InlineKeyboardMarkup:
+def get_number_selection_keyboard(show_fill_all: bool = False) -> InlineKeyboardMarkup:
     """Get keyboard for number selection method."""
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="🎲 Случайные числа", callback_data="auto_numbers")],
-            [InlineKeyboardButton(text="✏️ Выбрать самому", callback_data="manual_numbers")],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_selection")]
-        ]
-    )
-    return keyboard
+    buttons = [
+        [InlineKeyboardButton(text="🎲 Случайные числа", callback_data="auto_numbers")],
+        [InlineKeyboardButton(text="✏️ Выбрать самому", callback_data="manual_numbers")]
+    ]
+    # Fill all remaining vouchers with random numbers in one go
+    if show_fill_all:
+        buttons.append([InlineKeyboardButton(text="🎲 Заполнить все случайно", callback_data="auto_fill_all")])
+    buttons.append([InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_selection")])
+    
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
 def get_cancel_keyboard() -> InlineKeyboardMarkup:
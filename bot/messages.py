@@ -70,6 +70,64 @@ TICKET_LOST_TEMPLATE = """
 Удачи в следующий раз!
 """
 
+DRAW_NOT_HELD_MESSAGE = """
+⏳ Розыгрыш еще не проведен.
+"""
+
+DRAW_RESULTS_PENDING_MESSAGE = """
+⏳ Розыгрыш проведен, результаты подсчитываются. Загляните через минуту!
+"""
+
+DRAW_RESULTS_TEMPLATE = """
+🏆 <b>Результаты: {draw_name}</b>
+
+🎯 Выигрышная комбинация: {winning_numbers}
+🎫 Ваших ваучеров: {ticket_count}
+✨ Лучшее совпадение: {best_match}
+
+{tickets}
+{outcome}
+"""
+
+DRAW_RESULTS_WON_OUTCOME = "🎉 <b>ПОЗДРАВЛЯЕМ! Ваш выигрыш: {prize:,} ₽</b>"
+
+DRAW_RESULTS_LOST_OUTCOME = "😔 К сожалению, ваши ваучеры не выиграли. Удачи в следующий раз!"
+
+DRAW_RESULTS_TICKET_LINE = "🎯 {numbers} — совпадений: {matches}"
+
+DRAW_RESULTS_WINNING_TICKET_LINE = "🏆 {numbers} — совпадений: {matches}, выигрыш {prize:,} ₽"
+
+DRAW_RESULTS_MORE_TICKETS = "… и еще {count}"
+
+# "🎫 Мои ваучеры" view pieces (see bot.rendering)
+MY_TICKETS_HEADER_TEMPLATE = "🎫 <b>Ваши ваучеры</b>\n📋 {draw_name}\nВсего ваучеров: <b>{total_count}</b>\n\n"
+
+MY_TICKETS_FILLED_HEADER_TEMPLATE = "<b>✅ Заполненные ваучеры ({count}):</b>\n\n"
+
+MY_TICKETS_TICKET_TEMPLATE = "<b>Ваучер #{index}</b>\n"
+
+MY_TICKETS_NUMBERS_LINE = "   🎯 Числа: {numbers}\n"
+
+MY_TICKETS_WON_LINES = "   🏆 <b>ВЫИГРЫШ: {prize} руб!</b>\n   ✅ Совпадений: {matches}\n"
+
+MY_TICKETS_LOST_LINE = "   😔 Совпадений: {matches}\n"
+
+MY_TICKETS_AVAILABLE_TEMPLATE = (
+    "<b>📝 Доступно для заполнения: {count}</b>\n"
+    "💡 Выберите числа для своих ваучеров через раздел '🎯 Выбрать числа'\n\n"
+)
+
+MY_TICKETS_TOTAL_PRIZE_TEMPLATE = "\n💰 <b>Общий выигрыш: {prize} руб!</b>\n"
+
+# Sent to participants without materialised results
+DRAW_COMPLETED_BROADCAST_TEMPLATE = """
+🏆 <b>{draw_name}: розыгрыш проведен!</b>
+
+🎯 Выигрышная комбинация: {winning_numbers}
+
+Нажмите «🏆 Результаты акции», чтобы узнать, выиграли ли ваши ваучеры.
+"""
+
 # Error messages
 API_ERROR_MESSAGE = """
 ⚠️ Система временно недоступна. Попробуйте позже.
@@ -108,6 +166,12 @@ NUMBERS_ASSIGNED_TEMPLATE = """
 🎯 Ваши числа: {numbers}
 """
 
+ALL_NUMBERS_ASSIGNED_TEMPLATE = """
+✅ Заполнено ваучеров: {count}
+
+{numbers}
+"""
+
 
 def format_numbers(numbers: list[int]) -> str:
     """Format list of numbers as string."""
@@ -1,12 +1,87 @@
-"""Middleware for database session injection."""
-from typing import Callable, Dict, Any, Awaitable
+"""Middleware for database session injection and flood control."""
+from typing import Callable, Dict, Any, Awaitable, Optional, Set, Tuple
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from config import settings
 from db.database import async_session_maker
+from services.rate_limit import KeyedTokenBucket
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Drop flood and repeated presses before they reach handlers.
+    
+    Every user has a token bucket of settings.throttle_burst updates refilled
+    at settings.throttle_rate per second. A press (callback data or message
+    text) identical to one of the user's presses still being handled is
+    dropped as well. Dropped callbacks are answered so the button stops
+    spinning; dropped messages are ignored.
+    
+    Register before DatabaseMiddleware so dropped updates do not open a
+    session. State is per process: with several webhook workers a user's
+    updates can be handled by different processes.
+    """
+    
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        self._buckets = KeyedTokenBucket(
+            rate if rate is not None else settings.throttle_rate,
+            burst if burst is not None else settings.throttle_burst
+        )
+        self._in_flight: Set[Tuple[int, str]] = set()
+        self.stats = {"passed": 0, "throttled": 0, "duplicates": 0}
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """Pass update to handler unless user floods or repeats a running press."""
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+        
+        if isinstance(event, CallbackQuery):
+            press = event.data
+        elif isinstance(event, Message):
+            press = event.text
+        else:
+            press = None
+        key = (user.id, press)
+        
+        if press is not None and key in self._in_flight:
+            self.stats["duplicates"] += 1
+            return await self._drop(event)
+        if not self._buckets.try_acquire(user.id):
+            self.stats["throttled"] += 1
+            return await self._drop(event)
+        
+        self.stats["passed"] += 1
+        if press is None:
+            return await handler(event, data)
+        
+        self._in_flight.add(key)
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight.discard(key)
+    
+    @staticmethod
+    async def _drop(event: TelegramObject) -> None:
+        """Acknowledge dropped callback without doing any work."""
+        if isinstance(event, CallbackQuery):
+            await event.answer()
 
 
 class DatabaseMiddleware(BaseMiddleware):
-    """Middleware to inject database session into handlers."""
+    """
+    Middleware to inject database session into handlers.
+    
+    Only handlers taking a `session` argument get one. A session takes a
+    pooled connection on its first query and keeps it until the
+    transaction ends, so handlers wrap database work in short units of
+    work (db.database.unit_of_work) and await API calls outside them.
+    """
     
     async def __call__(
         self,
@@ -15,6 +90,10 @@ class DatabaseMiddleware(BaseMiddleware):
         data: Dict[str, Any]
     ) -> Any:
         """Inject database session into handler data."""
+        handler_object = data.get("handler")
+        if handler_object is not None and "session" not in handler_object.params and not handler_object.varkw:
+            return await handler(event, data)
+        
         async with async_session_maker() as session:
             data["session"] = session
             return await handler(event, data)
@@ -0,0 +1,113 @@
+"""Rendering of the "🎫 Мои ваучеры" view with a versioned render cache."""
+from typing import Dict, Hashable, Optional, Sequence
+
+from api.cache import TTLCache
+from bot import messages
+from config import settings
+from db.models import Ticket
+
+
+# Templates compiled once: a single format call per ticket, with the block
+# for each ticket kind joined up front, and number strings by value. Numbers
+# are still sorted here: rows stored before normalize_api_numbers may be unsorted
+_HEADER = messages.MY_TICKETS_HEADER_TEMPLATE.format
+_FILLED_HEADER = messages.MY_TICKETS_FILLED_HEADER_TEMPLATE.format
+_AVAILABLE = messages.MY_TICKETS_AVAILABLE_TEMPLATE.format
+_TOTAL_PRIZE = messages.MY_TICKETS_TOTAL_PRIZE_TEMPLATE.format
+_WON_TICKET = (
+    messages.MY_TICKETS_TICKET_TEMPLATE + messages.MY_TICKETS_NUMBERS_LINE + messages.MY_TICKETS_WON_LINES + "\n"
+).format
+_LOST_TICKET = (
+    messages.MY_TICKETS_TICKET_TEMPLATE + messages.MY_TICKETS_NUMBERS_LINE + messages.MY_TICKETS_LOST_LINE + "\n"
+).format
+_FILLED_TICKET = (messages.MY_TICKETS_TICKET_TEMPLATE + messages.MY_TICKETS_NUMBERS_LINE + "\n").format
+_EMPTY_TICKET = (messages.MY_TICKETS_TICKET_TEMPLATE + "\n").format
+_NUMBER_STRINGS = tuple(str(n) for n in range(100))
+
+# Rendered views by (user_id, draw external_id, tickets_version). Keys of
+# changed tickets are never looked up again and age out of the LRU.
+_render_cache = TTLCache(max_entries=settings.render_cache_max_entries)
+
+
+def render_my_tickets(
+    draw_name: str,
+    draw_completed: bool,
+    tickets: Sequence[Ticket],
+    available_count: int
+) -> str:
+    """
+    Render user's tickets of a draw.
+    
+    Args:
+        draw_name: Draw shown in the header
+        draw_completed: Show match counts of losing tickets
+        tickets: Filled tickets (Ticket or rows with numbers, is_winner,
+            matched_count, prize_amount), in display order
+        available_count: Tickets the user can still fill
+    
+    Returns:
+        HTML message text
+    """
+    parts = [_HEADER(draw_name=draw_name, total_count=available_count + len(tickets))]
+    winners = 0
+    total_prize = 0
+    
+    if tickets:
+        parts.append(_FILLED_HEADER(count=len(tickets)))
+        append = parts.append
+        for index, ticket in enumerate(tickets, 1):
+            numbers = ticket.numbers
+            if ticket.is_winner:
+                winners += 1
+                total_prize += ticket.prize_amount
+                if numbers:
+                    append(_WON_TICKET(
+                        index=index,
+                        numbers=" ".join([_NUMBER_STRINGS[n] for n in sorted(numbers)]),
+                        prize=int(ticket.prize_amount),
+                        matches=ticket.matched_count
+                    ))
+                    continue
+            elif numbers:
+                numbers = " ".join([_NUMBER_STRINGS[n] for n in sorted(numbers)])
+                if draw_completed:
+                    append(_LOST_TICKET(index=index, numbers=numbers, matches=ticket.matched_count))
+                else:
+                    append(_FILLED_TICKET(index=index, numbers=numbers))
+                continue
+            append(_EMPTY_TICKET(index=index))
+    
+    if available_count > 0:
+        parts.append(_AVAILABLE(count=available_count))
+    
+    if winners:
+        parts.append(_TOTAL_PRIZE(prize=int(total_prize)))
+    
+    return "".join(parts)
+
+
+def get_cached_render(key: Hashable) -> Optional[str]:
+    """Cached view for key, None on miss."""
+    entry = _render_cache.get(key)
+    return entry.value if entry is not None else None
+
+
+def cache_render(key: Hashable, text: str) -> None:
+    """Store rendered view for key."""
+    _render_cache.set(key, text, ttl=settings.render_cache_ttl)
+
+
+def render_cache_stats() -> Dict[str, int]:
+    """
+    Get render cache statistics.
+    
+    Returns:
+        Dict with 'hits', 'misses', 'evictions' and 'entries'.
+    """
+    stats = _render_cache.stats
+    return {
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "evictions": stats["evictions"],
+        "entries": len(_render_cache)
+    }
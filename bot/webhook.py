@@ -0,0 +1,134 @@
+"""Webhook mode: aiohttp web app serving Telegram updates, optionally in several processes."""
+import asyncio
+import logging
+import multiprocessing
+from typing import List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from api.client import api_client
+from config import settings
+from bot.dispatcher import create_bot, create_dispatcher
+from db.database import db_pool_stats
+from services.ticket_sync import ticket_sync_stats
+
+logger = logging.getLogger(__name__)
+
+
+def webhook_url() -> Optional[str]:
+    """Public webhook URL registered with Telegram, None if not configured."""
+    if not settings.webhook_base_url:
+        return None
+    return settings.webhook_base_url.rstrip("/") + settings.webhook_path
+
+
+def create_webhook_app(bot: Bot, dp: Dispatcher) -> web.Application:
+    """
+    Build aiohttp application handling updates on settings.webhook_path.
+    
+    Updates are processed before the HTTP response is sent, so a handler
+    that returns a Bot API method (e.g. `return message.answer(...)`) gets it
+    delivered in the webhook response instead of a separate API request.
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=False,
+        secret_token=settings.webhook_secret or None
+    ).register(app, path=settings.webhook_path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def serve_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """Serve webhook application until cancelled."""
+    runner = web.AppRunner(create_webhook_app(bot, dp))
+    await runner.setup()
+    
+    # With several workers every process binds the same port (SO_REUSEPORT),
+    # the kernel spreads connections between them
+    site = web.TCPSite(
+        runner,
+        settings.webhook_host,
+        settings.webhook_port,
+        reuse_port=settings.webhook_workers > 1
+    )
+    await site.start()
+    logger.info(f"Webhook server listening on {settings.webhook_host}:{settings.webhook_port}{settings.webhook_path}")
+    
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _run_worker() -> None:
+    """Serve webhook in a worker process with its own bot and API session."""
+    await api_client.start()
+    bot = create_bot()
+    dp = create_dispatcher()
+    try:
+        await serve_webhook(bot, dp)
+    finally:
+        logger.info(f"Throttling stats: {dp['throttling'].stats}")
+        logger.info(f"Ticket sync stats: {ticket_sync_stats()}")
+        logger.info(f"Database pool stats: {db_pool_stats()}")
+        await api_client.close()
+        await bot.session.close()
+        await dp.storage.close()
+
+
+def run_worker(index: int) -> None:
+    """Worker process entry point."""
+    logger.info(f"Webhook worker {index} started")
+    try:
+        asyncio.run(_run_worker())
+    except KeyboardInterrupt:
+        pass
+
+
+def start_workers() -> List[multiprocessing.Process]:
+    """Start settings.webhook_workers - 1 extra webhook processes (the main process serves too)."""
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(1, settings.webhook_workers):
+        process = context.Process(target=run_worker, args=(index,), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def stop_workers(processes: List[multiprocessing.Process]) -> None:
+    """Stop webhook worker processes."""
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(timeout=10)
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """
+    Register webhook with Telegram and serve updates until cancelled.
+    
+    Background jobs (draw scheduler) stay in the main process, extra worker
+    processes only serve updates.
+    """
+    url = webhook_url()
+    if url:
+        await bot.set_webhook(
+            url,
+            secret_token=settings.webhook_secret or None,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+        logger.info(f"Webhook set: {url}")
+    else:
+        logger.warning("WEBHOOK_BASE_URL is not set, webhook is not registered with Telegram")
+    
+    workers = start_workers()
+    try:
+        await serve_webhook(bot, dp)
+    finally:
+        stop_workers(workers)
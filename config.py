@@ -7,13 +7,92 @@ class Settings(BaseSettings):
     
     # Telegram Bot
     telegram_bot_token: str
+    bot_mode: str = "polling"  # polling or webhook
+    
+    # Webhook mode
+    webhook_base_url: str = ""  # Public HTTPS URL Telegram posts to, empty = do not register webhook
+    webhook_path: str = "/webhook"
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_secret: str = ""  # Checked against X-Telegram-Bot-Api-Secret-Token header
+    webhook_workers: int = 1  # Processes sharing the port (SO_REUSEPORT), background jobs run in the first
     
     # External Lottery API
     api_base_url: str
     api_key: str
     
+    # External Lottery API connection pool
+    api_request_timeout: float = 10.0  # Total timeout per request, seconds
+    api_pool_limit: int = 100  # Max simultaneous connections
+    api_pool_limit_per_host: int = 30  # Max simultaneous connections to the API host
+    api_keepalive_timeout: float = 30.0  # Idle connection lifetime, seconds
+    api_dns_cache_ttl: int = 300  # DNS cache lifetime, seconds
+    
+    # External Lottery API response cache
+    api_cache_max_entries: int = 10000
+    api_cache_customer_ttl: float = 30.0  # Customer data fresh for, seconds
+    api_cache_tickets_ttl: float = 30.0  # Customer tickets fresh for, seconds
+    api_cache_draw_ttl: float = 60.0  # Current draw fresh for, seconds
+    api_cache_stale_ttl: float = 300.0  # Serve stale while refreshing for, seconds
+    
+    # External Lottery API retries (GET only) and circuit breaker
+    api_retry_attempts: int = 3  # Total attempts including the first one
+    api_retry_base_delay: float = 0.2  # Backoff base, seconds
+    api_retry_max_delay: float = 2.0  # Backoff cap, seconds
+    api_retry_after_max: float = 5.0  # Give up if Retry-After asks for longer, seconds
+    api_breaker_failure_threshold: int = 5  # Consecutive failures to open circuit
+    api_breaker_reset_timeout: float = 30.0  # Open circuit duration before probing, seconds
+    
     # Database
     database_url: str
+    db_pool_size: int = 15  # Connections kept open per process (opened on demand)
+    db_max_overflow: int = 0  # Extra connections under load (closed on every return, so churn with short units of work)
+    db_pool_timeout: float = 30.0  # Wait for a free connection before failing, seconds
+    
+    # Rendered "🎫 Мои ваучеры" views, keyed by tickets version
+    render_cache_max_entries: int = 10000
+    render_cache_ttl: float = 3600.0  # Seconds (versions change keys, TTL only bounds memory)
+    ticket_sync_freshness: float = 30.0  # Reuse user's last API sync for, seconds (0 = sync on every view)
+    
+    # Per-user flood control of incoming updates
+    throttle_rate: float = 1.0  # Updates per second a user is refilled with
+    throttle_burst: int = 5  # Updates accepted back to back
+    
+    # Bot FSM storage (number selection conversations)
+    fsm_storage: str = "postgres"  # postgres (shared by all bot processes) or memory
+    fsm_cache_ttl: float = 1.0  # Trust in-process cached state for, seconds (0 = always read database)
+    fsm_cache_max_entries: int = 10000
+    fsm_connections: int = 4  # Database connections kept per process for FSM storage (own pool, on top of DB_POOL_SIZE)
+    fsm_state_ttl: int = 86400  # Abandoned conversations expire after, seconds
+    fsm_cleanup_interval: int = 600  # Expiry run interval, seconds
+    
+    # Draw settlement
+    settlement_chunk_size: int = 10000  # Tickets streamed and updated per chunk
+    settlement_workers: int = 0  # Settlement processes, 0 = number of CPU cores
+    
+    # Auto-fill of unfilled tickets at draw start
+    autofill_chunk_size: int = 10000  # Tickets generated per UPDATE
+    autofill_push_concurrency: int = 10  # Simultaneous API fill requests
+    
+    # Draw lifecycle scheduler
+    draw_sync_interval: int = 300  # API poll interval away from draw time, seconds
+    draw_watch_window: int = 60  # Start tight polling this long before scheduled time, seconds
+    draw_watch_interval: float = 5.0  # Tight poll interval until results arrive, seconds
+    draw_watch_timeout: int = 3600  # Fall back to idle polling if results are this late, seconds
+    draw_autofill_lead: int = 0  # Auto-fill unfilled tickets this long before scheduled time, seconds
+    draw_autofill_enabled: bool = True
+    draw_results_broadcast: bool = True  # Notify participants once results are materialised
+    
+    # Broadcasts (Telegram allows ~30 messages/s per bot and ~1 message/s per chat)
+    broadcast_rate: float = 25.0  # Messages per second over all chats
+    broadcast_burst: int = 5  # Messages sent back to back after an idle period
+    broadcast_chat_interval: float = 1.0  # Seconds between messages to one chat
+    broadcast_batch_size: int = 100  # Messages claimed from the queue at once
+    broadcast_concurrency: int = 10  # Simultaneous sendMessage requests
+    broadcast_max_attempts: int = 5  # Transient errors before a message is given up
+    broadcast_retry_delay: float = 30.0  # First retry delay after a transient error (doubles), seconds
+    broadcast_lease_timeout: int = 300  # Messages claimed by a dead sender are retried after, seconds
+    broadcast_poll_interval: float = 10.0  # Queue poll interval when idle, seconds
     
     model_config = SettingsConfigDict(
         env_file=".env",
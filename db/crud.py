@@ -1,5 +1,5 @@
 """CRUD operations for database models."""
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.models import User, Ticket
 from typing import List
@@ -38,6 +38,40 @@ async def get_user_phone(session: AsyncSession, telegram_id: int) -> str | None:
     return result.scalar_one_or_none()
 
 
+async def get_tickets_version(session: AsyncSession, user_id: int) -> int:
+    """Get current version of user's tickets (see bump_tickets_version)."""
+    result = await session.execute(
+        select(User.tickets_version).where(User.id == user_id)
+    )
+    return result.scalar_one()
+
+
+async def bump_tickets_version(session: AsyncSession, user_id: int) -> None:
+    """
+    Mark user's tickets or available_tickets as changed (not committed).
+    
+    Incremented in SQL, so concurrent bumps from several processes never
+    hand out the same version twice. The last API payload hash is cleared:
+    local rows no longer mirror that payload, so it must be applied again.
+    """
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(tickets_version=User.tickets_version + 1, tickets_payload_hash=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_draw_tickets_versions(session: AsyncSession, draw_id: int) -> None:
+    """Bump tickets version of every user with tickets in a draw (not committed)."""
+    await session.execute(
+        update(User)
+        .where(User.id.in_(select(Ticket.user_id).where(Ticket.draw_id == draw_id)))
+        .values(tickets_version=User.tickets_version + 1, tickets_payload_hash=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
 # Ticket CRUD operations
 
 async def create_ticket(
@@ -130,7 +164,11 @@ async def update_user_from_api_data(
             pass
     
     user.sex = api_data.get("sex")
-    user.available_tickets = api_data.get("available_tickets", 0)
+    
+    available_tickets = api_data.get("available_tickets", 0)
+    if available_tickets != user.available_tickets:
+        await bump_tickets_version(session, user.id)
+    user.available_tickets = available_tickets
     
     # Store additional_fields as JSON string
     additional_fields = api_data.get("additional_fields")
@@ -139,8 +177,9 @@ async def update_user_from_api_data(
     
     user.updated_at = datetime.utcnow()
     
+    # Every changed column is set above and sessions keep objects on commit
+    # (expire_on_commit=False), so the user needs no refresh
     await session.commit()
-    await session.refresh(user)
     return user
 
 
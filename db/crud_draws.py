@@ -1,7 +1,8 @@
 """CRUD operations for Draw model."""
-from sqlalchemy import select
+from sqlalchemy import and_, select, true
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from db.models import Draw
+from db.models import Draw, DrawResult, User
 from typing import Optional
 import json
 from datetime import datetime
@@ -36,6 +37,43 @@ async def get_current_draw(session: AsyncSession) -> Optional[Draw]:
     return result.scalar_one_or_none()
 
 
+async def get_latest_draw_result(session: AsyncSession, telegram_id: int) -> Optional[Row]:
+    """
+    Get user's results of the latest completed draw in one query.
+    
+    Joins the user (by Telegram ID), the latest completed draw and the
+    user's draw_results row (primary key lookup).
+    
+    Returns:
+        None if user is not registered, otherwise a row with user_id,
+        draw_id and results_at (None if no completed draw / results not
+        materialised yet) and summary (None if user had no tickets)
+    """
+    latest_draw = (
+        select(Draw.external_id, Draw.results_at)
+        .where(Draw.status == "completed", Draw.winning_numbers.isnot(None))
+        .order_by(Draw.executed_at.desc().nulls_last(), Draw.external_id.desc())
+        .limit(1)
+        .subquery()
+    )
+    result = await session.execute(
+        select(
+            User.id.label("user_id"),
+            latest_draw.c.external_id.label("draw_id"),
+            latest_draw.c.results_at,
+            DrawResult.summary
+        )
+        .select_from(User)
+        .outerjoin(latest_draw, true())
+        .outerjoin(
+            DrawResult,
+            and_(DrawResult.draw_id == latest_draw.c.external_id, DrawResult.user_id == User.id)
+        )
+        .where(User.telegram_id == telegram_id)
+    )
+    return result.first()
+
+
 async def create_or_update_draw(session: AsyncSession, api_data: dict) -> Draw:
     """
     Create new draw or update existing one with data from API.
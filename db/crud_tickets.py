@@ -1,7 +1,11 @@
 """CRUD operations for Ticket model with API sync."""
-from sqlalchemy import select
+from sqlalchemy import and_, case, not_, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from db.crud import bump_tickets_version
 from db.models import Ticket
+from services.ticket_checker import numbers_to_mask
 from typing import List, Optional
 from datetime import datetime
 
@@ -25,6 +29,22 @@ async def get_user_tickets(session: AsyncSession, user_id: int, draw_id: int = N
     return list(result.scalars().all())
 
 
+async def get_user_ticket_rows(session: AsyncSession, user_id: int, draw_id: int = None) -> List[Row]:
+    """
+    Get display columns of user's tickets (numbers, is_winner, matched_count,
+    prize_amount) in get_user_tickets order, without loading Ticket objects.
+    """
+    query = select(
+        Ticket.numbers, Ticket.is_winner, Ticket.matched_count, Ticket.prize_amount
+    ).where(Ticket.user_id == user_id)
+    if draw_id:
+        query = query.where(Ticket.draw_id == draw_id)
+    query = query.order_by(Ticket.created_at.desc())
+    
+    result = await session.execute(query)
+    return list(result.all())
+
+
 def parse_datetime_naive_ticket(date_str: str) -> Optional[datetime]:
     """Parse ISO datetime string and return naive datetime (no timezone)."""
     if not date_str:
@@ -36,10 +56,79 @@ def parse_datetime_naive_ticket(date_str: str) -> Optional[datetime]:
         return None
 
 
+def normalize_api_numbers(numbers) -> Optional[List[int]]:
+    """
+    Convert ticket numbers from API format to list of ints.
+    
+    API returns either an object like {"1": false, "2": false} (keys are numbers)
+    or an array of numbers/strings. Numbers are returned sorted.
+    """
+    if not numbers:
+        return None
+    # If numbers is a dict/object like {"1": false, "2": false}, extract keys
+    if isinstance(numbers, dict):
+        return sorted([int(k) for k in numbers.keys()])
+    # If numbers is array of strings, convert to ints
+    if isinstance(numbers, list):
+        return sorted(int(n) for n in numbers)
+    return None
+
+
+def ticket_values_from_api(user_id: int, api_data: dict) -> dict:
+    """Build Ticket column values from API ticket data."""
+    if api_data.get("is_winner"):
+        status = "won"
+    elif api_data.get("numbers"):
+        status = "active"
+    else:
+        status = "pending"
+    
+    numbers = normalize_api_numbers(api_data.get("numbers"))
+    
+    return {
+        "external_id": api_data.get("id"),
+        "user_id": user_id,
+        "customer_id": api_data.get("customer_id"),
+        "draw_id": api_data.get("draw_id"),
+        "numbers": numbers,
+        "numbers_mask": numbers_to_mask(numbers) if numbers else None,
+        "is_winner": api_data.get("is_winner", False),
+        "matched_count": api_data.get("matched_count", 0),
+        "prize_amount": float(api_data.get("prize_amount", 0)),
+        "filled_by": api_data.get("filled_by"),
+        "filled_at": parse_datetime_naive_ticket(api_data.get("filled_at")),
+        "status": status,
+    }
+
+
+# Columns overwritten when a ticket from API already exists locally
+TICKET_UPSERT_COLUMNS = (
+    "customer_id",
+    "draw_id",
+    "numbers",
+    "numbers_mask",
+    "filled_by",
+    "filled_at",
+)
+
+# Result columns, overwritten only while the ticket is not settled: the API
+# usually leaves them out, and its defaults must not wipe a local settlement
+TICKET_RESULT_COLUMNS = (
+    "is_winner",
+    "matched_count",
+    "prize_amount",
+    "status",
+)
+
+# Ticket statuses written by draw settlement
+SETTLED_TICKET_STATUSES = ("won", "lost")
+
+
 async def create_or_update_ticket(
     session: AsyncSession,
     user_id: int,
-    api_data: dict
+    api_data: dict,
+    commit: bool = True
 ) -> Ticket:
     """
     Create new ticket or update existing one with data from API.
@@ -48,6 +137,7 @@ async def create_or_update_ticket(
         session: Database session
         user_id: User ID in our database
         api_data: Ticket data from API
+        commit: If False, only flush and leave commit to the caller
     
     Returns:
         Ticket object
@@ -61,48 +151,32 @@ async def create_or_update_ticket(
         # Update existing ticket
         ticket.customer_id = api_data.get("customer_id")
         ticket.draw_id = api_data.get("draw_id")
-        # Convert numbers from API format (object or array)
-        numbers = api_data.get("numbers")
-        if numbers:
-            # If numbers is a dict/object like {"1": false, "2": false}, extract keys
-            if isinstance(numbers, dict):
-                ticket.numbers = sorted([int(k) for k in numbers.keys()])
-            # If numbers is array of strings, convert to ints
-            elif isinstance(numbers, list):
-                ticket.numbers = [int(n) for n in numbers]
-            else:
-                ticket.numbers = None
-        else:
-            ticket.numbers = None
-        ticket.is_winner = api_data.get("is_winner", False)
-        ticket.matched_count = api_data.get("matched_count", 0)
-        ticket.prize_amount = float(api_data.get("prize_amount", 0))
+        # Convert numbers from API format (object or array); numbers_mask follows
+        ticket.numbers = normalize_api_numbers(api_data.get("numbers"))
         ticket.filled_by = api_data.get("filled_by")
         
         # Parse filled_at
         ticket.filled_at = parse_datetime_naive_ticket(api_data.get("filled_at"))
         
-        # Update status based on is_winner
-        if api_data.get("is_winner"):
-            ticket.status = "won"
-        elif api_data.get("numbers"):
-            ticket.status = "active"
-        else:
-            ticket.status = "pending"
+        # Keep results of a settled ticket (see TICKET_RESULT_COLUMNS)
+        if ticket.status not in SETTLED_TICKET_STATUSES:
+            ticket.is_winner = api_data.get("is_winner", False)
+            ticket.matched_count = api_data.get("matched_count", 0)
+            ticket.prize_amount = float(api_data.get("prize_amount", 0))
+            
+            # Update status based on is_winner
+            if api_data.get("is_winner"):
+                ticket.status = "won"
+            elif api_data.get("numbers"):
+                ticket.status = "active"
+            else:
+                ticket.status = "pending"
         
         ticket.updated_at = datetime.utcnow()
     else:
         # Create new ticket
         # Convert numbers from API format (object or array)
-        numbers = api_data.get("numbers")
-        numbers_int = None
-        if numbers:
-            # If numbers is a dict/object like {"1": false, "2": false}, extract keys
-            if isinstance(numbers, dict):
-                numbers_int = sorted([int(k) for k in numbers.keys()])
-            # If numbers is array of strings, convert to ints
-            elif isinstance(numbers, list):
-                numbers_int = [int(n) for n in numbers]
+        numbers_int = normalize_api_numbers(api_data.get("numbers"))
         
         ticket = Ticket(
             external_id=external_id,
@@ -126,33 +200,89 @@ async def create_or_update_ticket(
         
         session.add(ticket)
     
+    if not commit:
+        await session.flush()
+        return ticket
+    
     await session.commit()
     await session.refresh(ticket)
     return ticket
 
 
+# Rows per INSERT statement (asyncpg allows at most 32767 bind parameters)
+TICKET_UPSERT_CHUNK_SIZE = 1000
+
+
 async def sync_user_tickets_from_api(
     session: AsyncSession,
     user_id: int,
     customer_id: int,
-    api_tickets: list
+    api_tickets: list,
+    commit: bool = True
 ) -> List[Ticket]:
     """
-    Synchronize user's tickets from API data.
+    Synchronize user's tickets from API data in a single transaction.
+    
+    Uses a set-based INSERT ... ON CONFLICT (external_id) DO UPDATE ... RETURNING
+    instead of a SELECT and commit per ticket. Rows identical to the API data
+    are not rewritten, and result columns of settled tickets (won / lost)
+    are kept. If any ticket was inserted or changed, the user's tickets
+    version is bumped in the same transaction.
     
     Args:
         session: Database session
         user_id: User ID in our database
         customer_id: Customer ID from API
         api_tickets: List of ticket dicts from API
+        commit: If False, leave commit to the caller (e.g. unit_of_work)
     
     Returns:
-        List of synced Ticket objects
+        List of inserted or changed Ticket objects
     """
-    synced_tickets = []
+    if not api_tickets:
+        return []
     
+    # One statement cannot update the same row twice, keep last version per external_id
+    rows_by_key = {}
     for api_ticket in api_tickets:
-        ticket = await create_or_update_ticket(session, user_id, api_ticket)
-        synced_tickets.append(ticket)
+        row = ticket_values_from_api(user_id, api_ticket)
+        key = row["external_id"] if row["external_id"] is not None else object()
+        rows_by_key[key] = row
+    rows = list(rows_by_key.values())
+    
+    now = datetime.utcnow()
+    synced_tickets = []
+    
+    for start in range(0, len(rows), TICKET_UPSERT_CHUNK_SIZE):
+        stmt = insert(Ticket).values(rows[start:start + TICKET_UPSERT_CHUNK_SIZE])
+        settled = Ticket.status.in_(SETTLED_TICKET_STATUSES)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Ticket.external_id],
+            set_={
+                **{column: stmt.excluded[column] for column in TICKET_UPSERT_COLUMNS},
+                **{
+                    column: case((settled, getattr(Ticket, column)), else_=stmt.excluded[column])
+                    for column in TICKET_RESULT_COLUMNS
+                },
+                "updated_at": now
+            },
+            where=or_(
+                *(
+                    getattr(Ticket, column).is_distinct_from(stmt.excluded[column])
+                    for column in TICKET_UPSERT_COLUMNS
+                ),
+                and_(not_(settled), or_(*(
+                    getattr(Ticket, column).is_distinct_from(stmt.excluded[column])
+                    for column in TICKET_RESULT_COLUMNS
+                )))
+            )
+        ).returning(Ticket)
+        
+        result = await session.scalars(stmt, execution_options={"populate_existing": True})
+        synced_tickets.extend(result.all())
     
+    if synced_tickets:
+        await bump_tickets_version(session, user_id)
+    if commit:
+        await session.commit()
     return synced_tickets
@@ -1,4 +1,8 @@
 """Database connection and session management."""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from config import settings
 from db.models import Base
@@ -8,7 +12,10 @@ from db.models import Base
 engine = create_async_engine(
     settings.database_url,
     echo=False,  # Set to True for SQL query logging during development
-    future=True
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout
 )
 
 # Create async session factory
@@ -18,6 +25,9 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Connection acquisition by units of work (see db_pool_stats)
+_acquire_counters = {"acquired": 0, "wait_total": 0.0, "wait_max": 0.0}
+
 
 async def init_db():
     """Initialize database tables."""
@@ -29,3 +39,64 @@ async def get_session() -> AsyncSession:
     """Dependency for getting database session."""
     async with async_session_maker() as session:
         yield session
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Run database work in a short transaction of session.
+    
+    The pooled connection is taken on entry and returned on exit (commit,
+    or rollback on error), so none is held while the caller awaits API or
+    Telegram calls afterwards. A transaction the session already had open
+    is finished by the unit as well. Loaded objects stay usable
+    (expire_on_commit=False).
+    
+    Args:
+        session: Database session
+    
+    Yields:
+        The same session
+    """
+    if not session.in_transaction():
+        started = time.perf_counter()
+        await session.connection()
+        wait = time.perf_counter() - started
+        _acquire_counters["acquired"] += 1
+        _acquire_counters["wait_total"] += wait
+        _acquire_counters["wait_max"] = max(_acquire_counters["wait_max"], wait)
+    
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Open a session running a single unit of work (see unit_of_work)."""
+    async with async_session_maker() as session:
+        async with unit_of_work(session):
+            yield session
+
+
+def db_pool_stats() -> Dict[str, float]:
+    """
+    Get database connection pool statistics.
+    
+    Returns:
+        Dict with pool 'size', 'checked_out' and 'overflow' connections, and
+        'acquired', 'wait_avg_ms', 'wait_max_ms' of connections taken by
+        units of work (pool wait plus connect when the pool opens one).
+    """
+    acquired = _acquire_counters["acquired"]
+    return {
+        "size": engine.pool.size(),
+        "checked_out": engine.pool.checkedout(),
+        "overflow": engine.pool.overflow(),
+        "acquired": acquired,
+        "wait_avg_ms": round(_acquire_counters["wait_total"] / acquired * 1000, 2) if acquired else 0.0,
+        "wait_max_ms": round(_acquire_counters["wait_max"] * 1000, 2)
+    }
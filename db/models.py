@@ -1,10 +1,12 @@
 """SQLAlchemy models for the lottery bot."""
 from datetime import datetime, date
-from sqlalchemy import BigInteger, String, DateTime, Integer, ARRAY, ForeignKey, Numeric, Date, Text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import BigInteger, String, DateTime, Integer, ARRAY, ForeignKey, Numeric, Date, Text, Index
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, validates
 from typing import List, Optional
 import json
 
+from services.ticket_checker import numbers_to_mask
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -28,6 +30,12 @@ class User(Base):
     birthday: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     sex: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 0=female, 1=male, null=unknown
     available_tickets: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, default=0)
+    # Bumped in SQL whenever tickets or available_tickets change (render cache key)
+    tickets_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Last API sync of the tickets view and hash of the payload applied then
+    # (cleared by local ticket changes, see bump_tickets_version)
+    tickets_synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    tickets_payload_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     additional_fields: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -66,6 +74,7 @@ class Ticket(Base):
     customer_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # API customer ID
     draw_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)  # API draw ID
     numbers: Mapped[Optional[List[int]]] = mapped_column(ARRAY(Integer), nullable=True)
+    numbers_mask: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # bit n-1 set for number n
     status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, active, won, lost
     is_winner: Mapped[Optional[bool]] = mapped_column(nullable=True, default=False)
     matched_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, default=0)
@@ -78,6 +87,17 @@ class Ticket(Base):
     # Relationship
     user: Mapped["User"] = relationship("User", back_populates="tickets")
     
+    __table_args__ = (
+        # Settlement and match counting scan a draw's masks only
+        Index("ix_tickets_draw_id_numbers_mask", "draw_id", "numbers_mask"),
+    )
+    
+    @validates("numbers")
+    def _sync_numbers_mask(self, key, numbers):
+        """Keep numbers_mask in sync whenever numbers are assigned."""
+        self.numbers_mask = numbers_to_mask(numbers) if numbers else None
+        return numbers
+    
     def __repr__(self) -> str:
         return f"<Ticket(id={self.id}, draw_id={self.draw_id}, numbers={self.numbers}, is_winner={self.is_winner})>"
 
@@ -101,6 +121,7 @@ class Draw(Base):
     prize_grid: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string
     winning_numbers: Mapped[Optional[List[int]]] = mapped_column(ARRAY(Integer), nullable=True)
     statistics: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string
+    results_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # draw_results materialised
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow, nullable=True)
     
@@ -126,3 +147,63 @@ class Draw(Base):
             return json.loads(self.statistics)
         except (json.JSONDecodeError, TypeError):
             return {}
+
+
+class DrawResult(Base):
+    """Per-user results of a completed draw, materialised once after settlement."""
+    
+    __tablename__ = "draw_results"
+    
+    draw_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # API draw ID
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    ticket_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    winning_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    best_match: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_prize: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0.0)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)  # rendered message
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<DrawResult(draw_id={self.draw_id}, user_id={self.user_id}, total_prize={self.total_prize})>"
+
+
+class FsmState(Base):
+    """Bot FSM state and data per storage key (see bot.fsm_storage)."""
+    
+    __tablename__ = "fsm_states"
+    
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)  # bot:chat:user:thread:business:destiny
+    state: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    data: Mapped[str] = mapped_column(Text, nullable=False, default="{}")  # JSON string
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<FsmState(key={self.key}, state={self.state})>"
+
+
+class BroadcastMessage(Base):
+    """Queued outgoing bot message of a broadcast (see services.broadcast)."""
+    
+    __tablename__ = "broadcast_messages"
+    
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    broadcast: Mapped[str] = mapped_column(String(100), nullable=False)  # e.g. draw:77:results
+    telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # message text (HTML)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # One message per recipient and broadcast, re-enqueueing is a no-op
+        Index("ux_broadcast_messages_broadcast_telegram_id", "broadcast", "telegram_id", unique=True),
+        # Senders claim unfinished messages in queue order
+        Index("ix_broadcast_messages_status_id", "status", "id"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<BroadcastMessage(id={self.id}, broadcast={self.broadcast}, telegram_id={self.telegram_id}, status={self.status})>"
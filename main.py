@@ -1,15 +1,16 @@
 """Main entry point for the lottery bot."""
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
 
 from config import settings
-from db.database import init_db
-from bot.middleware import DatabaseMiddleware
-from bot.handlers import start, ticket, create_ticket
-from services.draw_sync import draw_sync_worker
+from db.database import db_pool_stats, init_db
+from bot.dispatcher import create_bot, create_dispatcher
+from bot.webhook import run_webhook
+from services.broadcast import BroadcastSender
+from services.draw_scheduler import DrawScheduler
+from services.draw_settlement import shutdown_settlement_pool
+from services.ticket_sync import ticket_sync_stats
+from api.client import api_client
 
 
 # Configure logging
@@ -26,21 +27,9 @@ async def main():
     logger.info(f"API Base URL: {settings.api_base_url}")
     logger.info(f"Database: {settings.database_url.split('@')[1] if '@' in settings.database_url else 'local'}")
     
-    # Initialize bot and dispatcher
-    bot = Bot(
-        token=settings.telegram_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-    )
-    dp = Dispatcher()
-    
-    # Register middleware
-    dp.message.middleware(DatabaseMiddleware())
-    dp.callback_query.middleware(DatabaseMiddleware())
-    
-    # Register routers
-    dp.include_router(start.router)
-    dp.include_router(create_ticket.router)
-    dp.include_router(ticket.router)
+    # Initialize bot and dispatcher (middleware and routers registered)
+    bot = create_bot()
+    dp = create_dispatcher()
     logger.info("Handlers registered")
     
     # Initialize database
@@ -48,18 +37,39 @@ async def main():
     await init_db()
     logger.info("Database initialized successfully")
     
-    # Start background draw synchronizer
-    logger.info("Starting draw synchronizer...")
-    sync_task = asyncio.create_task(draw_sync_worker(interval=300))  # Sync every 5 minutes
-    logger.info("Draw synchronizer started")
+    # Open pooled HTTP session for external API
+    await api_client.start()
+    
+    # Start draw lifecycle scheduler (sync, auto-fill at close, settlement on results)
+    logger.info("Starting draw scheduler...")
+    scheduler_task = asyncio.create_task(DrawScheduler().run())
+    logger.info("Draw scheduler started")
+    
+    # Deliver queued broadcasts (draw results notifications) within Telegram limits
+    broadcast_task = asyncio.create_task(BroadcastSender(bot).run())
     
-    # Start polling
-    logger.info("Bot started successfully! Polling for updates...")
     try:
-        await dp.start_polling(bot)
+        if settings.bot_mode == "webhook":
+            logger.info(f"Bot started successfully! Serving webhook ({settings.webhook_workers} worker(s))...")
+            await run_webhook(bot, dp)
+        else:
+            # Polling does not work while a webhook is set
+            await bot.delete_webhook()
+            logger.info("Bot started successfully! Polling for updates...")
+            await dp.start_polling(bot)
     finally:
-        sync_task.cancel()
+        scheduler_task.cancel()
+        broadcast_task.cancel()
+        shutdown_settlement_pool()
+        logger.info(f"Throttling stats: {dp['throttling'].stats}")
+        logger.info(f"Ticket sync stats: {ticket_sync_stats()}")
+        logger.info(f"Database pool stats: {db_pool_stats()}")
+        logger.info(f"API connection pool stats: {api_client.pool_stats()}")
+        logger.info(f"API cache stats: {api_client.cache_stats()}")
+        logger.info(f"API resilience stats: {api_client.resilience_stats()}")
+        await api_client.close()
         await bot.session.close()
+        await dp.storage.close()
 
 
 if __name__ == "__main__":
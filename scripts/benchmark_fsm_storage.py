@@ -0,0 +1,83 @@
+"""Benchmark FSM storages with concurrent number-selection conversations."""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import text
+
+from db.database import engine
+from bot.fsm_storage import PostgresStorage
+from bot.handlers.create_ticket import NumberSelection
+
+BOT_ID = 1
+
+
+async def conversation(storage: BaseStorage, user_id: int, rounds: int) -> int:
+    """
+    Replay the number selection flow as handlers and filters do it.
+    
+    Returns:
+        Number of state transitions made
+    """
+    state = FSMContext(storage, StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id))
+    transitions = 0
+    for _ in range(rounds):
+        # "🎯 Выбрать числа"
+        await state.get_state()
+        await state.set_state(NumberSelection.choosing_method)
+        await state.update_data(customer_id=user_id)
+        # "manual_numbers" callback
+        await state.get_state()
+        await state.set_state(NumberSelection.entering_numbers)
+        # numbers message
+        await state.get_state()
+        data = await state.get_data()
+        assert data["customer_id"] == user_id
+        await state.clear()
+        transitions += 3
+    return transitions
+
+
+async def run(name: str, storage: BaseStorage, users: int, rounds: int):
+    """Run all conversations concurrently and print throughput."""
+    started = time.perf_counter()
+    results = await asyncio.gather(*(conversation(storage, 1_000_000 + i, rounds) for i in range(users)))
+    elapsed = time.perf_counter() - started
+    transitions = sum(results)
+    
+    print(f"{name:<28} {transitions / elapsed:>10,.0f} transitions/s  ({elapsed:.2f}s)")
+    if isinstance(storage, PostgresStorage):
+        print(f"{'':<28} {storage.stats}")
+    await storage.close()
+
+
+async def main(users: int, rounds: int):
+    """Compare memory storage with PostgreSQL storage (with and without cache)."""
+    print(f"{users} concurrent users x {rounds} conversations (3 transitions each)")
+    print(f"{'='*50}")
+    await run("MemoryStorage", MemoryStorage(), users, rounds)
+    await run("PostgresStorage (no cache)", PostgresStorage(cache_ttl=0), users, rounds)
+    await run("PostgresStorage (cache 1s)", PostgresStorage(cache_ttl=1.0), users, rounds)
+    print(f"{'='*50}")
+    
+    # Leftovers of the benchmark (cleared rows) are removed by expiry as well
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM fsm_states WHERE key LIKE :prefix"), {"prefix": f"{BOT_ID}:%"})
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=40)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.users, args.rounds))
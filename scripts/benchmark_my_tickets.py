@@ -0,0 +1,174 @@
+"""Benchmark "🎫 Мои ваучеры" handler latency against a local stub API."""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable
+
+import numpy as np
+from aiohttp import web
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, select
+
+from api.client import api_client
+from bot.handlers.ticket import show_my_tickets
+from db.crud_draws import get_current_draw
+from db.database import async_session_maker, db_pool_stats, engine
+from db.models import Ticket, User
+from services.ticket_sync import ticket_sync_stats
+
+# Benchmark users and API customers live in their own ID ranges
+TELEGRAM_ID_BASE = 900_000_000
+CUSTOMER_ID_BASE = 900_000
+TICKETS_PER_USER = 3
+
+
+def create_stub_api(api_delay: float, draw_id: int) -> web.Application:
+    """API answering customer and tickets requests after api_delay seconds."""
+    async def customers(request: web.Request) -> web.Response:
+        await asyncio.sleep(api_delay)
+        index = int(request.query["phone"][-6:])
+        return web.json_response({"success": True, "customer": {
+            "id": CUSTOMER_ID_BASE + index, "name": "Benchmark", "available_tickets": 2
+        }})
+    
+    async def tickets(request: web.Request) -> web.Response:
+        await asyncio.sleep(api_delay)
+        customer_id = int(request.match_info["customer_id"])
+        return web.json_response({"success": True, "data": [
+            {
+                "id": customer_id * 10 + k,
+                "customer_id": customer_id,
+                "draw_id": draw_id,
+                "numbers": [k + 1, 12, 19, 27, 33, 41] if k else None
+            }
+            for k in range(TICKETS_PER_USER)
+        ]})
+    
+    app = web.Application()
+    app.router.add_get("/customers", customers)
+    app.router.add_get("/customers/{customer_id}/tickets", tickets)
+    return app
+
+
+class FakeMessage:
+    """
+    Incoming message; every Bot API call takes telegram_delay seconds.
+    
+    Like aiogram methods, calls return awaitables that are not coroutines.
+    """
+    
+    def __init__(self, telegram_id: int, telegram_delay: float):
+        self.from_user = SimpleNamespace(id=telegram_id)
+        self._delay = telegram_delay
+    
+    def answer(self, text: str, **kwargs) -> Awaitable["FakeMessage"]:
+        return asyncio.ensure_future(asyncio.sleep(self._delay, result=self))
+    
+    def delete(self) -> Awaitable[bool]:
+        return asyncio.ensure_future(asyncio.sleep(self._delay, result=True))
+
+
+async def view(telegram_id: int, telegram_delay: float) -> float:
+    """Handle one tickets view (reply included) and return its latency."""
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        reply = await show_my_tickets(FakeMessage(telegram_id, telegram_delay), session)
+        if reply is not None:
+            await reply
+    return time.perf_counter() - started
+
+
+async def cleanup(users: int):
+    """Remove benchmark users and their tickets."""
+    user_ids = select(User.id).where(User.telegram_id.between(TELEGRAM_ID_BASE, TELEGRAM_ID_BASE + users))
+    async with async_session_maker() as session:
+        await session.execute(delete(Ticket).where(Ticket.user_id.in_(user_ids)))
+        await session.execute(delete(User).where(User.telegram_id.between(TELEGRAM_ID_BASE, TELEGRAM_ID_BASE + users)))
+        await session.commit()
+
+
+async def main(
+    views: int,
+    rounds: int,
+    concurrency: int,
+    api_delay: float,
+    telegram_delay: float,
+    port: int,
+    new_users: bool
+):
+    """Time views of distinct users (API cache misses) and print percentiles."""
+    async with async_session_maker() as session:
+        current_draw = await get_current_draw(session)
+        draw_id = current_draw.external_id if current_draw else None
+        
+        await cleanup(views)
+        session.add_all([
+            User(
+                telegram_id=TELEGRAM_ID_BASE + i,
+                phone=f"7999{i:06d}",
+                # Returning users already have their customer ID from an earlier sync
+                external_id=None if new_users else str(CUSTOMER_ID_BASE + i)
+            )
+            for i in range(views)
+        ])
+        await session.commit()
+    
+    runner = web.AppRunner(create_stub_api(api_delay, draw_id))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    api_client.base_url = f"http://127.0.0.1:{port}"
+    await api_client.start()
+    
+    print(f"{views} {'new' if new_users else 'returning'} users x {rounds} views, {concurrency} concurrent, API {api_delay * 1000:.0f}ms, Telegram {telegram_delay * 1000:.0f}ms")
+    
+    try:
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def timed_view(i: int) -> float:
+            async with semaphore:
+                return await view(TELEGRAM_ID_BASE + i, telegram_delay)
+        
+        # Rounds after the first repeat views within TICKET_SYNC_FRESHNESS
+        started = time.perf_counter()
+        latencies = []
+        for _ in range(rounds):
+            latencies.extend(await asyncio.gather(*(timed_view(i) for i in range(views))))
+        elapsed = time.perf_counter() - started
+        latencies = np.array(latencies) * 1000
+        pool_stats = db_pool_stats()
+    finally:
+        await api_client.close()
+        await runner.cleanup()
+        await cleanup(views)
+        await engine.dispose()
+    
+    print(f"{'='*50}")
+    print(f"p50: {np.percentile(latencies, 50):.1f}ms")
+    print(f"p99: {np.percentile(latencies, 99):.1f}ms")
+    print(f"max: {latencies.max():.1f}ms")
+    print(f"Throughput: {views * rounds / elapsed:.1f} views/s")
+    print(f"Ticket sync: {ticket_sync_stats()}")
+    print(f"Database pool: {pool_stats}")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--views", type=int, default=200, help="Users, each viewing once per round")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--api-delay", type=float, default=0.05, help="Stub API response time, seconds")
+    parser.add_argument("--telegram-delay", type=float, default=0.03, help="Simulated Bot API call time, seconds")
+    parser.add_argument("--port", type=int, default=18090, help="Stub API port")
+    parser.add_argument("--new-users", action="store_true", help="Users without customer ID (first sync)")
+    args = parser.parse_args()
+    
+    asyncio.run(main(
+        args.views, args.rounds, args.concurrency, args.api_delay, args.telegram_delay, args.port, args.new_users
+    ))
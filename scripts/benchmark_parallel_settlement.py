@@ -0,0 +1,56 @@
+"""Scaling benchmark of parallel draw settlement for 1..N worker processes."""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.database import engine
+from services.draw_settlement import settle_draw, settle_draw_parallel, DrawNotSettleableError
+
+
+async def benchmark(draw_id: int, max_workers: int, chunk_size: int = None):
+    """Settle the same draw in-process and with 1..max_workers processes."""
+    try:
+        baseline = await settle_draw(draw_id, chunk_size=chunk_size)
+    except DrawNotSettleableError as e:
+        print(f"✗ {e}")
+        await engine.dispose()
+        return
+    
+    print(f"Draw {draw_id}: {baseline.tickets:,} tickets, {baseline.winners:,} winners")
+    print(f"\n{'='*60}")
+    print(f"{'workers':>8} {'time, s':>10} {'tickets/s':>15} {'speedup':>10}")
+    print(f"{'in-proc':>8} {baseline.elapsed:>10.2f} {baseline.tickets / baseline.elapsed:>15,.0f} {1:>10.2f}")
+    
+    for workers in range(1, max_workers + 1):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Warm up worker processes so imports are not measured
+            await asyncio.gather(*[
+                asyncio.get_running_loop().run_in_executor(pool, os.getpid) for _ in range(workers)
+            ])
+            summary = await settle_draw_parallel(draw_id, workers=workers, chunk_size=chunk_size, executor=pool)
+        
+        assert summary.tier_counts == baseline.tier_counts, "tier counts differ from in-process settlement"
+        print(
+            f"{workers:>8} {summary.elapsed:>10.2f} {summary.tickets / summary.elapsed:>15,.0f} "
+            f"{baseline.elapsed / summary.elapsed:>10.2f}"
+        )
+    
+    print(f"{'='*60}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, help="Completed draw ID in API")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    
+    asyncio.run(benchmark(args.draw_id, args.max_workers, args.chunk_size))
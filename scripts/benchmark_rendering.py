@@ -0,0 +1,87 @@
+"""Benchmark rendering of the "🎫 Мои ваучеры" view: legacy concatenation vs renderer vs render cache."""
+import argparse
+import random
+import sys
+import timeit
+from collections import namedtuple
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot import messages
+from bot.rendering import cache_render, get_cached_render, render_my_tickets
+
+# Columns loaded for the view (see get_user_ticket_rows)
+TicketRow = namedtuple("TicketRow", "numbers is_winner matched_count prize_amount")
+
+
+def legacy_render(draw_name: str, draw_completed: bool, tickets: list, available_count: int) -> str:
+    """Previous handler code: += concatenation, numbers sorted on every view."""
+    total_count = available_count + len(tickets)
+    response = f"🎫 <b>Ваши ваучеры</b>\n"
+    response += f"📋 {draw_name}\n"
+    response += f"Всего ваучеров: <b>{total_count}</b>\n\n"
+    if tickets:
+        response += f"<b>✅ Заполненные ваучеры ({len(tickets)}):</b>\n\n"
+        for idx, ticket in enumerate(tickets, 1):
+            response += f"<b>Ваучер #{idx}</b>\n"
+            if ticket.numbers:
+                response += f"   🎯 Числа: {messages.format_numbers(ticket.numbers)}\n"
+                if ticket.is_winner:
+                    response += f"   🏆 <b>ВЫИГРЫШ: {int(ticket.prize_amount)} руб!</b>\n"
+                    response += f"   ✅ Совпадений: {ticket.matched_count}\n"
+                elif draw_completed:
+                    response += f"   😔 Совпадений: {ticket.matched_count}\n"
+            response += "\n"
+    if available_count > 0:
+        response += f"<b>📝 Доступно для заполнения: {available_count}</b>\n"
+        response += f"💡 Выберите числа для своих ваучеров через раздел '🎯 Выбрать числа'\n\n"
+    winners = [t for t in tickets if t.is_winner]
+    if winners:
+        total_prize = sum(t.prize_amount for t in winners)
+        response += f"\n💰 <b>Общий выигрыш: {int(total_prize)} руб!</b>\n"
+    return response
+
+
+def make_tickets(count: int, rnd: random.Random) -> list:
+    """Filled tickets, every tenth a winner."""
+    tickets = []
+    for i in range(count):
+        winner = i % 10 == 0
+        tickets.append(TicketRow(
+            numbers=sorted(rnd.sample(range(1, 46), 6)),
+            is_winner=winner,
+            matched_count=rnd.randint(3, 6) if winner else rnd.randint(0, 2),
+            prize_amount=1500.0 if winner else 0.0
+        ))
+    return tickets
+
+
+def main(sizes: list, repeat: int):
+    """Time one view per ticket count and print microseconds per render."""
+    rnd = random.Random(1)
+    print(f"{'tickets':>8} {'legacy':>12} {'renderer':>12} {'cache hit':>12}")
+    print(f"{'='*50}")
+    for size in sizes:
+        args = ("Розыгрыш №1", True, make_tickets(size, rnd), 3)
+        assert render_my_tickets(*args) == legacy_render(*args)
+        
+        key = (1, 1, size)
+        cache_render(key, render_my_tickets(*args))
+        timings = [
+            min(timeit.repeat(lambda: render(*args), number=repeat, repeat=5)) / repeat * 1e6
+            for render in (legacy_render, render_my_tickets)
+        ]
+        timings.append(min(timeit.repeat(lambda: get_cached_render(key), number=repeat, repeat=5)) / repeat * 1e6)
+        print(f"{size:>8} " + " ".join(f"{t:>10.1f}us" for t in timings))
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    
+    main(args.sizes, args.repeat)
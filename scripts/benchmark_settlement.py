@@ -0,0 +1,61 @@
+"""Benchmark vectorized draw settlement against the set-based ticket checker."""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.ticket_checker import check_ticket_result
+from services.settlement_engine import masks_from_numbers, settle_masks, random_combinations
+
+
+def benchmark(tickets_count: int, baseline_count: int, seed: int):
+    """Compare tickets/second of check_ticket_result and settle_masks."""
+    rng = np.random.default_rng(seed)
+    winning_numbers = random_combinations(1, rng)[0].tolist()
+    
+    print(f"🎲 Generating {tickets_count:,} random tickets...")
+    combinations = random_combinations(tickets_count, rng)
+    masks = masks_from_numbers(combinations)
+    
+    # Baseline: set-based checker, one ticket at a time
+    baseline_tickets = combinations[:baseline_count].tolist()
+    start = time.perf_counter()
+    baseline = [check_ticket_result(numbers, winning_numbers) for numbers in baseline_tickets]
+    baseline_time = time.perf_counter() - start
+    baseline_rate = baseline_count / baseline_time
+    
+    # Vectorized engine over the whole draw
+    start = time.perf_counter()
+    result = settle_masks(masks, winning_numbers)
+    vectorized_time = time.perf_counter() - start
+    vectorized_rate = tickets_count / vectorized_time
+    
+    # Results must agree with the reference implementation
+    expected = np.array([matches for matches, _ in baseline], dtype=np.uint8)
+    expected_prize = np.array([prize for _, prize in baseline], dtype=np.int64)
+    assert np.array_equal(result.matched_count[:baseline_count], expected), "matched_count mismatch"
+    assert np.array_equal(result.prize_amount[:baseline_count], expected_prize), "prize_amount mismatch"
+    
+    print(f"\nWinning numbers: {winning_numbers}")
+    print(f"Tier counts: {result.tier_counts}")
+    print(f"Total prize: {result.total_prize:,}")
+    print(f"\n{'='*60}")
+    print(f"check_ticket_result: {baseline_rate:>15,.0f} tickets/s ({baseline_count:,} tickets)")
+    print(f"settle_masks:        {vectorized_rate:>15,.0f} tickets/s ({tickets_count:,} tickets)")
+    print(f"Speedup:             {vectorized_rate / baseline_rate:>15,.1f}x")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=5_000_000, help="Tickets in the simulated draw")
+    parser.add_argument("--baseline", type=int, default=200_000, help="Tickets checked with the set-based function")
+    parser.add_argument("--seed", type=int, default=645)
+    args = parser.parse_args()
+    
+    benchmark(args.tickets, min(args.baseline, args.tickets), args.seed)
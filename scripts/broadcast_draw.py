@@ -0,0 +1,59 @@
+"""Script to queue (and optionally send) results notifications of a completed draw."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.dispatcher import create_bot
+from db.database import engine
+from services.broadcast import BroadcastSender, broadcast_progress, draw_results_broadcast, enqueue_draw_results
+
+
+def print_progress(done: int, remaining: int):
+    """Print delivery progress on one line."""
+    total = done + remaining
+    percent = done / total * 100 if total else 100.0
+    print(f"\r   Delivered: {done}/{total} ({percent:.0f}%)", end="", flush=True)
+
+
+async def broadcast_draw(draw_id: int, send: bool = False, rate: float = None):
+    """Queue draw results broadcast and deliver it if requested."""
+    broadcast = draw_results_broadcast(draw_id)
+    queued = await enqueue_draw_results(draw_id)
+    print(f"📨 Broadcast {broadcast}: {queued} new messages queued")
+    
+    stats = None
+    if send:
+        bot = create_bot()
+        sender = BroadcastSender(bot, rate=rate)
+        try:
+            stats = await sender.drain(progress=print_progress, broadcast=broadcast)
+        finally:
+            await bot.session.close()
+    
+    counts = await broadcast_progress(broadcast)
+    await engine.dispose()
+    
+    print(f"\n{'='*50}")
+    print(f"Broadcast {broadcast}")
+    print(f"  Sent: {counts['sent']}")
+    print(f"  Failed: {counts['failed']}")
+    print(f"  Pending: {counts['pending'] + counts['sending']}")
+    if stats:
+        print(f"  This run: {stats.sent} sent, {stats.failed} failed, {stats.retried} rescheduled")
+        print(f"  Flood waits: {stats.retry_after} ({stats.retry_after_seconds:.0f}s)")
+        print(f"  Rate: {stats.rate:.1f} msg/s")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, help="Draw ID in API")
+    parser.add_argument("--send", action="store_true", help="Deliver queued messages now instead of leaving them to the bot")
+    parser.add_argument("--rate", type=float, default=None, help="Messages per second (default: BROADCAST_RATE)")
+    args = parser.parse_args()
+    
+    asyncio.run(broadcast_draw(args.draw_id, args.send, args.rate))
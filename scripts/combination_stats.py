@@ -0,0 +1,54 @@
+"""Script to show combination popularity of a draw (jackpot sharers, duplicates, top picks)."""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.database import async_session_maker, engine
+from db.crud_draws import get_draw_by_external_id
+from services.combination_counter import CombinationCounter, build_combination_counter
+
+
+async def main(draw_id: int, top: int, min_duplicates: int, path: str = None, rebuild: bool = False):
+    """Build or open combination counter of a draw and print statistics."""
+    async with async_session_maker() as session:
+        draw = await get_draw_by_external_id(session, draw_id)
+        
+        start = time.perf_counter()
+        if path and Path(path).exists() and not rebuild:
+            counter = CombinationCounter.open(draw_id, path)
+            print(f"Counter opened from {path} ({time.perf_counter() - start:.2f}s)")
+        else:
+            counter = await build_combination_counter(session, draw_id, path)
+            print(f"Counter built: {counter.total()} tickets ({time.perf_counter() - start:.2f}s)")
+    
+    await engine.dispose()
+    
+    print(f"\n{'='*50}")
+    if draw and draw.winning_numbers:
+        print(f"Winning numbers {draw.winning_numbers} picked by {counter.count(draw.winning_numbers)} ticket(s)")
+    
+    print(f"\nTop {top} combinations:")
+    for numbers, count in counter.top(top):
+        print(f"  {numbers}: {count}")
+    
+    duplicates = counter.duplicates(min_duplicates)
+    print(f"\nCombinations picked ≥{min_duplicates} times: {len(duplicates)}")
+    for numbers, count in duplicates[:top]:
+        print(f"  {numbers}: {count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, help="Draw ID in API")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--min-duplicates", type=int, default=10, help="Report combinations picked at least this often")
+    parser.add_argument("--file", help="Memory-mapped counter file (opened if exists, else built and saved)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild counter file from tickets")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.draw_id, args.top, args.min_duplicates, args.file, args.rebuild))
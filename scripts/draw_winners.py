@@ -0,0 +1,78 @@
+"""Script to count and list draw winners using the inverted ticket index."""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from db.database import async_session_maker, engine
+from db.crud_draws import get_draw_by_external_id
+from db.models import Ticket, User
+from services.ticket_index import DrawTicketIndex, build_draw_index
+
+
+async def main(draw_id: int, numbers: list, min_matches: int, limit: int, load: str = None, save: str = None):
+    """Build (or load) index of a draw and print winners."""
+    async with async_session_maker() as session:
+        if not numbers:
+            draw = await get_draw_by_external_id(session, draw_id)
+            numbers = draw.winning_numbers if draw else None
+        if not numbers:
+            print(f"✗ Draw {draw_id} has no winning numbers, pass --numbers")
+            await engine.dispose()
+            return
+        
+        start = time.perf_counter()
+        if load:
+            index = DrawTicketIndex.from_bytes(Path(load).read_bytes())
+            print(f"Index loaded from {load}: {len(index)} tickets ({time.perf_counter() - start:.2f}s)")
+        else:
+            index = await build_draw_index(session, draw_id)
+            print(f"Index built: {len(index)} tickets ({time.perf_counter() - start:.2f}s)")
+        
+        if save:
+            Path(save).write_bytes(index.to_bytes())
+            print(f"Index saved to {save}")
+        
+        start = time.perf_counter()
+        tier_counts = index.tier_counts(numbers)
+        ticket_ids = index.tickets_matching(numbers, min_matches)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        print(f"\n{'='*50}")
+        print(f"Numbers: {numbers}")
+        for matches in sorted(tier_counts, reverse=True):
+            print(f"  {matches} matches: {tier_counts[matches]}")
+        print(f"Tickets with ≥{min_matches} matches: {len(ticket_ids)} ({elapsed_ms:.1f} ms)")
+        
+        if ticket_ids and limit:
+            result = await session.execute(
+                select(Ticket.id, Ticket.external_id, Ticket.numbers, User.telegram_id, User.phone)
+                .join(User, Ticket.user_id == User.id)
+                .where(Ticket.id.in_(ticket_ids[:limit]))
+                .order_by(Ticket.id)
+            )
+            for row in result.all():
+                print(f"  #{row.external_id} {row.numbers} — user {row.telegram_id} ({row.phone})")
+            if len(ticket_ids) > limit:
+                print(f"  ... and {len(ticket_ids) - limit} more")
+    
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, help="Draw ID in API")
+    parser.add_argument("--numbers", type=int, nargs="+", help="Combination to check (default: winning numbers)")
+    parser.add_argument("--min-matches", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20, help="Winners to list")
+    parser.add_argument("--load", help="Load serialized index instead of building it")
+    parser.add_argument("--save", help="Save built index to file")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.draw_id, args.numbers, args.min_matches, args.limit, args.load, args.save))
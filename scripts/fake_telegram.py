@@ -0,0 +1,87 @@
+"""Fake Telegram sender: load-test the webhook server offline."""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import settings
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict:
+    """Build a private text message update as Telegram sends it."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": "Load"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Load"},
+            "text": text
+        }
+    }
+
+
+async def send_updates(url: str, updates: int, concurrency: int, users: int, text: str, secret: str):
+    """POST updates to webhook and print throughput and latency."""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    latencies = []
+    statuses = {}
+    inline_answers = 0
+    queue = asyncio.Queue()
+    for update_id in range(1, updates + 1):
+        queue.put_nowait(make_update(update_id, 10_000_000 + update_id % users, text))
+
+    async def worker(session: aiohttp.ClientSession):
+        nonlocal inline_answers
+        while not queue.empty():
+            update = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                async with session.post(url, json=update, headers=headers) as response:
+                    body = await response.read()
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+                    # Method answered in the webhook response (multipart "method" field)
+                    if b'name="method"' in body:
+                        inline_answers += 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    print(f"📨 Sending {updates} updates to {url} ({concurrency} concurrent)...")
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    print(f"\n{'='*50}")
+    print(f"Updates: {updates} in {elapsed:.2f}s ({updates / elapsed:.0f} updates/s)")
+    print(f"Latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+    print(f"Statuses: {statuses}")
+    print(f"Answered in webhook response: {inline_answers}")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--url",
+        default=f"http://127.0.0.1:{settings.webhook_port}{settings.webhook_path}",
+        help="Webhook URL (default: local webhook server)"
+    )
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=100, help="Distinct fake Telegram users")
+    parser.add_argument("--text", default="❓ Частые вопросы", help="Message text (button) to send")
+    parser.add_argument("--secret", default=settings.webhook_secret)
+    args = parser.parse_args()
+
+    asyncio.run(send_updates(args.url, args.updates, args.concurrency, args.users, args.text, args.secret))
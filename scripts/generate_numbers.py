@@ -1,4 +1,5 @@
 """Script to auto-generate numbers for tickets without numbers at draw start."""
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -6,32 +7,53 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from db.database import async_session_maker
-from db.crud import get_tickets_without_numbers, update_ticket_numbers
-from services.draw_service import generate_random_numbers, get_current_draw_id
+from api.client import api_client
+from db.database import async_session_maker, engine
+from db.crud_draws import get_current_draw
+from services.number_autofill import autofill_draw
 
 
-async def auto_generate_missing_numbers():
+def print_progress(phase: str, done: int, total: int):
+    """Print progress of a phase on one line."""
+    label = "Generating" if phase == "generate" else "Pushing to API"
+    percent = done / total * 100 if total else 100.0
+    print(f"\r   {label}: {done}/{total} ({percent:.0f}%)", end="", flush=True)
+
+
+async def auto_generate_missing_numbers(draw_id: int = None, chunk_size: int = None, push: bool = True):
     """Generate numbers for all tickets that don't have numbers yet."""
-    draw_id = get_current_draw_id()
-    
-    async with async_session_maker() as session:
-        # Get tickets without numbers
-        tickets = await get_tickets_without_numbers(session, draw_id)
-        
-        if not tickets:
-            print(f"✅ No tickets without numbers for draw {draw_id}")
+    if draw_id is None:
+        async with async_session_maker() as session:
+            draw = await get_current_draw(session)
+        if not draw:
+            print("✗ No current draw found")
+            await engine.dispose()
             return
-        
-        print(f"🎲 Generating numbers for {len(tickets)} tickets...")
-        
-        for ticket in tickets:
-            numbers = generate_random_numbers()
-            await update_ticket_numbers(session, ticket.id, numbers)
-            print(f"   Ticket #{ticket.id}: {numbers}")
-        
-        print(f"✅ Successfully generated numbers for {len(tickets)} tickets!")
+        draw_id = draw.external_id
+    
+    print(f"🎲 Generating numbers for draw {draw_id}...")
+    try:
+        summary = await autofill_draw(draw_id, chunk_size=chunk_size, push=push, progress=print_progress)
+    finally:
+        await api_client.close()
+        await engine.dispose()
+    
+    print(f"\n{'='*50}")
+    print(f"Draw {draw_id}")
+    print(f"  Generated: {summary.generated}")
+    if push:
+        print(f"  Pushed to API: {summary.pushed}")
+        print(f"  Failed (retried on next run): {summary.push_failed}")
+        print(f"  Without customer ID: {summary.skipped}")
+    print(f"  Time: {summary.elapsed:.2f}s")
+    print(f"{'='*50}")
 
 
 if __name__ == "__main__":
-    asyncio.run(auto_generate_missing_numbers())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, nargs="?", help="Draw ID in API (default: current draw)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--no-push", action="store_true", help="Only fill numbers locally")
+    args = parser.parse_args()
+    
+    asyncio.run(auto_generate_missing_numbers(args.draw_id, args.chunk_size, not args.no_push))
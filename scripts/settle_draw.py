@@ -0,0 +1,48 @@
+"""Script to settle a completed draw locally."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.database import engine
+from services.draw_results import materialize_draw_results
+from services.draw_settlement import settle_draw, settle_draw_in_database, DrawNotSettleableError
+
+
+async def main(draw_id: int, chunk_size: int = None, in_database: bool = False):
+    """Settle draw and print summary."""
+    try:
+        if in_database:
+            summary = await settle_draw_in_database(draw_id)
+        else:
+            summary = await settle_draw(draw_id, chunk_size=chunk_size)
+        users = await materialize_draw_results(draw_id)
+    except DrawNotSettleableError as e:
+        print(f"✗ {e}")
+        return
+    finally:
+        await engine.dispose()
+    
+    print(f"\n{'='*50}")
+    print(f"Draw {summary.draw_id} settled")
+    print(f"  Winning numbers: {summary.winning_numbers}")
+    print(f"  Tickets: {summary.tickets} ({summary.chunks} chunks)")
+    print(f"  Winners: {summary.winners}")
+    print(f"  Total prize: {summary.total_prize}")
+    for matches, count in summary.tier_counts.items():
+        print(f"    {matches} matches: {count}")
+    print(f"  Results published for {users} users")
+    print(f"  Time: {summary.elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, help="Draw ID in API")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--sql", action="store_true", help="Count matches inside PostgreSQL with one UPDATE")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.draw_id, args.chunk_size, args.sql))
@@ -0,0 +1,94 @@
+"""Script to simulate prize liability of a draw's ticket pool (Monte-Carlo)."""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.database import async_session_maker, engine
+from db.crud_draws import get_draw_by_external_id, get_current_draw
+from services.liability_simulator import LiabilitySimulator, LiabilityReport, simulate_draw_liability
+from services.settlement_engine import count_matches, masks_from_numbers, prize_lookup_table, random_combinations
+
+
+def print_report(report: LiabilityReport):
+    """Print payout distribution."""
+    print(f"\n{'='*50}")
+    print(f"Mode: {report.mode}")
+    print(f"Tickets: {report.tickets:,}, simulations: {report.simulations:,} ({report.elapsed:.2f}s)")
+    print(f"  Mean: {report.mean:>18,.2f}")
+    print(f"  Std:  {report.std:>18,.2f}")
+    print(f"  p50:  {report.p50:>18,.2f}")
+    print(f"  p95:  {report.p95:>18,.2f}")
+    print(f"  p99:  {report.p99:>18,.2f}")
+    print(f"  Max:  {report.max:>18,.2f} (numbers {report.max_numbers})")
+    print("  Probability of at least one winner:")
+    for matches, rate in report.tier_hit_rate.items():
+        print(f"    {matches} matches: {rate:.4%}")
+
+
+async def simulate(draw_id: int, simulations: int, pari_mutuel: bool, seed: int = None):
+    """Simulate liability of a draw (current draw by default)."""
+    async with async_session_maker() as session:
+        draw = await get_draw_by_external_id(session, draw_id) if draw_id else await get_current_draw(session)
+        if not draw:
+            print("✗ Draw not found")
+        else:
+            print(f"Draw {draw.external_id}: {draw.name} ({draw.status})")
+            report = await simulate_draw_liability(session, draw, simulations, pari_mutuel, seed)
+            print_report(report)
+    
+    await engine.dispose()
+
+
+def benchmark(tickets: int, simulations: int, seed: int):
+    """Compare subset-table simulation with brute-force matching on a synthetic pool."""
+    rng = np.random.default_rng(seed)
+    print(f"🎲 Generating {tickets:,} random tickets...")
+    masks = masks_from_numbers(random_combinations(tickets, rng))
+    
+    start = time.perf_counter()
+    simulator = LiabilitySimulator(masks)
+    build_time = time.perf_counter() - start
+    
+    report = simulator.simulate(simulations, seed=seed)
+    
+    # Brute force: match the whole pool against each combination
+    brute_count = 50
+    prizes = prize_lookup_table()
+    winning = random_combinations(brute_count, rng)
+    start = time.perf_counter()
+    brute = [int(prizes[count_matches(masks, numbers.tolist())].sum()) for numbers in winning]
+    brute_rate = brute_count / (time.perf_counter() - start)
+    
+    # Both methods must agree on the same combinations
+    counts = simulator.tier_counts(winning)
+    fast = sum(counts[k] * int(prizes[k]) for k in counts)
+    assert fast.tolist() == brute, "subset-table payouts differ from brute force"
+    
+    print_report(report)
+    print(f"\n{'='*50}")
+    print(f"Subset tables build: {build_time:.2f}s")
+    print(f"Simulation:  {report.simulations / report.elapsed:>15,.0f} draws/s")
+    print(f"Brute force: {brute_rate:>15,.0f} draws/s")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("draw_id", type=int, nargs="?", help="Draw ID in API (default: current draw)")
+    parser.add_argument("--simulations", type=int, default=1_000_000)
+    parser.add_argument("--grid", action="store_true", help="Pari-mutuel payout from the draw's prize grid")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--benchmark", type=int, metavar="TICKETS", help="Benchmark on a synthetic pool instead")
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark(args.benchmark, args.simulations, args.seed or 0)
+    else:
+        asyncio.run(simulate(args.draw_id, args.simulations, args.grid, args.seed))
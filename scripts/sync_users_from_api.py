@@ -46,6 +46,8 @@ async def sync_all_users():
         print(f"  Synced: {synced_count}")
         print(f"  Failed: {failed_count}")
         print(f"  Total: {len(users)}")
+    
+    await api_client.close()
 
 
 if __name__ == "__main__":
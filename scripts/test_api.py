@@ -48,6 +48,9 @@ async def test_api():
         print("❌ Customer not found or API error")
         print("Check logs above for details")
     
+    print(f"Connection pool: {client.pool_stats()}")
+    await client.close()
+    
     print(f"\n{'='*60}\n")
 
 
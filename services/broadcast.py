@@ -0,0 +1,369 @@
+"""Persistent, rate-limited broadcasts of bot messages (e.g. draw results)."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from bot import messages
+from config import settings
+from db.database import async_session_maker
+from db.crud_draws import get_draw_by_external_id
+from db.models import BroadcastMessage
+from services.rate_limit import KeyedRateLimiter, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+# Rows per INSERT statement (6 bind parameters per row, asyncpg allows at most 32767)
+ENQUEUE_CHUNK_SIZE = 5000
+
+# Progress callback: (sent + failed so far, messages still queued)
+ProgressCallback = Callable[[int, int], None]
+
+# One message per user with filled tickets in the draw: the materialised
+# results message, or a generic notice if results are not materialised
+_ENQUEUE_DRAW_STATEMENT = text(
+    """
+    INSERT INTO broadcast_messages (broadcast, telegram_id, payload, status, attempts, created_at)
+    SELECT :broadcast, u.telegram_id, coalesce(r.summary, :fallback), 'pending', 0, :now
+    FROM users AS u
+    LEFT JOIN draw_results AS r ON r.draw_id = :draw_id AND r.user_id = u.id
+    WHERE EXISTS (
+        SELECT 1 FROM tickets AS t
+        WHERE t.user_id = u.id AND t.draw_id = :draw_id AND t.numbers IS NOT NULL
+    )
+    ON CONFLICT (broadcast, telegram_id) DO NOTHING
+    """
+)
+
+# Due pending messages plus messages of a sender that died mid-batch
+_CLAIM_STATEMENT = text(
+    """
+    UPDATE broadcast_messages AS m
+    SET status = 'sending', claimed_at = :now, attempts = m.attempts + 1
+    FROM (
+        SELECT id FROM broadcast_messages
+        WHERE ((status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= :now))
+           OR (status = 'sending' AND claimed_at < :stale_before))
+          AND (CAST(:broadcast AS varchar) IS NULL OR broadcast = CAST(:broadcast AS varchar))
+        ORDER BY id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) AS claimed
+    WHERE m.id = claimed.id
+    RETURNING m.id, m.broadcast, m.telegram_id, m.payload, m.attempts
+    """
+)
+
+_FINISH_STATEMENT = text(
+    """
+    UPDATE broadcast_messages AS m
+    SET status = v.status, error = v.error, next_attempt_at = v.next_attempt_at, sent_at = v.sent_at
+    FROM unnest(
+        CAST(:ids AS bigint[]),
+        CAST(:statuses AS varchar[]),
+        CAST(:errors AS text[]),
+        CAST(:next_attempts AS timestamp[]),
+        CAST(:sent AS timestamp[])
+    ) AS v(id, status, error, next_attempt_at, sent_at)
+    WHERE m.id = v.id
+    """
+)
+
+
+def draw_results_broadcast(draw_id: int) -> str:
+    """Broadcast name of a draw's results notification."""
+    return f"draw:{draw_id}:results"
+
+
+async def enqueue_broadcast(broadcast: str, recipients: Iterable[Tuple[int, str]]) -> int:
+    """
+    Queue messages of a broadcast.
+    
+    Args:
+        broadcast: Broadcast name
+        recipients: (telegram_id, payload) pairs
+    
+    Returns:
+        Number of messages queued (recipients already queued for the broadcast are skipped)
+    """
+    now = datetime.utcnow()
+    rows = [
+        {"broadcast": broadcast, "telegram_id": telegram_id, "payload": payload,
+         "status": "pending", "attempts": 0, "created_at": now}
+        for telegram_id, payload in recipients
+    ]
+    
+    queued = 0
+    async with async_session_maker() as session:
+        for start in range(0, len(rows), ENQUEUE_CHUNK_SIZE):
+            stmt = (
+                insert(BroadcastMessage)
+                .values(rows[start:start + ENQUEUE_CHUNK_SIZE])
+                .on_conflict_do_nothing(index_elements=[BroadcastMessage.broadcast, BroadcastMessage.telegram_id])
+                .returning(BroadcastMessage.id)
+            )
+            result = await session.execute(stmt)
+            queued += len(result.all())
+        await session.commit()
+    
+    logger.info(f"Broadcast {broadcast}: {queued} messages queued")
+    return queued
+
+
+async def enqueue_draw_results(draw_id: int) -> int:
+    """
+    Queue results notification for every participant of a completed draw.
+    
+    Participants are users with filled tickets in the draw. Each gets their
+    materialised results message (see services.draw_results). Re-running
+    queues nobody twice.
+    
+    Args:
+        draw_id: Draw ID in API
+    
+    Returns:
+        Number of messages queued
+    """
+    broadcast = draw_results_broadcast(draw_id)
+    async with async_session_maker() as session:
+        draw = await get_draw_by_external_id(session, draw_id)
+        if not draw or draw.status != "completed" or not draw.winning_numbers:
+            logger.warning(f"Draw {draw_id} is not completed, results broadcast not queued")
+            return 0
+        
+        fallback = messages.DRAW_COMPLETED_BROADCAST_TEMPLATE.format(
+            draw_name=draw.name,
+            winning_numbers=messages.format_numbers(draw.winning_numbers)
+        )
+        result = await session.execute(
+            _ENQUEUE_DRAW_STATEMENT,
+            {"broadcast": broadcast, "draw_id": draw_id, "fallback": fallback, "now": datetime.utcnow()}
+        )
+        await session.commit()
+    
+    logger.info(f"Broadcast {broadcast}: {result.rowcount} messages queued")
+    return result.rowcount
+
+
+async def broadcast_progress(broadcast: Optional[str] = None) -> Dict[str, int]:
+    """
+    Count queued messages by status.
+    
+    Args:
+        broadcast: Count only this broadcast (default: all)
+    
+    Returns:
+        Dict with 'pending', 'sending', 'sent' and 'failed'
+    """
+    stmt = select(BroadcastMessage.status, func.count()).group_by(BroadcastMessage.status)
+    if broadcast is not None:
+        stmt = stmt.where(BroadcastMessage.broadcast == broadcast)
+    async with async_session_maker() as session:
+        counts = dict((await session.execute(stmt)).all())
+    return {status: counts.get(status, 0) for status in ("pending", "sending", "sent", "failed")}
+
+
+@dataclass
+class BroadcastStats:
+    """Counters of a broadcast sender."""
+    sent: int = 0
+    failed: int = 0  # permanently (blocked bot, deleted account, attempts exhausted)
+    retried: int = 0  # transient errors, message rescheduled
+    retry_after: int = 0  # 429 answers, sending paused
+    retry_after_seconds: float = 0.0
+    batches: int = 0
+    started: float = field(default_factory=time.monotonic)
+    
+    @property
+    def rate(self) -> float:
+        """Messages sent per second since start."""
+        elapsed = time.monotonic() - self.started
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+
+class BroadcastSender:
+    """
+    Delivers queued broadcast messages within Telegram's limits.
+    
+    Messages are claimed in batches with FOR UPDATE SKIP LOCKED, so several
+    senders never pick the same message. Every send takes a token from the
+    global bucket (broadcast_rate messages per second) after waiting for the
+    chat's own interval. A 429 (RetryAfter) pauses the whole bucket for the
+    requested time and the message is sent again; blocked or deleted chats
+    fail at once; other errors are retried with backoff up to
+    broadcast_max_attempts.
+    
+    Outcomes are stored once per batch. If the sender dies mid-batch its
+    messages are claimed again after broadcast_lease_timeout, so delivery
+    is at-least-once.
+    """
+    
+    def __init__(
+        self,
+        bot: Bot,
+        rate: Optional[float] = None,
+        chat_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            bot: Bot sending the messages
+            rate: Messages per second over all chats (default settings.broadcast_rate)
+            chat_interval: Seconds between messages to one chat (default settings.broadcast_chat_interval)
+            batch_size: Messages claimed at once (default settings.broadcast_batch_size)
+            concurrency: Simultaneous sendMessage requests (default settings.broadcast_concurrency)
+        """
+        self._bot = bot
+        rate = rate or settings.broadcast_rate
+        self._bucket = TokenBucket(rate, capacity=settings.broadcast_burst)
+        self._chats = KeyedRateLimiter(chat_interval or settings.broadcast_chat_interval)
+        self._batch_size = batch_size or settings.broadcast_batch_size
+        self._semaphore = asyncio.Semaphore(concurrency or settings.broadcast_concurrency)
+        self.stats = BroadcastStats()
+    
+    async def _claim(self, broadcast: Optional[str] = None) -> List:
+        """Claim the next batch of due messages, optionally of one broadcast only."""
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            result = await session.execute(
+                _CLAIM_STATEMENT,
+                {
+                    "now": now,
+                    "stale_before": now - timedelta(seconds=settings.broadcast_lease_timeout),
+                    "limit": self._batch_size,
+                    "broadcast": broadcast
+                }
+            )
+            rows = sorted(result.all(), key=lambda row: row.id)
+            await session.commit()
+        return rows
+    
+    async def _deliver(self, message) -> Tuple[str, Optional[str], Optional[datetime]]:
+        """
+        Send one message.
+        
+        Returns:
+            (status, error, next_attempt_at)
+        """
+        await self._chats.acquire(message.telegram_id)
+        async with self._semaphore:
+            while True:
+                await self._bucket.acquire()
+                try:
+                    await self._bot.send_message(message.telegram_id, message.payload)
+                    self.stats.sent += 1
+                    return "sent", None, None
+                except TelegramRetryAfter as e:
+                    # Flood control applies to the whole bot, not just this chat
+                    self.stats.retry_after += 1
+                    self.stats.retry_after_seconds += e.retry_after
+                    logger.warning(f"Telegram flood control, pausing broadcast for {e.retry_after}s")
+                    self._bucket.pause(e.retry_after)
+                except (TelegramForbiddenError, TelegramNotFound, TelegramBadRequest) as e:
+                    # Bot blocked, account deleted, malformed payload: retrying won't help
+                    self.stats.failed += 1
+                    return "failed", str(e), None
+                except Exception as e:
+                    if message.attempts >= settings.broadcast_max_attempts:
+                        self.stats.failed += 1
+                        return "failed", str(e), None
+                    self.stats.retried += 1
+                    backoff = settings.broadcast_retry_delay * 2 ** (message.attempts - 1)
+                    return "pending", str(e), datetime.utcnow() + timedelta(seconds=backoff)
+    
+    async def _finish(self, rows: List, outcomes: List[Tuple[str, Optional[str], Optional[datetime]]]) -> None:
+        """Store outcomes of a batch in one statement."""
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            await session.execute(
+                _FINISH_STATEMENT,
+                {
+                    "ids": [row.id for row in rows],
+                    "statuses": [status for status, _, _ in outcomes],
+                    "errors": [error for _, error, _ in outcomes],
+                    "next_attempts": [next_attempt for _, _, next_attempt in outcomes],
+                    "sent": [now if status == "sent" else None for status, _, _ in outcomes]
+                }
+            )
+            await session.commit()
+    
+    async def send_batch(self, broadcast: Optional[str] = None) -> int:
+        """
+        Claim and deliver one batch.
+        
+        Args:
+            broadcast: Deliver only messages of this broadcast (default: any)
+        
+        Returns:
+            Number of messages processed (0 if nothing is due)
+        """
+        rows = await self._claim(broadcast)
+        if not rows:
+            return 0
+        
+        outcomes = await asyncio.gather(*(self._deliver(row) for row in rows))
+        await self._finish(rows, outcomes)
+        self.stats.batches += 1
+        return len(rows)
+    
+    async def drain(
+        self,
+        progress: Optional[ProgressCallback] = None,
+        broadcast: Optional[str] = None
+    ) -> BroadcastStats:
+        """
+        Send until no message is due (rescheduled messages may remain pending).
+        
+        The queue is counted once before sending; progress after every batch
+        comes from the sender's own counters.
+        
+        Args:
+            progress: Called after every batch
+            broadcast: Deliver only messages of this broadcast (default: any)
+        
+        Returns:
+            Sender stats
+        """
+        queued = 0
+        if progress:
+            counts = await broadcast_progress(broadcast)
+            queued = counts["pending"] + counts["sending"]
+        done_before = self.stats.sent + self.stats.failed
+        
+        while await self.send_batch(broadcast):
+            if progress:
+                done = self.stats.sent + self.stats.failed - done_before
+                progress(done, max(queued - done, 0))
+        return self.stats
+    
+    async def run(self) -> None:
+        """Deliver queued messages until cancelled, polling the queue when idle."""
+        logger.info(f"Broadcast sender started ({self._bucket.rate} msg/s)")
+        while True:
+            try:
+                processed = await self.send_batch()
+            except Exception as e:
+                logger.error(f"Error sending broadcast batch: {e}", exc_info=True)
+                processed = 0
+            
+            if processed:
+                logger.info(
+                    f"Broadcast batch of {processed}: {self.stats.sent} sent, {self.stats.failed} failed, "
+                    f"{self.stats.retry_after} flood waits, {self.stats.rate:.1f} msg/s"
+                )
+            else:
+                await asyncio.sleep(settings.broadcast_poll_interval)
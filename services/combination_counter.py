@@ -0,0 +1,236 @@
+"""Per-draw popularity counter of 6-of-45 combinations (combinadic ranking)."""
+import logging
+import time
+from math import comb
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Ticket
+from services.draw_service import generate_random_numbers, validate_numbers
+from services.settlement_engine import popcount64
+
+logger = logging.getLogger(__name__)
+
+
+NUMBERS_TOTAL = 45
+NUMBERS_TO_PICK = 6
+
+# C(45, 6) = 8,145,060 possible tickets
+COMBINATIONS_TOTAL = comb(NUMBERS_TOTAL, NUMBERS_TO_PICK)
+
+# Tickets streamed per chunk while building a counter
+COUNTER_BUILD_CHUNK_SIZE = 50000
+
+# _BINOM[n, k] = C(n, k)
+_BINOM = np.array(
+    [[comb(n, k) for k in range(NUMBERS_TO_PICK + 1)] for n in range(NUMBERS_TOTAL + 1)],
+    dtype=np.int64
+)
+
+
+def rank_combination(numbers: List[int]) -> int:
+    """
+    Rank combination to 0..C(45,6)-1 (colexicographic combinadic).
+    
+    Sorted numbers c1 < ... < c6 (1-based) rank as sum of C(c_i - 1, i).
+    
+    Raises:
+        ValueError: If numbers are not 6 unique numbers from 1-45
+    """
+    is_valid, error = validate_numbers(numbers)
+    if not is_valid:
+        raise ValueError(error)
+    return sum(comb(n - 1, i) for i, n in enumerate(sorted(numbers), start=1))
+
+
+def unrank_combination(rank: int) -> List[int]:
+    """Inverse of rank_combination."""
+    if not 0 <= rank < COMBINATIONS_TOTAL:
+        raise ValueError(f"Rank out of range: {rank}")
+    
+    numbers = []
+    n = NUMBERS_TOTAL
+    for i in range(NUMBERS_TO_PICK, 0, -1):
+        # Largest n with C(n, i) <= rank
+        n -= 1
+        while comb(n, i) > rank:
+            n -= 1
+        rank -= comb(n, i)
+        numbers.append(n + 1)
+    return sorted(numbers)
+
+
+def rank_masks(masks: np.ndarray) -> np.ndarray:
+    """
+    Rank ticket bitmasks (see numbers_to_mask) in a vectorized pass.
+    
+    Masks must have exactly 6 of the 45 low bits set.
+    
+    Returns:
+        int64 array of ranks
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    ranks = np.zeros(len(masks), dtype=np.int64)
+    seen = np.zeros(len(masks), dtype=np.int64)
+    for position in range(NUMBERS_TOTAL):
+        bit = ((masks >> np.uint64(position)) & np.uint64(1)).astype(np.int64)
+        seen += bit
+        ranks += bit * _BINOM[position, np.minimum(seen, NUMBERS_TO_PICK)]
+    return ranks
+
+
+def rank_positions(positions: np.ndarray) -> np.ndarray:
+    """
+    Rank k-subsets of 0..44 given as sorted 0-based positions (colex combinadic).
+    
+    Args:
+        positions: (n, k) int array, rows sorted ascending, k <= 6
+    
+    Returns:
+        int64 array of ranks in 0..C(45,k)-1
+    """
+    positions = np.asarray(positions)
+    ranks = np.zeros(positions.shape[0], dtype=np.int64)
+    for i in range(positions.shape[1]):
+        ranks += _BINOM[positions[:, i], i + 1]
+    return ranks
+
+
+class CombinationCounter:
+    """
+    Dense uint32 counter over all C(45,6) combinations of a draw (~32.6 MB).
+    
+    Backed by an in-memory array or a memory-mapped file, so a persisted
+    counter opens instantly and pages in only what is read.
+    """
+    
+    def __init__(self, draw_id: int, counts: Optional[np.ndarray] = None):
+        self.draw_id = draw_id
+        self.counts = counts if counts is not None else np.zeros(COMBINATIONS_TOTAL, dtype=np.uint32)
+    
+    @classmethod
+    def open(cls, draw_id: int, path: str, writable: bool = False) -> "CombinationCounter":
+        """
+        Open counter persisted at path (created zero-filled if missing and writable).
+        
+        Args:
+            draw_id: Draw ID in API
+            path: Counter file
+            writable: Open read-write; changes are written back on flush()
+        """
+        if writable:
+            mode = "r+" if Path(path).exists() else "w+"
+        else:
+            mode = "r"
+        counts = np.memmap(path, dtype=np.uint32, mode=mode, shape=(COMBINATIONS_TOTAL,))
+        return cls(draw_id, counts)
+    
+    def save(self, path: str) -> None:
+        """Write counter to path."""
+        if isinstance(self.counts, np.memmap) and Path(self.counts.filename) == Path(path).resolve():
+            self.counts.flush()
+        else:
+            self.counts.tofile(path)
+    
+    def flush(self) -> None:
+        """Write back changes of a memory-mapped counter."""
+        if isinstance(self.counts, np.memmap):
+            self.counts.flush()
+    
+    def add(self, numbers: List[int], delta: int = 1) -> int:
+        """Count one ticket (negative delta to uncount). Returns the new count."""
+        rank = rank_combination(numbers)
+        self.counts[rank] = max(int(self.counts[rank]) + delta, 0)
+        return int(self.counts[rank])
+    
+    def add_masks(self, masks: np.ndarray) -> None:
+        """Count tickets given as numbers bitmasks."""
+        if len(masks) == 0:
+            return
+        ranks, counts = np.unique(rank_masks(masks), return_counts=True)
+        self.counts[ranks] += counts.astype(np.uint32)
+    
+    def count(self, numbers: List[int]) -> int:
+        """How many tickets picked exactly these numbers (O(1))."""
+        return int(self.counts[rank_combination(numbers)])
+    
+    def total(self) -> int:
+        """Number of counted tickets."""
+        return int(self.counts.sum(dtype=np.int64))
+    
+    def top(self, n: int = 10) -> List[Tuple[List[int], int]]:
+        """Most popular combinations with their counts."""
+        n = min(n, COMBINATIONS_TOTAL)
+        ranks = np.argpartition(self.counts, -n)[-n:]
+        ranks = ranks[np.argsort(self.counts[ranks])[::-1]]
+        return [(unrank_combination(int(r)), int(self.counts[r])) for r in ranks if self.counts[r]]
+    
+    def duplicates(self, min_count: int = 2) -> List[Tuple[List[int], int]]:
+        """Combinations picked at least min_count times (mass-duplicate fills)."""
+        ranks = np.flatnonzero(self.counts >= min_count)
+        return sorted(
+            ((unrank_combination(int(r)), int(self.counts[r])) for r in ranks),
+            key=lambda item: item[1],
+            reverse=True
+        )
+    
+    def random_unpicked_numbers(self, attempts: int = 20) -> List[int]:
+        """
+        Random numbers nobody has picked yet (falls back to the least picked try).
+        
+        Useful for auto-fill, so generated tickets do not share a jackpot.
+        """
+        best, best_count = None, None
+        for _ in range(attempts):
+            numbers = generate_random_numbers()
+            count = self.count(numbers)
+            if count == 0:
+                return numbers
+            if best_count is None or count < best_count:
+                best, best_count = numbers, count
+        return best
+
+
+async def build_combination_counter(
+    session: AsyncSession,
+    draw_id: int,
+    path: Optional[str] = None
+) -> CombinationCounter:
+    """
+    Count combinations of all filled tickets of a draw.
+    
+    Args:
+        session: Database session
+        draw_id: Draw ID in API (Ticket.draw_id)
+        path: Persist counter to this memory-mapped file (rebuilt from scratch)
+    
+    Returns:
+        CombinationCounter
+    """
+    started = time.perf_counter()
+    if path:
+        Path(path).unlink(missing_ok=True)
+        counter = CombinationCounter.open(draw_id, path, writable=True)
+    else:
+        counter = CombinationCounter(draw_id)
+    
+    stream = await session.stream(
+        select(Ticket.numbers_mask)
+        .where(Ticket.draw_id == draw_id, Ticket.numbers_mask.isnot(None))
+        .execution_options(yield_per=COUNTER_BUILD_CHUNK_SIZE)
+    )
+    async for partition in stream.partitions():
+        masks = np.fromiter((row.numbers_mask for row in partition), dtype=np.uint64, count=len(partition))
+        # Skip malformed tickets (not exactly 6 numbers)
+        counter.add_masks(masks[popcount64(masks) == NUMBERS_TO_PICK])
+    
+    counter.flush()
+    logger.info(
+        f"Combination counter for draw {draw_id} built: {counter.total()} tickets, "
+        f"{time.perf_counter() - started:.2f}s"
+    )
+    return counter
@@ -0,0 +1,140 @@
+"""Materialised per-user results of completed draws."""
+import logging
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, insert, text, update
+
+from bot import messages
+from db.database import async_session_maker
+from db.crud_draws import get_draw_by_external_id
+from db.models import Draw, DrawResult
+
+logger = logging.getLogger(__name__)
+
+
+# Tickets listed in a user's results message (best first)
+RESULTS_TICKETS_SHOWN = 10
+
+# Rows per INSERT statement (8 bind parameters per row, asyncpg allows at most 32767)
+RESULTS_INSERT_CHUNK_SIZE = 2000
+
+# One row per user: totals plus the best tickets (numbers as text, arrays
+# of arrays would fail on malformed tickets)
+_USER_RESULTS_QUERY = text(
+    f"""
+    SELECT
+        user_id,
+        count(*) AS ticket_count,
+        count(*) FILTER (WHERE is_winner) AS winning_count,
+        coalesce(max(matched_count), 0) AS best_match,
+        coalesce(sum(prize_amount) FILTER (WHERE is_winner), 0) AS total_prize,
+        (array_agg(array_to_string(numbers, ' ') ORDER BY matched_count DESC, id))[1:{RESULTS_TICKETS_SHOWN}]
+            AS top_numbers,
+        (array_agg(coalesce(matched_count, 0) ORDER BY matched_count DESC, id))[1:{RESULTS_TICKETS_SHOWN}]
+            AS top_matches,
+        (array_agg(CASE WHEN is_winner THEN prize_amount ELSE 0 END ORDER BY matched_count DESC, id))
+            [1:{RESULTS_TICKETS_SHOWN}] AS top_prizes
+    FROM tickets
+    WHERE draw_id = :draw_id AND numbers IS NOT NULL
+    GROUP BY user_id
+    """
+)
+
+
+def render_draw_result(
+    draw: Draw,
+    ticket_count: int,
+    best_match: int,
+    total_prize: Decimal,
+    tickets: List[Tuple[List[int], int, Decimal]]
+) -> str:
+    """
+    Render user's results message.
+    
+    Args:
+        draw: Completed draw
+        ticket_count: User's filled tickets in the draw
+        best_match: Highest match count
+        total_prize: Sum of prizes
+        tickets: Best tickets as (numbers, matches, prize)
+    """
+    lines = []
+    for numbers, matches, prize in tickets:
+        if prize:
+            lines.append(messages.DRAW_RESULTS_WINNING_TICKET_LINE.format(
+                numbers=messages.format_numbers(numbers), matches=matches, prize=int(prize)
+            ))
+        else:
+            lines.append(messages.DRAW_RESULTS_TICKET_LINE.format(
+                numbers=messages.format_numbers(numbers), matches=matches
+            ))
+    if ticket_count > len(tickets):
+        lines.append(messages.DRAW_RESULTS_MORE_TICKETS.format(count=ticket_count - len(tickets)))
+    
+    if total_prize:
+        outcome = messages.DRAW_RESULTS_WON_OUTCOME.format(prize=int(total_prize))
+    else:
+        outcome = messages.DRAW_RESULTS_LOST_OUTCOME
+    
+    return messages.DRAW_RESULTS_TEMPLATE.format(
+        draw_name=draw.name,
+        winning_numbers=messages.format_numbers(draw.winning_numbers),
+        ticket_count=ticket_count,
+        best_match=best_match,
+        tickets="\n".join(lines),
+        outcome=outcome
+    )
+
+
+async def materialize_draw_results(draw_id: int) -> Optional[int]:
+    """
+    Compute and store results of every user of a settled draw.
+    
+    One GROUP BY over the draw's tickets, messages rendered here, all rows
+    replaced and Draw.results_at set in a single transaction. Re-running
+    rebuilds the draw's results.
+    
+    Args:
+        draw_id: Draw ID in API
+    
+    Returns:
+        Number of users with results, or None if the draw has no results yet
+    """
+    started = time.perf_counter()
+    
+    async with async_session_maker() as session:
+        draw = await get_draw_by_external_id(session, draw_id)
+        if not draw or draw.status != "completed" or not draw.winning_numbers:
+            logger.warning(f"Draw {draw_id} is not completed, results not materialised")
+            return None
+        
+        result = await session.execute(_USER_RESULTS_QUERY, {"draw_id": draw_id})
+        now = datetime.utcnow()
+        rows = []
+        for row in result.all():
+            tickets = [
+                ([int(n) for n in numbers.split()], matches, prize)
+                for numbers, matches, prize in zip(row.top_numbers, row.top_matches, row.top_prizes)
+            ]
+            rows.append({
+                "draw_id": draw_id,
+                "user_id": row.user_id,
+                "ticket_count": row.ticket_count,
+                "winning_count": row.winning_count,
+                "best_match": row.best_match,
+                "total_prize": row.total_prize,
+                "summary": render_draw_result(draw, row.ticket_count, row.best_match, row.total_prize, tickets),
+                "created_at": now
+            })
+        
+        await session.execute(delete(DrawResult).where(DrawResult.draw_id == draw_id))
+        for start in range(0, len(rows), RESULTS_INSERT_CHUNK_SIZE):
+            await session.execute(insert(DrawResult), rows[start:start + RESULTS_INSERT_CHUNK_SIZE])
+        await session.execute(update(Draw).where(Draw.id == draw.id).values(results_at=now))
+        await session.commit()
+    
+    logger.info(f"Results of draw {draw_id} materialised for {len(rows)} users, {time.perf_counter() - started:.2f}s")
+    return len(rows)
@@ -0,0 +1,243 @@
+"""In-process draw lifecycle scheduler: auto-fill at draw close, settlement on results."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+
+from api.client import api_client
+from config import settings
+from db.database import async_session_maker
+from db.models import Draw, Ticket
+from services.broadcast import enqueue_draw_results
+from services.draw_results import materialize_draw_results
+from services.draw_settlement import settle_draw_parallel
+from services.draw_sync import sync_current_draw, sync_draw
+from services.number_autofill import autofill_draw
+
+logger = logging.getLogger(__name__)
+
+
+# Draw statuses after which nothing is scheduled any more
+FINISHED_STATUSES = ("completed", "cancelled")
+
+
+def _active_tickets_exist(draw_id_column):
+    """EXISTS filled tickets of the draw that were not settled yet."""
+    return (
+        select(Ticket.id)
+        .where(
+            Ticket.draw_id == draw_id_column,
+            Ticket.numbers.isnot(None),
+            Ticket.status == "active"
+        )
+        .exists()
+    )
+
+
+async def find_unsettled_draws(draw_id: Optional[int] = None) -> Set[int]:
+    """
+    Completed draws with filled tickets that were never settled, or whose
+    results were never materialised (e.g. bot was down, or crashed between
+    settlement and materialisation).
+    
+    Args:
+        draw_id: Check only this draw
+    """
+    async with async_session_maker() as session:
+        stmt = (
+            select(Draw.external_id)
+            .where(
+                Draw.status == "completed",
+                Draw.winning_numbers.isnot(None),
+                or_(_active_tickets_exist(Draw.external_id), Draw.results_at.is_(None))
+            )
+        )
+        if draw_id is not None:
+            stmt = stmt.where(Draw.external_id == draw_id)
+        result = await session.scalars(stmt)
+        return set(result.all())
+
+
+async def has_unsettled_tickets(draw_id: int) -> bool:
+    """True if the draw still has filled tickets waiting for settlement."""
+    async with async_session_maker() as session:
+        return bool(await session.scalar(select(_active_tickets_exist(draw_id))))
+
+
+class DrawScheduler:
+    """
+    Drives draw lifecycle jobs from Draw.scheduled_at / status.
+    
+    Away from a draw the API is polled every draw_sync_interval seconds, but
+    the scheduler always wakes up exactly at the next transition point:
+        
+        scheduled_at - draw_autofill_lead  -> "close" job (auto-fill numbers)
+        scheduled_at - draw_watch_window   -> start polling the draw every
+                                              draw_watch_interval seconds
+        status becomes completed           -> "settle" job
+    
+    Completed draws left unsettled or without materialised results (bot
+    down, failed job) are picked up at start and on every idle poll.
+    
+    Idle polls bypass the current draw response cache (the cached copy is
+    refreshed for handlers as a side effect). Tight polling goes through
+    the uncached draw-by-ID endpoint and ends once
+    results arrive (or after draw_watch_timeout, then idle polling resumes).
+    Jobs run as background tasks, settlement of a draw waits for its close job.
+    """
+    
+    def __init__(self):
+        self._watched: Optional[int] = None  # draw awaiting results
+        self._closed: Set[int] = set()
+        self._settled: Set[int] = set()
+        self._jobs: Dict[Tuple[str, int], asyncio.Task] = {}
+    
+    async def run(self) -> None:
+        """Run scheduler until cancelled."""
+        logger.info(
+            f"Draw scheduler started (idle poll {settings.draw_sync_interval}s, "
+            f"watch poll {settings.draw_watch_interval}s)"
+        )
+        
+        # Catch up on draws completed while the bot was down
+        await self._catch_up()
+        
+        try:
+            while True:
+                try:
+                    delay = await self.tick()
+                except Exception as e:
+                    logger.error(f"Unexpected error in draw scheduler: {e}", exc_info=True)
+                    delay = settings.draw_sync_interval
+                
+                await asyncio.sleep(delay)
+        finally:
+            for task in self._jobs.values():
+                task.cancel()
+    
+    async def _catch_up(self) -> None:
+        """Start settle jobs of completed draws left unsettled or without results."""
+        try:
+            for draw_id in await find_unsettled_draws():
+                if draw_id not in self._settled:
+                    self._start_job("settle", draw_id)
+        except Exception as e:
+            logger.error(f"Error looking for unsettled draws: {e}", exc_info=True)
+    
+    async def tick(self, now: Optional[datetime] = None) -> float:
+        """
+        Sync draw state, fire due jobs and return seconds until the next check.
+        
+        Args:
+            now: Current UTC time (naive, as stored in Draw.scheduled_at)
+        """
+        was_watching = self._watched is not None
+        if was_watching:
+            draw = await sync_draw(self._watched)
+        else:
+            # Failed settle jobs and crashed runs are retried here
+            await self._catch_up()
+            # The response cache would hand out the previous poll's draw
+            draw = await sync_current_draw(fresh=True)
+        now = now or datetime.utcnow()
+        
+        if draw is None:
+            return settings.draw_watch_interval if was_watching else settings.draw_sync_interval
+        
+        if draw.status == "completed" and draw.winning_numbers:
+            self._watched = None
+            api_client.invalidate_current_draw()
+            if draw.external_id not in self._settled and await find_unsettled_draws(draw.external_id):
+                logger.info(f"Draw {draw.external_id} completed, starting settlement")
+                self._start_job("settle", draw.external_id)
+            # Results just arrived, pick up the next draw right away
+            return 0 if was_watching else settings.draw_sync_interval
+        
+        # Results already handled, a not-completed status is a stale read
+        if draw.status in FINISHED_STATUSES or draw.scheduled_at is None or draw.external_id in self._settled:
+            self._watched = None
+            return settings.draw_sync_interval
+        
+        return self._plan(draw, now)
+    
+    def _plan(self, draw: Draw, now: datetime) -> float:
+        """Fire close job if due and compute delay for a draw that has not finished."""
+        close_at = draw.scheduled_at - timedelta(seconds=settings.draw_autofill_lead)
+        watch_at = draw.scheduled_at - timedelta(seconds=settings.draw_watch_window)
+        give_up_at = draw.scheduled_at + timedelta(seconds=settings.draw_watch_timeout)
+        
+        if now >= close_at and draw.external_id not in self._closed:
+            logger.info(f"Draw {draw.external_id} closes at {draw.scheduled_at}, starting auto-fill")
+            self._start_job("close", draw.external_id)
+        
+        if now >= watch_at:
+            self._watched = draw.external_id
+            if now >= give_up_at:
+                return settings.draw_sync_interval
+            delay = settings.draw_watch_interval
+        else:
+            delay = min(settings.draw_sync_interval, (watch_at - now).total_seconds())
+        
+        # Never oversleep the close point
+        if draw.external_id not in self._closed:
+            delay = min(delay, (close_at - now).total_seconds())
+        return max(delay, 0)
+    
+    def _start_job(self, kind: str, draw_id: int) -> None:
+        """Start a lifecycle job in the background (once per draw)."""
+        key = (kind, draw_id)
+        if key in self._jobs and not self._jobs[key].done():
+            return
+        
+        if kind == "close":
+            self._closed.add(draw_id)
+            job = self._close(draw_id)
+        else:
+            self._settled.add(draw_id)
+            job = self._settle(draw_id)
+        task = asyncio.create_task(job)
+        self._jobs[key] = task
+        task.add_done_callback(lambda _: self._jobs.get(key) is task and self._jobs.pop(key))
+    
+    async def _close(self, draw_id: int) -> None:
+        """Auto-fill numbers of unfilled tickets (resumable, safe to repeat)."""
+        if not settings.draw_autofill_enabled:
+            logger.info(f"Auto-fill disabled, draw {draw_id} closed without it")
+            return
+        try:
+            summary = await autofill_draw(draw_id)
+            logger.info(
+                f"Draw {draw_id} auto-fill done: {summary.generated} generated, "
+                f"{summary.pushed} pushed, {summary.push_failed} failed, {summary.elapsed:.2f}s"
+            )
+        except Exception as e:
+            # Allow a retry on the next tick
+            self._closed.discard(draw_id)
+            logger.error(f"Error auto-filling draw {draw_id}: {e}", exc_info=True)
+    
+    async def _settle(self, draw_id: int) -> None:
+        """
+        Settle draw once its close job has finished, then publish and announce per-user results.
+        
+        A draw already settled (crash or error before its results were
+        materialised) only gets its results materialised. Only draws settled
+        by this job are announced, so catching up on old draws never
+        messages users about them.
+        """
+        close_job = self._jobs.get(("close", draw_id))
+        if close_job is not None:
+            await asyncio.wait([close_job])
+        try:
+            settled_now = await has_unsettled_tickets(draw_id)
+            if settled_now:
+                await settle_draw_parallel(draw_id)
+            else:
+                logger.info(f"Draw {draw_id} has no unsettled tickets, materialising results only")
+            await materialize_draw_results(draw_id)
+            if settled_now and settings.draw_results_broadcast:
+                await enqueue_draw_results(draw_id)
+        except Exception as e:
+            self._settled.discard(draw_id)
+            logger.error(f"Error settling draw {draw_id}: {e}", exc_info=True)
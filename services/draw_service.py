@@ -16,6 +16,14 @@ def generate_random_numbers() -> List[int]:
     return sorted(random.sample(range(1, 46), 6))
 
 
+def generate_random_combinations(count: int) -> List[List[int]]:
+    """Generate `count` distinct random combinations of 6 numbers from 1-45."""
+    combinations = set()
+    while len(combinations) < count:
+        combinations.add(tuple(generate_random_numbers()))
+    return [list(numbers) for numbers in combinations]
+
+
 def validate_numbers(numbers: List[int]) -> tuple[bool, str | None]:
     """
     Validate user-selected numbers.
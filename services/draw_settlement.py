@@ -0,0 +1,517 @@
+"""Local settlement of completed draws (in-process or in a process pool)."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, TextClause, case, cast, false, func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from config import settings
+from db.database import async_session_maker
+from db.crud import bump_draw_tickets_versions
+from db.crud_draws import get_draw_by_external_id
+from db.models import Draw, Ticket
+from services.prize_calculator import PrizeDistribution, get_draw_prize_grid, get_draw_prize_pool, split_prizes
+from services.ticket_checker import numbers_to_mask
+from services.settlement_engine import MAX_MATCHES, count_matches
+
+logger = logging.getLogger(__name__)
+
+
+# Rows per UPDATE ... FROM (VALUES ...) statement (5 bind parameters per row,
+# asyncpg allows at most 32767)
+SETTLEMENT_UPDATE_BATCH_SIZE = 5000
+
+
+class DrawNotSettleableError(Exception):
+    """Raised when a draw is missing, not completed or has no winning numbers."""
+
+
+@dataclass
+class DrawSettlementSummary:
+    """Totals of a draw settlement run."""
+    draw_id: int
+    winning_numbers: List[int]
+    tickets: int = 0
+    winners: int = 0
+    total_prize: Decimal = Decimal(0)
+    chunks: int = 0
+    tier_counts: Dict[int, int] = field(default_factory=dict)
+    prize_per_ticket: Dict[int, Decimal] = field(default_factory=dict)
+    workers: int = 1
+    elapsed: float = 0.0
+    
+    def merge(self, other: "DrawSettlementSummary") -> None:
+        """Add totals of a partition settled separately."""
+        self.tickets += other.tickets
+        self.winners += other.winners
+        self.total_prize += other.total_prize
+        self.chunks += other.chunks
+        tier_counts = Counter(self.tier_counts)
+        tier_counts.update(other.tier_counts)
+        self.tier_counts = {matches: tier_counts[matches] for matches in sorted(tier_counts)}
+
+
+def _settlement_params(
+    ticket_ids: List[int],
+    matched: List[int],
+    prize_per_ticket: Dict[int, Decimal]
+) -> dict:
+    """Build bind parameters of the bulk UPDATE for ticket_ids and their match counts."""
+    params = {"updated_at": datetime.utcnow()}
+    for i, (ticket_id, matches) in enumerate(zip(ticket_ids, matched)):
+        prize = prize_per_ticket.get(matches)
+        params[f"id_{i}"] = ticket_id
+        params[f"matched_{i}"] = matches
+        params[f"winner_{i}"] = prize is not None
+        params[f"prize_{i}"] = prize if prize is not None else Decimal(0)
+        params[f"status_{i}"] = "won" if prize is not None else "lost"
+    return params
+
+
+@lru_cache(maxsize=16)
+def _bulk_update_statement(row_count: int) -> TextClause:
+    """
+    UPDATE tickets ... FROM (VALUES ...) statement for row_count rows.
+    
+    Built as text and cached per batch size: compiling a Core values()
+    construct with thousands of bind parameters costs more than running it.
+    """
+    rows = ",\n".join(
+        f"(CAST(:id_{i} AS INTEGER), CAST(:matched_{i} AS INTEGER), CAST(:winner_{i} AS BOOLEAN), "
+        f"CAST(:prize_{i} AS NUMERIC), CAST(:status_{i} AS VARCHAR))"
+        for i in range(row_count)
+    )
+    return text(
+        "UPDATE tickets SET "
+        "matched_count = results.matched_count, "
+        "is_winner = results.is_winner, "
+        "prize_amount = results.prize_amount, "
+        "status = results.status, "
+        "updated_at = :updated_at "
+        f"FROM (VALUES {rows}) AS results (id, matched_count, is_winner, prize_amount, status) "
+        "WHERE tickets.id = results.id "
+        # Skip rows already settled with the same result (re-runs)
+        "AND (tickets.matched_count, tickets.is_winner, tickets.prize_amount, tickets.status) "
+        "IS DISTINCT FROM (results.matched_count, results.is_winner, results.prize_amount, results.status)"
+    )
+
+
+async def _get_settleable_draw(session: AsyncSession, draw_id: int) -> Draw:
+    """Load draw and check it can be settled."""
+    draw = await get_draw_by_external_id(session, draw_id)
+    if not draw:
+        raise DrawNotSettleableError(f"Draw {draw_id} not found")
+    if draw.status != "completed":
+        raise DrawNotSettleableError(f"Draw {draw_id} is not completed (status: {draw.status})")
+    if not draw.winning_numbers:
+        raise DrawNotSettleableError(f"Draw {draw_id} has no winning numbers")
+    return draw
+
+
+def _draw_masks_query(draw_id: int, chunk_size: int, id_range: Optional[Tuple[int, int]] = None):
+    """Filled tickets of a draw (id, numbers_mask) in id order, streamed chunk_size rows at a time."""
+    query = (
+        select(Ticket.id, Ticket.numbers_mask)
+        .where(Ticket.draw_id == draw_id, Ticket.numbers_mask.isnot(None))
+        .order_by(Ticket.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if id_range:
+        query = query.where(Ticket.id.between(*id_range))
+    return query
+
+
+def _partition_matches(partition, winning_numbers: List[int]) -> np.ndarray:
+    """Match counts of a streamed chunk of (id, numbers_mask) rows."""
+    masks = np.fromiter((row.numbers_mask for row in partition), dtype=np.uint64, count=len(partition))
+    return count_matches(masks, winning_numbers)
+
+
+async def _count_tiers(
+    session_maker: async_sessionmaker,
+    draw_id: int,
+    winning_numbers: List[int],
+    chunk_size: int,
+    id_range: Optional[Tuple[int, int]] = None
+) -> Dict[int, int]:
+    """
+    Count tickets of a draw per match count without writing anything.
+    
+    Args:
+        session_maker: Session factory
+        draw_id: Draw ID in API
+        winning_numbers: Winning combination
+        chunk_size: Tickets per chunk
+        id_range: Inclusive (first_id, last_id) ticket id range, or None for all tickets
+    
+    Returns:
+        Tickets per match count (0-6)
+    """
+    counts = np.zeros(MAX_MATCHES + 1, dtype=np.int64)
+    
+    async with session_maker() as session:
+        stream = await session.stream(_draw_masks_query(draw_id, chunk_size, id_range))
+        async for partition in stream.partitions():
+            counts += np.bincount(_partition_matches(partition, winning_numbers), minlength=MAX_MATCHES + 1)
+        await session.commit()
+    
+    return {matches: int(count) for matches, count in enumerate(counts)}
+
+
+async def _settle_tickets(
+    session_maker: async_sessionmaker,
+    draw_id: int,
+    winning_numbers: List[int],
+    prize_per_ticket: Dict[int, Decimal],
+    chunk_size: int,
+    id_range: Optional[Tuple[int, int]] = None
+) -> DrawSettlementSummary:
+    """
+    Stream, settle and write back tickets of a draw, optionally within an id range.
+    
+    Every ticket is written once, with its final prize: prize_per_ticket
+    must already be split from the draw's tier counts (see _count_tiers).
+    
+    Args:
+        session_maker: Session factory (reads and writes use separate connections)
+        draw_id: Draw ID in API
+        winning_numbers: Winning combination
+        prize_per_ticket: Prize per winning match count
+        chunk_size: Tickets per chunk
+        id_range: Inclusive (first_id, last_id) ticket id range, or None for all tickets
+    
+    Returns:
+        DrawSettlementSummary for the settled tickets
+    """
+    summary = DrawSettlementSummary(draw_id=draw_id, winning_numbers=list(winning_numbers))
+    tier_counts = Counter()
+    
+    async with session_maker() as read_session, session_maker() as write_session:
+        # Stream tickets with a server-side cursor
+        stream = await read_session.stream(_draw_masks_query(draw_id, chunk_size, id_range))
+        
+        async for partition in stream.partitions():
+            ticket_ids = [row.id for row in partition]
+            matched = _partition_matches(partition, summary.winning_numbers).tolist()
+            
+            for start in range(0, len(ticket_ids), SETTLEMENT_UPDATE_BATCH_SIZE):
+                end = start + SETTLEMENT_UPDATE_BATCH_SIZE
+                batch_ids = ticket_ids[start:end]
+                await write_session.execute(
+                    _bulk_update_statement(len(batch_ids)),
+                    _settlement_params(batch_ids, matched[start:end], prize_per_ticket)
+                )
+            await write_session.commit()
+            
+            summary.tickets += len(ticket_ids)
+            summary.chunks += 1
+            tier_counts.update(matched)
+        
+        await read_session.commit()
+    
+    summary.tier_counts = {matches: tier_counts[matches] for matches in sorted(tier_counts)}
+    summary.winners = sum(count for matches, count in tier_counts.items() if matches in prize_per_ticket)
+    summary.total_prize = sum(
+        (prize * tier_counts[matches] for matches, prize in prize_per_ticket.items()),
+        Decimal(0)
+    )
+    return summary
+
+
+def _split_draw_prizes(draw: Draw, tier_counts: Dict[int, int]) -> PrizeDistribution:
+    """Pari-mutuel prizes of a draw for the given tickets per match count."""
+    distribution = split_prizes(get_draw_prize_grid(draw), get_draw_prize_pool(draw), tier_counts)
+    logger.info(
+        f"Draw {draw.external_id} prizes: pool {distribution.prize_pool}, "
+        f"per ticket {distribution.prize_per_ticket}, winners {distribution.winners}, "
+        f"paid {distribution.total_prize}, unclaimed {distribution.unclaimed}"
+    )
+    return distribution
+
+
+async def _mark_tickets_changed(draw_id: int) -> None:
+    """Bump tickets versions of the draw's participants (cached views are stale)."""
+    async with async_session_maker() as session:
+        await bump_draw_tickets_versions(session, draw_id)
+        await session.commit()
+
+
+def _log_summary(summary: DrawSettlementSummary) -> None:
+    logger.info(
+        f"Draw {summary.draw_id} settled: {summary.tickets} tickets in {summary.chunks} chunks "
+        f"({summary.workers} worker(s)), {summary.winners} winners, "
+        f"total prize {summary.total_prize}, {summary.elapsed:.2f}s"
+    )
+
+
+async def settle_draw(draw_id: int, chunk_size: Optional[int] = None) -> DrawSettlementSummary:
+    """
+    Settle all filled tickets of a completed draw in the current process.
+    
+    Tickets are streamed through a server-side cursor in fixed-size chunks,
+    matched against the winning numbers in a vectorized pass and written back
+    with batched UPDATE ... FROM (VALUES ...) statements on a second
+    connection, one commit per chunk. Memory use depends on the chunk size
+    only, not on the number of tickets in the draw. A first, read-only pass
+    counts tickets per match count so prizes can be split from the draw's
+    prize grid (see services.prize_calculator) before anything is written;
+    every ticket is then written once with its final prize. Re-running is
+    safe.
+    
+    Args:
+        draw_id: Draw ID in API (Draw.external_id, Ticket.draw_id)
+        chunk_size: Tickets per chunk (default: settings.settlement_chunk_size)
+    
+    Returns:
+        DrawSettlementSummary
+    
+    Raises:
+        DrawNotSettleableError: If draw is unknown, not completed or has no winning numbers
+    """
+    chunk_size = chunk_size or settings.settlement_chunk_size
+    started = time.perf_counter()
+    
+    async with async_session_maker() as session:
+        draw = await _get_settleable_draw(session, draw_id)
+        winning_numbers = list(draw.winning_numbers)
+    
+    logger.info(f"Settling draw {draw_id} (winning numbers: {winning_numbers}, chunk size: {chunk_size})")
+    tier_counts = await _count_tiers(async_session_maker, draw_id, winning_numbers, chunk_size)
+    distribution = _split_draw_prizes(draw, tier_counts)
+    summary = await _settle_tickets(
+        async_session_maker, draw_id, winning_numbers, distribution.prize_per_ticket, chunk_size
+    )
+    await _mark_tickets_changed(draw_id)
+    summary.prize_per_ticket = distribution.prize_per_ticket
+    summary.elapsed = time.perf_counter() - started
+    
+    _log_summary(summary)
+    return summary
+
+
+def _sql_matched_count(winning_mask: int):
+    """bit_count(numbers_mask & :winning_mask), evaluated by PostgreSQL (14+)."""
+    masked = Ticket.numbers_mask.op("&")(literal(winning_mask, BigInteger))
+    return func.bit_count(cast(masked, BIT(64)))
+
+
+async def settle_draw_in_database(draw_id: int) -> DrawSettlementSummary:
+    """
+    Settle a completed draw entirely inside PostgreSQL.
+    
+    Matches are counted as bit_count(numbers_mask & winning_mask) with no
+    tickets sent to Python: one GROUP BY ranks the draw (tickets per match
+    count) for the pari-mutuel split, then one UPDATE writes matched_count,
+    is_winner, prize_amount and status for every ticket.
+    
+    Args:
+        draw_id: Draw ID in API (Draw.external_id, Ticket.draw_id)
+    
+    Returns:
+        DrawSettlementSummary
+    
+    Raises:
+        DrawNotSettleableError: If draw is unknown, not completed or has no winning numbers
+    """
+    started = time.perf_counter()
+    
+    async with async_session_maker() as session:
+        draw = await _get_settleable_draw(session, draw_id)
+        winning_numbers = list(draw.winning_numbers)
+        matched_count = _sql_matched_count(numbers_to_mask(winning_numbers))
+        draw_tickets = (Ticket.draw_id == draw_id, Ticket.numbers_mask.isnot(None))
+        
+        # Rank: tickets per match count
+        matches = select(matched_count.label("matches")).where(*draw_tickets).subquery()
+        result = await session.execute(
+            select(matches.c.matches, func.count()).group_by(matches.c.matches)
+        )
+        tier_counts = {int(m): count for m, count in result.all()}
+        
+        distribution = split_prizes(get_draw_prize_grid(draw), get_draw_prize_pool(draw), tier_counts)
+        winning_matches = list(distribution.prize_per_ticket)
+        is_winner = matched_count.in_(winning_matches) if winning_matches else false()
+        
+        # Settle: single UPDATE for the whole draw
+        await session.execute(
+            update(Ticket)
+            .where(*draw_tickets)
+            .values(
+                matched_count=matched_count,
+                is_winner=is_winner,
+                prize_amount=case(distribution.prize_per_ticket, value=matched_count, else_=0)
+                if winning_matches else 0,
+                status=case((is_winner, "won"), else_="lost"),
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await bump_draw_tickets_versions(session, draw_id)
+        await session.commit()
+    
+    summary = DrawSettlementSummary(
+        draw_id=draw_id,
+        winning_numbers=winning_numbers,
+        tickets=sum(tier_counts.values()),
+        winners=sum(distribution.winners.values()),
+        total_prize=distribution.total_prize,
+        chunks=1,
+        tier_counts={matches: tier_counts[matches] for matches in sorted(tier_counts)},
+        prize_per_ticket=distribution.prize_per_ticket,
+        elapsed=time.perf_counter() - started
+    )
+    _log_summary(summary)
+    return summary
+
+
+# Process pool for parallel settlement
+_settlement_pool: Optional[ProcessPoolExecutor] = None
+
+
+def settlement_workers() -> int:
+    """Configured number of settlement processes."""
+    return settings.settlement_workers or os.cpu_count() or 1
+
+
+def get_settlement_pool() -> ProcessPoolExecutor:
+    """Get shared settlement process pool, creating it on first use."""
+    global _settlement_pool
+    if _settlement_pool is None:
+        workers = settlement_workers()
+        # spawn, not fork: the parent has a running event loop and open connections
+        _settlement_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Settlement process pool started ({workers} workers)")
+    return _settlement_pool
+
+
+def shutdown_settlement_pool() -> None:
+    """Stop shared settlement process pool if it was started."""
+    global _settlement_pool
+    if _settlement_pool is not None:
+        _settlement_pool.shutdown(wait=False, cancel_futures=True)
+        _settlement_pool = None
+
+
+def _run_partition(database_url: str, job: Callable[..., Awaitable[Any]], *args) -> Any:
+    """
+    Process pool entry point: run job(session_maker, *args) for one ticket id range.
+    
+    Runs its own event loop and a NullPool engine; connections of the
+    parent process are never shared with workers.
+    """
+    async def run() -> Any:
+        worker_engine = create_async_engine(database_url, poolclass=NullPool)
+        try:
+            session_maker = async_sessionmaker(worker_engine, class_=AsyncSession, expire_on_commit=False)
+            return await job(session_maker, *args)
+        finally:
+            await worker_engine.dispose()
+    
+    return asyncio.run(run())
+
+
+async def _partition_ticket_ids(session: AsyncSession, draw_id: int, partitions: int) -> List[Tuple[int, int]]:
+    """
+    Split filled tickets of a draw into id ranges of (almost) equal size.
+    
+    Returns:
+        List of inclusive (first_id, last_id) ranges
+    """
+    bucketed = (
+        select(
+            Ticket.id,
+            func.ntile(partitions).over(order_by=Ticket.id).label("bucket")
+        )
+        .where(Ticket.draw_id == draw_id, Ticket.numbers_mask.isnot(None))
+        .subquery()
+    )
+    result = await session.execute(
+        select(func.min(bucketed.c.id), func.max(bucketed.c.id))
+        .group_by(bucketed.c.bucket)
+        .order_by(bucketed.c.bucket)
+    )
+    return [(first_id, last_id) for first_id, last_id in result.all()]
+
+
+async def settle_draw_parallel(
+    draw_id: int,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> DrawSettlementSummary:
+    """
+    Settle a completed draw in a process pool without blocking the event loop.
+    
+    Filled tickets are split into one id range per worker. Workers first
+    count their range's tickets per match count; the merged counts give the
+    prize split, and then every worker streams, settles and writes back its
+    own range with the final prizes (see settle_draw).
+    
+    Args:
+        draw_id: Draw ID in API (Draw.external_id, Ticket.draw_id)
+        workers: Number of partitions (default: settings.settlement_workers)
+        chunk_size: Tickets per chunk (default: settings.settlement_chunk_size)
+        executor: Process pool to use (default: shared settlement pool)
+    
+    Returns:
+        Merged DrawSettlementSummary
+    
+    Raises:
+        DrawNotSettleableError: If draw is unknown, not completed or has no winning numbers
+    """
+    chunk_size = chunk_size or settings.settlement_chunk_size
+    executor = executor or get_settlement_pool()
+    workers = workers or settlement_workers()
+    started = time.perf_counter()
+    
+    async with async_session_maker() as session:
+        draw = await _get_settleable_draw(session, draw_id)
+        winning_numbers = list(draw.winning_numbers)
+        id_ranges = await _partition_ticket_ids(session, draw_id, workers)
+    
+    logger.info(
+        f"Settling draw {draw_id} in {len(id_ranges)} partition(s) "
+        f"(winning numbers: {winning_numbers}, chunk size: {chunk_size})"
+    )
+    
+    loop = asyncio.get_running_loop()
+    
+    def run_partitions(job: Callable[..., Awaitable[Any]], *args) -> Awaitable[list]:
+        return asyncio.gather(*[
+            loop.run_in_executor(
+                executor, _run_partition, settings.database_url, job, draw_id, winning_numbers, *args, chunk_size, id_range
+            )
+            for id_range in id_ranges
+        ])
+    
+    tier_counts = Counter()
+    for partial_counts in await run_partitions(_count_tiers):
+        tier_counts.update(partial_counts)
+    distribution = _split_draw_prizes(draw, dict(tier_counts))
+    
+    partials = await run_partitions(_settle_tickets, distribution.prize_per_ticket)
+    summary = DrawSettlementSummary(draw_id=draw_id, winning_numbers=winning_numbers, workers=len(id_ranges))
+    for partial in partials:
+        summary.merge(partial)
+    await _mark_tickets_changed(draw_id)
+    summary.prize_per_ticket = distribution.prize_per_ticket
+    summary.elapsed = time.perf_counter() - started
+    
+    _log_summary(summary)
+    return summary
@@ -1,53 +1,74 @@
-"""Background service for synchronizing draw data from external API."""
+"""Synchronization of draw data from external API."""
 import logging
-import asyncio
-from api.client import LotteryAPIClient
+from typing import Optional
+from api.client import api_client
 from db.database import async_session_maker
-from db.crud_draws import create_or_update_draw, get_current_draw
+from db.crud_draws import create_or_update_draw
+from db.models import Draw
 
 logger = logging.getLogger(__name__)
 
 
-async def sync_current_draw():
-    """Synchronize current draw data from API to database."""
+async def _store_draw(api_draw: dict) -> Draw:
+    """Save draw data from API to database."""
+    async with async_session_maker() as session:
+        draw = await create_or_update_draw(session, api_draw)
+
+    logger.info(f"Draw synchronized: {draw.name} (ID: {draw.external_id}, Status: {draw.status})")
+    if draw.winning_numbers:
+        logger.info(f"Winning numbers: {draw.winning_numbers}")
+    return draw
+
+
+async def sync_current_draw(fresh: bool = False) -> Optional[Draw]:
+    """
+    Synchronize current draw data from API to database.
+
+    Args:
+        fresh: Drop the cached current draw first, so the API is asked now
+            instead of serving a (possibly stale-while-revalidate) cached copy
+
+    Returns:
+        Synced draw or None if there is no current draw or API error
+    """
     try:
         logger.info("Starting draw synchronization...")
         
-        api_client = LotteryAPIClient()
+        if fresh:
+            api_client.invalidate_current_draw()
         
         # Get current draw from API
         api_draw = await api_client.get_current_draw()
         
         if not api_draw:
             logger.info("No current draw found in API")
-            return
+            return None
         
-        # Save to database
-        async with async_session_maker() as session:
-            draw = await create_or_update_draw(session, api_draw)
-            logger.info(f"Draw synchronized: {draw.name} (ID: {draw.external_id}, Status: {draw.status})")
-            
-            if draw.winning_numbers:
-                logger.info(f"Winning numbers: {draw.winning_numbers}")
+        return await _store_draw(api_draw)
     
     except Exception as e:
         logger.error(f"Error synchronizing draw: {e}", exc_info=True)
+        return None
 
 
-async def draw_sync_worker(interval: int = 300):
+async def sync_draw(draw_id: int) -> Optional[Draw]:
     """
-    Background worker that periodically synchronizes draw data.
+    Synchronize a specific draw from API to database (bypasses the response cache).
     
     Args:
-        interval: Sync interval in seconds (default: 300 = 5 minutes)
-    """
-    logger.info(f"Draw sync worker started (interval: {interval}s)")
+        draw_id: Draw ID in API
     
-    while True:
-        try:
-            await sync_current_draw()
-        except Exception as e:
-            logger.error(f"Unexpected error in draw sync worker: {e}", exc_info=True)
+    Returns:
+        Synced draw or None if not found or API error
+    """
+    try:
+        api_draw = await api_client.get_draw_by_id(draw_id)
         
-        # Wait before next sync
-        await asyncio.sleep(interval)
+        if not api_draw:
+            return None
+        
+        return await _store_draw(api_draw)
+    
+    except Exception as e:
+        logger.error(f"Error synchronizing draw {draw_id}: {e}", exc_info=True)
+        return None
@@ -0,0 +1,236 @@
+"""Monte-Carlo simulation of prize liability for the current ticket pool."""
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import combinations
+from math import comb
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Draw, Ticket
+from services.combination_counter import NUMBERS_TOTAL, NUMBERS_TO_PICK, rank_positions
+from services.prize_calculator import get_draw_prize_grid, get_draw_prize_pool
+from services.settlement_engine import popcount64, random_combinations
+from services.ticket_checker import PRIZE_TABLE
+
+logger = logging.getLogger(__name__)
+
+
+# Winning combinations simulated per NumPy batch
+SIMULATION_BATCH_SIZE = 100_000
+
+# Tickets processed per chunk while building subset tables
+_TABLE_CHUNK_SIZE = 200_000
+
+# For every subset size j: index tuples of the j-subsets of a 6-number combination
+_SUBSETS = {
+    j: np.array(list(combinations(range(NUMBERS_TO_PICK), j)), dtype=np.int64)
+    for j in range(NUMBERS_TO_PICK + 1)
+}
+
+
+@dataclass
+class LiabilityReport:
+    """Payout distribution over simulated winning combinations."""
+    tickets: int
+    simulations: int
+    mode: str  # "fixed" or "pari-mutuel"
+    mean: float
+    std: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    max_numbers: list = field(default_factory=list)  # winning numbers of the worst case
+    tier_hit_rate: Dict[int, float] = field(default_factory=dict)  # share of draws with >=1 winner per tier
+    elapsed: float = 0.0
+
+
+def _masks_to_positions(masks: np.ndarray) -> np.ndarray:
+    """(n, 6) sorted 0-based number positions of 6-number masks."""
+    bits = ((masks[:, None] >> np.arange(NUMBERS_TOTAL, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+    return np.nonzero(bits)[1].reshape(len(masks), NUMBERS_TO_PICK)
+
+
+class LiabilitySimulator:
+    """
+    Payout simulator for a fixed ticket pool.
+    
+    Matching every ticket against every simulated combination would cost
+    tickets x simulations. Instead the pool is summarised once as
+    "tickets containing subset S" tables for all subsets of size j
+    (C(45,j) entries, indexed by combinadic rank). For a winning
+    combination w, A_j = sum of the table over the C(6,j) j-subsets of w
+    equals sum_k C(k,j) * N_k, where N_k is the number of tickets with
+    exactly k matches; solving this triangular system from k = 6 down
+    gives exact tier counts in 42 lookups per simulation, independent of
+    the pool size.
+    """
+    
+    def __init__(self, masks: np.ndarray, min_matches: int = 3):
+        """
+        Args:
+            masks: uint64 ticket bitmasks (tickets without exactly 6 numbers are ignored)
+            min_matches: Lowest tier to compute
+        """
+        masks = np.asarray(masks, dtype=np.uint64)
+        masks = masks[popcount64(masks) == NUMBERS_TO_PICK]
+        
+        self.tickets = len(masks)
+        self.min_matches = min_matches
+        self._tables = {
+            j: np.zeros(comb(NUMBERS_TOTAL, j), dtype=np.int64)
+            for j in range(min_matches, NUMBERS_TO_PICK + 1)
+        }
+        
+        for start in range(0, len(masks), _TABLE_CHUNK_SIZE):
+            positions = _masks_to_positions(masks[start:start + _TABLE_CHUNK_SIZE])
+            for j, table in self._tables.items():
+                subset_ranks = np.concatenate([rank_positions(positions[:, idx]) for idx in _SUBSETS[j]])
+                table += np.bincount(subset_ranks, minlength=len(table))
+    
+    def tier_counts(self, winning: np.ndarray) -> Dict[int, np.ndarray]:
+        """
+        Exact number of tickets per match count for each winning combination.
+        
+        Args:
+            winning: (n, 6) sorted winning numbers (1-45)
+        
+        Returns:
+            {matches: int64 array of n counts} for matches >= min_matches
+        """
+        positions = np.asarray(winning, dtype=np.int64) - 1
+        
+        # A_j: tickets containing each j-subset of the winning combination, summed
+        totals = {
+            j: sum(table[rank_positions(positions[:, idx])] for idx in _SUBSETS[j])
+            for j, table in self._tables.items()
+        }
+        
+        counts = {}
+        for k in range(NUMBERS_TO_PICK, self.min_matches - 1, -1):
+            counts[k] = totals[k] - sum(comb(m, k) * counts[m] for m in range(k + 1, NUMBERS_TO_PICK + 1))
+        return counts
+    
+    def simulate(
+        self,
+        simulations: int,
+        prize_table: Optional[Dict[int, float]] = None,
+        tier_pools: Optional[Dict[int, float]] = None,
+        batch_size: int = SIMULATION_BATCH_SIZE,
+        seed: Optional[int] = None
+    ) -> LiabilityReport:
+        """
+        Simulate random draws and summarise the payout distribution.
+        
+        Exactly one of prize_table / tier_pools is used:
+            prize_table -- fixed prize per winning ticket (PRIZE_TABLE)
+            tier_pools  -- pari-mutuel: a tier pays its whole pool if it has
+                           at least one winner (draw prize grid)
+        
+        Args:
+            simulations: Number of random winning combinations
+            prize_table: Prize per ticket by matches
+            tier_pools: Pool per tier by matches
+            batch_size: Combinations per NumPy batch
+            seed: RNG seed (random if None)
+        """
+        started = time.perf_counter()
+        pari_mutuel = tier_pools is not None
+        amounts = tier_pools if pari_mutuel else (prize_table if prize_table is not None else PRIZE_TABLE)
+        amounts = {k: float(v) for k, v in amounts.items() if k >= self.min_matches}
+        
+        rng = np.random.default_rng(seed)
+        payouts = np.empty(simulations, dtype=np.float64)
+        hits = {k: 0 for k in amounts}
+        worst_payout, worst_numbers = -1.0, []
+        
+        for start in range(0, simulations, batch_size):
+            size = min(batch_size, simulations - start)
+            winning = random_combinations(size, rng)
+            counts = self.tier_counts(winning)
+            
+            payout = np.zeros(size, dtype=np.float64)
+            for k, amount in amounts.items():
+                won = counts[k] > 0
+                hits[k] += int(won.sum())
+                payout += amount * (won if pari_mutuel else counts[k])
+            payouts[start:start + size] = payout
+            
+            worst = int(payout.argmax())
+            if payout[worst] > worst_payout:
+                worst_payout, worst_numbers = float(payout[worst]), winning[worst].tolist()
+        
+        p50, p95, p99 = np.percentile(payouts, [50, 95, 99]) if simulations else (0.0, 0.0, 0.0)
+        return LiabilityReport(
+            tickets=self.tickets,
+            simulations=simulations,
+            mode="pari-mutuel" if pari_mutuel else "fixed",
+            mean=float(payouts.mean()) if simulations else 0.0,
+            std=float(payouts.std()) if simulations else 0.0,
+            p50=float(p50),
+            p95=float(p95),
+            p99=float(p99),
+            max=max(worst_payout, 0.0),
+            max_numbers=worst_numbers,
+            tier_hit_rate={k: hits[k] / simulations for k in sorted(hits, reverse=True)} if simulations else {},
+            elapsed=time.perf_counter() - started
+        )
+
+
+def draw_tier_pools(draw: Draw) -> Dict[int, Decimal]:
+    """Pool per tier from the draw's prize grid and prize pool."""
+    prize_pool = get_draw_prize_pool(draw)
+    return {tier.matches: tier.pool(prize_pool) for tier in get_draw_prize_grid(draw)}
+
+
+async def load_draw_masks(session: AsyncSession, draw_id: int, chunk_size: int = 50000) -> np.ndarray:
+    """Stream numbers masks of all filled tickets of a draw."""
+    chunks = []
+    stream = await session.stream(
+        select(Ticket.numbers_mask)
+        .where(Ticket.draw_id == draw_id, Ticket.numbers_mask.isnot(None))
+        .execution_options(yield_per=chunk_size)
+    )
+    async for partition in stream.partitions():
+        chunks.append(np.fromiter((row.numbers_mask for row in partition), dtype=np.uint64, count=len(partition)))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint64)
+
+
+async def simulate_draw_liability(
+    session: AsyncSession,
+    draw: Draw,
+    simulations: int = 1_000_000,
+    pari_mutuel: bool = False,
+    seed: Optional[int] = None
+) -> LiabilityReport:
+    """
+    Simulate payout distribution for tickets filled so far in a draw.
+    
+    Args:
+        session: Database session
+        draw: Draw (usually the current one)
+        simulations: Number of random winning combinations
+        pari_mutuel: Use the draw's prize grid instead of PRIZE_TABLE
+        seed: RNG seed
+    
+    Returns:
+        LiabilityReport
+    """
+    masks = await load_draw_masks(session, draw.external_id)
+    tier_pools = draw_tier_pools(draw) if pari_mutuel else None
+    min_matches = min(tier_pools) if tier_pools else min(PRIZE_TABLE)
+    
+    simulator = LiabilitySimulator(masks, min_matches=min_matches)
+    report = simulator.simulate(simulations, tier_pools=tier_pools, seed=seed)
+    
+    logger.info(
+        f"Liability for draw {draw.external_id} ({report.mode}, {report.tickets} tickets, "
+        f"{report.simulations} simulations): mean {report.mean:.0f}, p95 {report.p95:.0f}, "
+        f"p99 {report.p99:.0f}, max {report.max:.0f}, {report.elapsed:.2f}s"
+    )
+    return report
@@ -0,0 +1,287 @@
+"""Bulk auto-generation of numbers for unfilled tickets at draw start."""
+import asyncio
+import logging
+import secrets
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select, text, update
+
+from api.client import api_client
+from config import settings
+from db.crud_tickets import sync_user_tickets_from_api
+from db.database import async_session_maker, unit_of_work
+from db.models import Ticket, User
+from services.settlement_engine import masks_from_numbers
+
+logger = logging.getLogger(__name__)
+
+
+NUMBERS_TOTAL = 45
+NUMBERS_TO_PICK = 6
+
+# filled_by of generated tickets. Together with filled_at IS NULL it marks
+# tickets generated locally but not yet pushed to the API (resume point).
+AUTOFILL_FILLED_BY = "auto"
+
+# Progress callback: (phase, done, total), phase is "generate" or "push"
+ProgressCallback = Callable[[str, int, int], None]
+
+_FILL_CHUNK_STATEMENT = text(
+    """
+    UPDATE tickets AS t
+    SET numbers = ARRAY[v.n1, v.n2, v.n3, v.n4, v.n5, v.n6],
+        numbers_mask = v.numbers_mask,
+        filled_by = :filled_by,
+        filled_at = NULL,
+        status = 'active',
+        updated_at = :updated_at
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:n1 AS integer[]), CAST(:n2 AS integer[]), CAST(:n3 AS integer[]),
+        CAST(:n4 AS integer[]), CAST(:n5 AS integer[]), CAST(:n6 AS integer[]),
+        CAST(:masks AS bigint[])
+    ) AS v(id, n1, n2, n3, n4, n5, n6, numbers_mask)
+    WHERE t.id = v.id AND t.numbers IS NULL
+    """
+)
+
+# Owners of a filled chunk see changed tickets
+_BUMP_CHUNK_VERSIONS_STATEMENT = text(
+    """
+    UPDATE users SET tickets_version = tickets_version + 1, tickets_payload_hash = NULL
+    WHERE id IN (SELECT user_id FROM tickets WHERE id = ANY(CAST(:ids AS integer[])))
+    """
+)
+
+
+@dataclass
+class AutofillSummary:
+    """Totals of an auto-fill run."""
+    draw_id: int
+    generated: int = 0  # tickets filled locally in this run
+    pushed: int = 0  # tickets confirmed by the API
+    push_failed: int = 0  # tickets left pending after a failed API call
+    skipped: int = 0  # pending tickets without API customer ID
+    elapsed: float = 0.0
+
+
+def secure_random_combinations(count: int) -> np.ndarray:
+    """
+    Draw `count` independent random 6-of-45 combinations from the OS CSPRNG.
+    
+    Every row ranks 45 random 64-bit keys and keeps the positions of the 6
+    smallest, which is a uniformly random 6-subset (ties are negligible).
+    
+    Returns:
+        (count, 6) int64 array of sorted numbers (1-45)
+    """
+    keys = np.frombuffer(secrets.token_bytes(count * NUMBERS_TOTAL * 8), dtype=np.uint64)
+    keys = keys.reshape(count, NUMBERS_TOTAL)
+    picks = np.argpartition(keys, NUMBERS_TO_PICK - 1, axis=1)[:, :NUMBERS_TO_PICK]
+    return np.sort(picks, axis=1) + 1
+
+
+async def generate_missing_numbers(
+    draw_id: int,
+    chunk_size: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None
+) -> int:
+    """
+    Fill numbers of all tickets of a draw that have none.
+    
+    One UPDATE ... FROM unnest(...) and one commit per chunk, so an
+    interrupted run keeps the chunks already written and the next run only
+    picks up tickets that are still empty.
+    
+    Args:
+        draw_id: Draw ID in API
+        chunk_size: Tickets per UPDATE (default settings.autofill_chunk_size)
+        progress: Called after every chunk
+    
+    Returns:
+        Number of tickets filled
+    """
+    chunk_size = chunk_size or settings.autofill_chunk_size
+    filled = 0
+    last_id = 0
+    
+    async with async_session_maker() as session:
+        total = await session.scalar(
+            select(func.count()).select_from(Ticket).where(Ticket.draw_id == draw_id, Ticket.numbers.is_(None))
+        )
+        
+        while True:
+            ticket_ids = list(await session.scalars(
+                select(Ticket.id)
+                .where(Ticket.draw_id == draw_id, Ticket.numbers.is_(None), Ticket.id > last_id)
+                .order_by(Ticket.id)
+                .limit(chunk_size)
+            ))
+            if not ticket_ids:
+                break
+            
+            numbers = secure_random_combinations(len(ticket_ids))
+            params = {f"n{i + 1}": numbers[:, i].tolist() for i in range(NUMBERS_TO_PICK)}
+            result = await session.execute(_FILL_CHUNK_STATEMENT, {
+                **params,
+                "ids": ticket_ids,
+                "masks": masks_from_numbers(numbers).astype(np.int64).tolist(),
+                "filled_by": AUTOFILL_FILLED_BY,
+                "updated_at": datetime.utcnow()
+            })
+            await session.execute(_BUMP_CHUNK_VERSIONS_STATEMENT, {"ids": ticket_ids})
+            await session.commit()
+            
+            filled += result.rowcount
+            last_id = ticket_ids[-1]
+            if progress:
+                progress("generate", filled, total)
+    
+    logger.info(f"Generated numbers for {filled} tickets of draw {draw_id}")
+    return filled
+
+
+async def _load_pending_tickets(draw_id: int) -> List:
+    """Tickets filled locally but not yet pushed, ordered per customer."""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Ticket.external_id, Ticket.customer_id, Ticket.user_id, Ticket.numbers)
+            .where(
+                Ticket.draw_id == draw_id,
+                Ticket.filled_by == AUTOFILL_FILLED_BY,
+                Ticket.filled_at.is_(None),
+                Ticket.numbers.isnot(None)
+            )
+            .order_by(Ticket.customer_id, Ticket.external_id)
+        )
+        return result.all()
+
+
+async def _store_filled_tickets(draw_id: int, customer_id: int, user_id: int, filled_tickets: list) -> None:
+    """Save tickets confirmed by the API and clear their pending mark (one transaction)."""
+    async with async_session_maker() as session, unit_of_work(session):
+        # Vouchers were spent upstream, keep the local balance in step
+        await session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                available_tickets=func.greatest(func.coalesce(User.available_tickets, 0) - len(filled_tickets), 0),
+                tickets_version=User.tickets_version + 1,
+                tickets_payload_hash=None
+            )
+        )
+        await sync_user_tickets_from_api(session, user_id, customer_id, filled_tickets, commit=False)
+        
+        # API may omit filled_at, the ticket is pushed either way
+        await session.execute(
+            update(Ticket)
+            .where(
+                Ticket.draw_id == draw_id,
+                Ticket.external_id.in_([t.get("id") for t in filled_tickets]),
+                Ticket.filled_at.is_(None)
+            )
+            .values(filled_at=datetime.utcnow())
+        )
+
+
+async def push_generated_numbers(
+    draw_id: int,
+    concurrency: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None
+) -> AutofillSummary:
+    """
+    Push locally generated numbers to the API, one fill request per customer.
+    
+    The API fills a customer's first unfilled tickets in order, so numbers
+    are sent ordered by external ticket ID. Tickets of failed requests keep
+    their pending mark and are retried on the next run.
+    
+    Args:
+        draw_id: Draw ID in API
+        concurrency: Simultaneous fill requests (default settings.autofill_push_concurrency)
+        progress: Called after every batch of customers
+    
+    Returns:
+        AutofillSummary (pushed, push_failed and skipped are set)
+    """
+    concurrency = concurrency or settings.autofill_push_concurrency
+    summary = AutofillSummary(draw_id=draw_id)
+    
+    # Group pending tickets by customer
+    by_customer: Dict[int, List] = defaultdict(list)
+    for row in await _load_pending_tickets(draw_id):
+        if row.customer_id is None:
+            summary.skipped += 1
+        else:
+            by_customer[row.customer_id].append(row)
+    total = sum(len(rows) for rows in by_customer.values())
+    
+    if summary.skipped:
+        logger.warning(f"{summary.skipped} generated tickets of draw {draw_id} have no customer ID, not pushed")
+    
+    customers = list(by_customer.items())
+    for start in range(0, len(customers), concurrency):
+        batch = customers[start:start + concurrency]
+        results = await asyncio.gather(
+            *(
+                api_client.fill_tickets(customer_id, draw_id, [row.numbers for row in rows])
+                for customer_id, rows in batch
+            ),
+            return_exceptions=True
+        )
+        
+        # Save results sequentially, each in its own short transaction
+        for (customer_id, rows), filled_tickets in zip(batch, results):
+            if isinstance(filled_tickets, Exception) or not filled_tickets:
+                if isinstance(filled_tickets, Exception):
+                    logger.error(f"Error filling tickets for customer {customer_id}: {filled_tickets}")
+                summary.push_failed += len(rows)
+                continue
+            
+            await _store_filled_tickets(draw_id, customer_id, rows[0].user_id, filled_tickets)
+            summary.pushed += len(filled_tickets)
+            summary.push_failed += max(len(rows) - len(filled_tickets), 0)
+        
+        if progress:
+            progress("push", summary.pushed + summary.push_failed, total)
+    
+    logger.info(
+        f"Pushed {summary.pushed} generated tickets of draw {draw_id} "
+        f"({summary.push_failed} failed, {summary.skipped} skipped)"
+    )
+    return summary
+
+
+async def autofill_draw(
+    draw_id: int,
+    chunk_size: Optional[int] = None,
+    push: bool = True,
+    progress: Optional[ProgressCallback] = None
+) -> AutofillSummary:
+    """
+    Generate numbers for all unfilled tickets of a draw and push them to the API.
+    
+    Safe to re-run after an interruption: empty tickets are generated,
+    generated-but-unpushed tickets are pushed, finished ones are left alone.
+    
+    Args:
+        draw_id: Draw ID in API
+        chunk_size: Tickets per UPDATE
+        push: Also push generated numbers to the API
+        progress: Progress callback (phase, done, total)
+    
+    Returns:
+        AutofillSummary
+    """
+    started = time.perf_counter()
+    generated = await generate_missing_numbers(draw_id, chunk_size, progress)
+    
+    summary = await push_generated_numbers(draw_id, progress=progress) if push else AutofillSummary(draw_id=draw_id)
+    summary.generated = generated
+    summary.elapsed = time.perf_counter() - started
+    return summary
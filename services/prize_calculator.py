@@ -0,0 +1,196 @@
+"""Pari-mutuel prize computation from a draw's prize grid and prize pool."""
+import json
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_DOWN, InvalidOperation
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from db.models import Draw
+from services.ticket_checker import PRIZE_TABLE
+
+logger = logging.getLogger(__name__)
+
+
+# Prize amounts are stored as Numeric(10, 2)
+CENT = Decimal("0.01")
+
+# Fund used when the draw has no prize pool (sum of the fixed prize table)
+DEFAULT_PRIZE_POOL = Decimal(sum(PRIZE_TABLE.values()))
+
+# Keys accepted in prize grid entries
+_MATCHES_KEYS = ("matches", "match_count", "matched_count", "matched", "guessed")
+_PERCENT_KEYS = ("percent", "percentage", "share_percent")
+_SHARE_KEYS = ("share", "fraction")
+_AMOUNT_KEYS = ("amount", "fund", "pool", "prize")
+
+
+@dataclass(frozen=True)
+class PrizeTier:
+    """Prize grid tier: a share of the prize pool or a fixed fund split among winners."""
+    matches: int
+    share: Optional[Decimal] = None  # fraction of prize pool (0.4 = 40%)
+    amount: Optional[Decimal] = None  # fixed tier fund
+    
+    def pool(self, prize_pool: Decimal) -> Decimal:
+        """Money shared by all winners of the tier."""
+        if self.amount is not None:
+            return self.amount
+        return (prize_pool * (self.share or 0)).quantize(CENT, rounding=ROUND_DOWN)
+
+
+# Tiers matching the fixed prize table: 40/25/20/15% of the fund
+DEFAULT_PRIZE_GRID: Tuple[PrizeTier, ...] = tuple(
+    PrizeTier(matches=matches, share=Decimal(amount) / DEFAULT_PRIZE_POOL)
+    for matches, amount in sorted(PRIZE_TABLE.items(), reverse=True)
+)
+
+
+@dataclass
+class PrizeDistribution:
+    """Result of splitting tier pools among winners."""
+    prize_pool: Decimal
+    winners: Dict[int, int] = field(default_factory=dict)  # matches -> winning tickets
+    prize_per_ticket: Dict[int, Decimal] = field(default_factory=dict)  # matches -> prize
+    total_prize: Decimal = Decimal(0)
+    unclaimed: Decimal = Decimal(0)  # tier pools without winners and rounding remainders
+
+
+def _decimal(value) -> Optional[Decimal]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return Decimal(str(value).replace(",", ".").rstrip("%").strip())
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _first(entry: dict, keys: Tuple[str, ...]):
+    for key in keys:
+        if entry.get(key) is not None:
+            return entry[key]
+    return None
+
+
+def _parse_tier(matches, value) -> Optional[PrizeTier]:
+    """Parse one grid entry; bare numbers are percents of the prize pool."""
+    try:
+        matches = int(matches)
+    except (TypeError, ValueError):
+        return None
+    
+    if isinstance(value, dict):
+        percent = _decimal(_first(value, _PERCENT_KEYS))
+        share = _decimal(_first(value, _SHARE_KEYS))
+        amount = _decimal(_first(value, _AMOUNT_KEYS))
+        if percent is not None:
+            return PrizeTier(matches=matches, share=percent / 100)
+        if share is not None:
+            return PrizeTier(matches=matches, share=share)
+        if amount is not None:
+            return PrizeTier(matches=matches, amount=amount)
+        return None
+    
+    percent = _decimal(value)
+    if percent is None:
+        return None
+    return PrizeTier(matches=matches, share=percent / 100)
+
+
+@lru_cache(maxsize=256)
+def parse_prize_grid(prize_grid: Optional[str]) -> Tuple[PrizeTier, ...]:
+    """
+    Parse prize grid JSON as synced from API.
+    
+    Cached by the JSON string, so a draw's grid is parsed once, not per ticket.
+    Accepted forms:
+        {"6": 40, "5": 25, ...}                       percent of prize pool per tier
+        {"6": {"percent": 40}, "3": {"amount": 1000}}  percent, share or fixed tier fund
+        [{"matches": 6, "percent": 40}, ...]          list of tier objects
+    
+    Args:
+        prize_grid: Draw.prize_grid JSON string
+    
+    Returns:
+        Tiers sorted by matches (descending); empty tuple if grid is missing or invalid
+    """
+    if not prize_grid:
+        return ()
+    try:
+        data = json.loads(prize_grid)
+    except (json.JSONDecodeError, TypeError):
+        logger.warning(f"Invalid prize grid JSON: {prize_grid!r}")
+        return ()
+    
+    # {"tiers": [...]} wrapper
+    if isinstance(data, dict) and isinstance(data.get("tiers"), list):
+        data = data["tiers"]
+    
+    if isinstance(data, dict):
+        entries = list(data.items())
+    elif isinstance(data, list):
+        entries = [
+            (_first(entry, _MATCHES_KEYS), entry)
+            for entry in data if isinstance(entry, dict)
+        ]
+    else:
+        return ()
+    
+    tiers = {}
+    for matches, value in entries:
+        tier = _parse_tier(matches, value)
+        if tier is not None:
+            tiers[tier.matches] = tier
+    
+    if not tiers:
+        logger.warning(f"Prize grid has no usable tiers: {prize_grid!r}")
+    return tuple(tiers[m] for m in sorted(tiers, reverse=True))
+
+
+def get_draw_prize_grid(draw: Draw) -> Tuple[PrizeTier, ...]:
+    """Draw's prize grid, or tiers equivalent to the fixed prize table."""
+    return parse_prize_grid(draw.prize_grid) or DEFAULT_PRIZE_GRID
+
+
+def get_draw_prize_pool(draw: Draw) -> Decimal:
+    """Draw's prize pool, or the fixed prize table fund."""
+    prize_pool = _decimal(draw.prize_pool)
+    return prize_pool if prize_pool else DEFAULT_PRIZE_POOL
+
+
+def split_prizes(
+    tiers: Tuple[PrizeTier, ...],
+    prize_pool: Decimal,
+    winner_counts: Dict[int, int]
+) -> PrizeDistribution:
+    """
+    Split every tier pool equally among the tier's winners.
+    
+    Prizes are rounded down to cents, so the sum never exceeds the pool.
+    
+    Args:
+        tiers: Prize grid
+        prize_pool: Draw prize pool
+        winner_counts: Number of tickets per match count
+    
+    Returns:
+        PrizeDistribution
+    """
+    distribution = PrizeDistribution(prize_pool=prize_pool)
+    
+    for tier in tiers:
+        tier_pool = tier.pool(prize_pool)
+        winners = winner_counts.get(tier.matches, 0)
+        
+        if not winners or tier_pool <= 0:
+            distribution.unclaimed += max(tier_pool, Decimal(0))
+            continue
+        
+        prize = (tier_pool / winners).quantize(CENT, rounding=ROUND_DOWN)
+        distribution.winners[tier.matches] = winners
+        distribution.prize_per_ticket[tier.matches] = prize
+        distribution.total_prize += prize * winners
+        distribution.unclaimed += tier_pool - prize * winners
+    
+    return distribution
+
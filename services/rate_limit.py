@@ -0,0 +1,120 @@
+"""Rate limiters for Telegram traffic."""
+import asyncio
+import time
+from typing import Dict, Tuple
+
+
+class TokenBucket:
+    """
+    Token bucket shared by concurrent senders.
+    
+    Tokens refill at `rate` per second up to `capacity` (burst). acquire()
+    waits until a token is available; pause() empties the bucket for a
+    while, e.g. when Telegram answers 429 with retry_after.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {"acquired": 0, "waits": 0, "pauses": 0}
+    
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self) -> None:
+        """Take one token, waiting for it if necessary."""
+        # Waiters are served one by one in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.stats["acquired"] += 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+                self.stats["waits"] += 1
+                await asyncio.sleep(delay)
+    
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds`, then restart with an empty bucket."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0
+            self._updated = until
+            self.stats["pauses"] += 1
+
+
+class KeyedRateLimiter:
+    """
+    Minimum interval between events of the same key (e.g. messages to one chat).
+    
+    Keys whose interval has passed are forgotten once more than MAX_KEYS
+    are tracked.
+    """
+    
+    MAX_KEYS = 10000
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_allowed: Dict[int, float] = {}
+        self.stats = {"waits": 0}
+    
+    def reserve(self, key: int) -> float:
+        """Reserve the next slot for key and return seconds to wait for it."""
+        now = time.monotonic()
+        if len(self._next_allowed) > self.MAX_KEYS:
+            self._next_allowed = {k: t for k, t in self._next_allowed.items() if t > now}
+        
+        slot = max(now, self._next_allowed.get(key, 0.0))
+        self._next_allowed[key] = slot + self.interval
+        return slot - now
+    
+    async def acquire(self, key: int) -> None:
+        """Wait for the key's next slot."""
+        delay = self.reserve(key)
+        if delay > 0:
+            self.stats["waits"] += 1
+            await asyncio.sleep(delay)
+
+
+class KeyedTokenBucket:
+    """
+    Token bucket per key that never waits (e.g. updates from one user).
+    
+    Each key refills at `rate` tokens per second up to `capacity`. Keys whose
+    bucket is full again are forgotten once more than MAX_KEYS are tracked.
+    """
+    
+    MAX_KEYS = 10000
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[int, Tuple[float, float]] = {}
+    
+    def try_acquire(self, key: int) -> bool:
+        """Take one token of key, False if its bucket is empty."""
+        now = time.monotonic()
+        if len(self._buckets) > self.MAX_KEYS:
+            self._buckets = {
+                k: (tokens, updated) for k, (tokens, updated) in self._buckets.items()
+                if tokens + (now - updated) * self.rate < self.capacity
+            }
+        
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        return True
@@ -0,0 +1,138 @@
+"""Vectorized draw settlement over 45-bit ticket bitmasks."""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from services.ticket_checker import PRIZE_TABLE, numbers_to_mask
+
+
+# Highest possible match count for 6-of-45
+MAX_MATCHES = 6
+
+# Minimal number of matches that wins a prize
+MIN_WINNING_MATCHES = min(PRIZE_TABLE)
+
+
+@dataclass
+class SettlementResult:
+    """Per-ticket settlement results and per-tier winner counts."""
+    matched_count: np.ndarray  # uint8, matches per ticket
+    is_winner: np.ndarray  # bool, ticket has a prize-winning number of matches
+    prize_amount: np.ndarray  # int64, prize per ticket
+    tier_counts: Dict[int, int]  # matches -> number of tickets
+    
+    @property
+    def total_prize(self) -> int:
+        return int(self.prize_amount.sum())
+
+
+def masks_from_numbers(tickets: Iterable[Sequence[int]]) -> np.ndarray:
+    """
+    Pack ticket number lists into a uint64 bitmask array.
+    
+    Args:
+        tickets: Iterable of number lists (1-45)
+    
+    Returns:
+        uint64 array with one bitmask per ticket
+    """
+    tickets = list(tickets)
+    if not tickets:
+        return np.zeros(0, dtype=np.uint64)
+    
+    try:
+        numbers = np.asarray(tickets, dtype=np.uint64)
+    except ValueError:
+        numbers = None
+    
+    if numbers is None or numbers.ndim != 2:
+        # Ragged input (unexpected ticket sizes), pack one by one
+        return np.fromiter((numbers_to_mask(t) for t in tickets), dtype=np.uint64, count=len(tickets))
+    
+    bits = np.left_shift(np.uint64(1), numbers - np.uint64(1))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def masks_to_numbers(masks: np.ndarray) -> List[List[int]]:
+    """Unpack bitmasks back into sorted number lists."""
+    positions = np.arange(45, dtype=np.uint64)
+    bits = (masks[:, None] >> positions) & np.uint64(1)
+    return [(np.flatnonzero(row) + 1).tolist() for row in bits]
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Count set bits in each uint64 value."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    
+    # SWAR popcount for older NumPy
+    v = values.astype(np.uint64, copy=True)
+    v -= (v >> np.uint64(1)) & np.uint64(0x5555555555555555)
+    v = (v & np.uint64(0x3333333333333333)) + ((v >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    v = (v + (v >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((v * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def prize_lookup_table(prize_table: Dict[int, int] = PRIZE_TABLE) -> np.ndarray:
+    """Build array mapping match count to prize amount."""
+    lookup = np.zeros(MAX_MATCHES + 1, dtype=np.int64)
+    for matches, amount in prize_table.items():
+        lookup[matches] = amount
+    return lookup
+
+
+def count_matches(masks: np.ndarray, winning_numbers: List[int]) -> np.ndarray:
+    """
+    Count matches of every ticket against winning numbers.
+    
+    Args:
+        masks: uint64 ticket bitmasks
+        winning_numbers: Winning combination
+    
+    Returns:
+        uint8 array of match counts
+    """
+    winning_mask = np.uint64(numbers_to_mask(winning_numbers))
+    return popcount64(masks & winning_mask).astype(np.uint8)
+
+
+def settle_masks(
+    masks: np.ndarray,
+    winning_numbers: List[int],
+    prize_table: Dict[int, int] = PRIZE_TABLE
+) -> SettlementResult:
+    """
+    Settle tickets against winning numbers in one vectorized pass.
+    
+    Args:
+        masks: uint64 ticket bitmasks (see masks_from_numbers)
+        winning_numbers: Winning combination
+        prize_table: Prize per number of matches
+    
+    Returns:
+        SettlementResult with matched_count, is_winner, prize_amount and tier_counts
+    """
+    matched = count_matches(masks, winning_numbers)
+    prize = prize_lookup_table(prize_table)[matched]
+    counts = np.bincount(matched, minlength=MAX_MATCHES + 1)
+    
+    return SettlementResult(
+        matched_count=matched,
+        is_winner=matched >= MIN_WINNING_MATCHES,
+        prize_amount=prize,
+        tier_counts={matches: int(count) for matches, count in enumerate(counts)}
+    )
+
+
+def random_combinations(count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw `count` independent uniform 6-of-45 combinations.
+    
+    Returns:
+        (count, 6) int array of sorted numbers 1-45
+    """
+    keys = rng.random((count, 45))
+    picks = np.argpartition(keys, MAX_MATCHES, axis=1)[:, :MAX_MATCHES] + 1
+    picks.sort(axis=1)
+    return picks
@@ -12,6 +12,25 @@ PRIZE_TABLE = {
 }
 
 
+def numbers_to_mask(numbers: List[int]) -> int:
+    """
+    Pack ticket numbers into a bitmask (number n sets bit n-1).
+    
+    A 6-of-45 combination fits into 45 bits, so matches between two
+    combinations are popcount(mask_a & mask_b).
+    
+    Args:
+        numbers: List of numbers from 1 to 45
+    
+    Returns:
+        Integer bitmask
+    """
+    mask = 0
+    for n in numbers:
+        mask |= 1 << (int(n) - 1)
+    return mask
+
+
 def calculate_matches(ticket_numbers: List[int], winning_numbers: List[int]) -> int:
     """
     Calculate number of matching numbers between ticket and winning combination.
@@ -0,0 +1,240 @@
+"""Inverted number -> tickets bitmap index for fast winner lookup."""
+import logging
+import struct
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+
+# Numbers in a 6-of-45 lottery
+NUMBERS_TOTAL = 45
+
+# Tickets streamed per chunk while building an index
+INDEX_BUILD_CHUNK_SIZE = 10000
+
+# Serialized index header: magic, version, draw_id, ticket count
+_HEADER = struct.Struct("<4sHqI")
+_MAGIC = b"TIDX"
+_VERSION = 1
+
+
+def _iter_bits(mask: int) -> Iterable[int]:
+    """Yield positions of set bits of a small mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _bitmap_positions(bitmap: int) -> np.ndarray:
+    """Positions of set bits of a large bitmap."""
+    data = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder="little"))
+
+
+def _bitmap_from_bools(bits: np.ndarray) -> int:
+    """Build bitmap with bit i set where bits[i] is True."""
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+class DrawTicketIndex:
+    """
+    Inverted index of one draw: number -> bitmap of ticket ordinals.
+    
+    Every ticket gets an ordinal (its position in the index); bitmap[n - 1]
+    has bit `ordinal` set if the ticket contains number n. Bitmaps are plain
+    Python ints, so intersections and counts (int.bit_count) run in C over
+    whole machine words. Match counts for a combination are computed with a
+    bit-sliced adder over the 6 bitmaps of the winning numbers: three
+    bitmaps hold the binary digits of every ticket's match count.
+    
+    The index is built in bulk (add_many) for one-off lookups such as
+    scripts/draw_winners.py. add() and remove() rewrite whole bitmaps
+    (Python ints are immutable), so they cost O(tickets) each and are not
+    meant for keeping an index current ticket by ticket.
+    """
+    
+    def __init__(self, draw_id: int):
+        self.draw_id = draw_id
+        self._bitmaps: List[int] = [0] * NUMBERS_TOTAL
+        self._ordinals: Dict[int, int] = {}  # ticket id -> ordinal
+        self._ticket_ids: List[int] = []  # ordinal -> ticket id
+        self._masks: List[int] = []  # ordinal -> numbers mask
+        self._alive = 0  # bitmap of ordinals of indexed tickets
+    
+    def __len__(self) -> int:
+        return self._alive.bit_count()
+    
+    def add(self, ticket_id: int, numbers_mask: Optional[int]) -> None:
+        """
+        Add ticket or replace its numbers; tickets without numbers are removed.
+        
+        Args:
+            ticket_id: Ticket ID in our database
+            numbers_mask: Ticket numbers bitmask (see services.ticket_checker.numbers_to_mask)
+        """
+        if not numbers_mask:
+            self.remove(ticket_id)
+            return
+        
+        ordinal = self._ordinals.get(ticket_id)
+        if ordinal is None:
+            ordinal = len(self._ticket_ids)
+            self._ordinals[ticket_id] = ordinal
+            self._ticket_ids.append(ticket_id)
+            self._masks.append(0)
+        elif self._masks[ordinal] == numbers_mask:
+            return
+        
+        bit = 1 << ordinal
+        old_mask = self._masks[ordinal]
+        for position in _iter_bits(old_mask & ~numbers_mask):
+            self._bitmaps[position] &= ~bit
+        for position in _iter_bits(numbers_mask & ~old_mask):
+            self._bitmaps[position] |= bit
+        
+        self._masks[ordinal] = numbers_mask
+        self._alive |= bit
+    
+    def remove(self, ticket_id: int) -> None:
+        """Remove ticket from index (its ordinal is not reused)."""
+        ordinal = self._ordinals.get(ticket_id)
+        if ordinal is None or not self._masks[ordinal]:
+            return
+        
+        bit = 1 << ordinal
+        for position in _iter_bits(self._masks[ordinal]):
+            self._bitmaps[position] &= ~bit
+        self._masks[ordinal] = 0
+        self._alive &= ~bit
+    
+    def _match_count_slices(self, numbers: List[int]) -> List[int]:
+        """Bit-sliced match counter: [ones, twos, fours] bitmaps over ordinals."""
+        ones = twos = fours = 0
+        for n in set(numbers):
+            carry = ones & self._bitmaps[n - 1]
+            ones ^= self._bitmaps[n - 1]
+            fours |= twos & carry
+            twos ^= carry
+        return [ones, twos, fours]
+    
+    def _exact_bitmap(self, slices: List[int], matches: int) -> int:
+        """Bitmap of tickets with exactly `matches` matches."""
+        result = self._alive
+        for digit, bitmap in enumerate(slices):
+            result &= bitmap if matches >> digit & 1 else ~bitmap
+        return result
+    
+    def matching_bitmap(self, numbers: List[int], min_matches: int) -> int:
+        """Bitmap of tickets matching at least min_matches of numbers."""
+        slices = self._match_count_slices(numbers)
+        result = 0
+        for matches in range(max(min_matches, 0), len(set(numbers)) + 1):
+            result |= self._exact_bitmap(slices, matches)
+        return result
+    
+    def count_matching(self, numbers: List[int], min_matches: int) -> int:
+        """Count tickets matching at least min_matches of numbers."""
+        return self.matching_bitmap(numbers, min_matches).bit_count()
+    
+    def tickets_matching(self, numbers: List[int], min_matches: int) -> List[int]:
+        """IDs of tickets matching at least min_matches of numbers."""
+        return [self._ticket_ids[o] for o in _bitmap_positions(self.matching_bitmap(numbers, min_matches)).tolist()]
+    
+    def tier_counts(self, numbers: List[int]) -> Dict[int, int]:
+        """Number of tickets per exact match count (0..len(numbers))."""
+        slices = self._match_count_slices(numbers)
+        return {
+            matches: self._exact_bitmap(slices, matches).bit_count()
+            for matches in range(len(set(numbers)) + 1)
+        }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize index (zlib-compressed ticket ids and masks)."""
+        live = [o for o in range(len(self._ticket_ids)) if self._masks[o]]
+        payload = struct.pack(
+            f"<{len(live)}q{len(live)}Q",
+            *(self._ticket_ids[o] for o in live),
+            *(self._masks[o] for o in live)
+        )
+        return _HEADER.pack(_MAGIC, _VERSION, self.draw_id, len(live)) + zlib.compress(payload)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DrawTicketIndex":
+        """Restore index serialized with to_bytes()."""
+        magic, version, draw_id, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a ticket index or unsupported version")
+        
+        values = struct.unpack(f"<{count}q{count}Q", zlib.decompress(data[_HEADER.size:]))
+        index = cls(draw_id)
+        index.add_many(zip(values[:count], values[count:]))
+        return index
+    
+    def add_many(self, tickets: Iterable) -> None:
+        """
+        Add (ticket_id, numbers_mask) pairs.
+        
+        New tickets are appended in bulk: each number's bitmap is extended
+        once per call instead of once per ticket.
+        """
+        first_ordinal = len(self._ticket_ids)
+        for ticket_id, numbers_mask in tickets:
+            ordinal = self._ordinals.get(ticket_id)
+            if ordinal is None:
+                if not numbers_mask:
+                    continue
+                self._ordinals[ticket_id] = len(self._ticket_ids)
+                self._ticket_ids.append(ticket_id)
+                self._masks.append(numbers_mask)
+            elif ordinal >= first_ordinal:
+                # Repeated within this call, bits are not set yet
+                self._masks[ordinal] = numbers_mask or 0
+            else:
+                self.add(ticket_id, numbers_mask)
+        
+        if len(self._ticket_ids) == first_ordinal:
+            return
+        
+        # Ordinals assigned above are consecutive, starting at first_ordinal
+        masks = np.array(self._masks[first_ordinal:], dtype=np.uint64)
+        for position in range(NUMBERS_TOTAL):
+            bits = (masks >> np.uint64(position)) & np.uint64(1) == 1
+            if bits.any():
+                self._bitmaps[position] |= _bitmap_from_bools(bits) << first_ordinal
+        self._alive |= _bitmap_from_bools(masks != 0) << first_ordinal
+
+
+async def build_draw_index(session: AsyncSession, draw_id: int) -> DrawTicketIndex:
+    """
+    Build index of a draw from the tickets table.
+    
+    Args:
+        session: Database session
+        draw_id: Draw ID in API (Ticket.draw_id)
+    
+    Returns:
+        DrawTicketIndex
+    """
+    started = time.perf_counter()
+    index = DrawTicketIndex(draw_id)
+    
+    stream = await session.stream(
+        select(Ticket.id, Ticket.numbers_mask)
+        .where(Ticket.draw_id == draw_id, Ticket.numbers_mask.isnot(None))
+        .order_by(Ticket.id)
+        .execution_options(yield_per=INDEX_BUILD_CHUNK_SIZE)
+    )
+    async for partition in stream.partitions():
+        index.add_many((row.id, row.numbers_mask) for row in partition)
+    
+    logger.info(f"Ticket index for draw {draw_id} built: {len(index)} tickets, {time.perf_counter() - started:.2f}s")
+    return index
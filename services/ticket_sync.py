@@ -1,110 +1,147 @@
 """Service for synchronizing user tickets from API."""
+import asyncio
+import hashlib
+import json
 import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.client import LotteryAPIClient
-from db.crud_tickets import sync_user_tickets_from_api, get_user_tickets
-from db.crud import get_user_by_telegram_id
+from config import settings
+from db.crud_tickets import sync_user_tickets_from_api
+from db.crud import update_user_from_api_data
+from db.database import unit_of_work
+from db.models import User
 
 logger = logging.getLogger(__name__)
 
+# Outcomes of sync_user_and_tickets (see ticket_sync_stats)
+_sync_stats = {
+    "fresh": 0,  # Synced within freshness window, no API calls
+    "unchanged": 0,  # Payload hash unchanged, no user/ticket writes
+    "applied": 0,  # Payload written to database
+    "api_calls": 0,
+    "api_calls_avoided": 0
+}
 
-async def sync_tickets_for_user(
-    session: AsyncSession,
-    telegram_id: int,
-    api_client: LotteryAPIClient,
-    draw_id: int = None
-) -> list:
+
+def ticket_sync_stats() -> Dict[str, int]:
     """
-    Synchronize tickets for a specific user from API.
-    
-    Args:
-        session: Database session
-        telegram_id: User's Telegram ID
-        api_client: API client instance
-        draw_id: Optional draw ID to filter tickets
+    Get tickets view sync statistics.
     
     Returns:
-        List of synced tickets
+        Dict with 'fresh', 'unchanged', 'applied', 'api_calls' and
+        'api_calls_avoided'.
     """
-    try:
-        logger.info(f"Syncing tickets for user {telegram_id}")
-        
-        # Get user from database
-        user = await get_user_by_telegram_id(session, telegram_id)
-        if not user:
-            logger.warning(f"User {telegram_id} not found in database")
-            return []
-        
-        # Check if user has external_id (customer ID in API)
-        if not user.external_id:
-            logger.warning(f"User {telegram_id} has no external_id, cannot fetch tickets")
-            # Try to get customer data first
-            from services.user_service import sync_user_data_from_api
-            await sync_user_data_from_api(session, telegram_id, api_client)
-            
-            # Refresh user
-            await session.refresh(user)
-            if not user.external_id:
-                logger.error(f"Still no external_id for user {telegram_id}")
-                return []
-        
-        customer_id = int(user.external_id)
-        logger.info(f"Fetching tickets for customer {customer_id}")
-        
-        # Get tickets from API
-        api_tickets = await api_client.get_customer_tickets(customer_id, draw_id)
-        
-        if api_tickets is None:
-            logger.error(f"Failed to fetch tickets from API for customer {customer_id}")
-            return []
-        
-        if not api_tickets:
-            logger.info(f"No tickets found for customer {customer_id}")
-            return []
-        
-        # Sync tickets to database
-        logger.info(f"Syncing {len(api_tickets)} tickets to database")
-        synced_tickets = await sync_user_tickets_from_api(
-            session, user.id, customer_id, api_tickets
-        )
-        
-        logger.info(f"Successfully synced {len(synced_tickets)} tickets for user {telegram_id}")
-        return synced_tickets
-    
-    except Exception as e:
-        logger.error(f"Error syncing tickets for user {telegram_id}: {e}", exc_info=True)
-        return []
+    return dict(_sync_stats)
+
 
+def payload_hash(customer_data: dict, api_tickets: list) -> str:
+    """Stable hash of customer and tickets API payloads."""
+    payload = json.dumps([customer_data, api_tickets], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
 
-async def get_user_tickets_with_sync(
+
+def is_sync_fresh(user: User, now: Optional[datetime] = None) -> bool:
+    """True if user's tickets were synced within settings.ticket_sync_freshness."""
+    if settings.ticket_sync_freshness <= 0 or user.tickets_synced_at is None:
+        return False
+    now = now or datetime.utcnow()
+    return now - user.tickets_synced_at < timedelta(seconds=settings.ticket_sync_freshness)
+
+
+async def sync_user_and_tickets(
     session: AsyncSession,
-    telegram_id: int,
+    user: User,
     api_client: LotteryAPIClient,
-    draw_id: int = None,
-    force_sync: bool = True
+    draw_id: int = None
 ) -> list:
     """
-    Get user's tickets with optional sync from API.
+    Synchronize user's customer data and tickets from API.
+    
+    Nothing is requested if the user was synced less than
+    settings.ticket_sync_freshness seconds ago. Otherwise both API requests
+    are in flight at once (a user synced for the first time needs the
+    customer ID first), and if the payload hash equals the one last applied
+    only the sync time is written. Database writes run one after another
+    in short units of work, no connection is held while the API is awaited.
     
     Args:
         session: Database session
-        telegram_id: User's Telegram ID
+        user: User to update (already loaded)
         api_client: API client instance
         draw_id: Optional draw ID to filter tickets
-        force_sync: If True, sync from API first
     
     Returns:
-        List of tickets
+        List of tickets inserted or changed by the sync
     """
-    # Sync from API if requested
-    if force_sync:
-        await sync_tickets_for_user(session, telegram_id, api_client, draw_id)
+    now = datetime.utcnow()
+    if is_sync_fresh(user, now):
+        _sync_stats["fresh"] += 1
+        _sync_stats["api_calls_avoided"] += 2
+        logger.info(f"User {user.telegram_id} synced at {user.tickets_synced_at}, skipping API sync")
+        return []
+    
+    customer_id = int(user.external_id) if user.external_id else None
+    if customer_id:
+        customer_data, api_tickets = await asyncio.gather(
+            api_client.get_customer_by_phone(user.phone),
+            api_client.get_customer_tickets(customer_id, draw_id)
+        )
+        _sync_stats["api_calls"] += 2
+    else:
+        customer_data = await api_client.get_customer_by_phone(user.phone)
+        api_tickets = None
+        _sync_stats["api_calls"] += 1
+        if customer_data and customer_data.get("id"):
+            customer_id = int(customer_data["id"])
+            api_tickets = await api_client.get_customer_tickets(customer_id, draw_id)
+            _sync_stats["api_calls"] += 1
     
-    # Get user from database
-    user = await get_user_by_telegram_id(session, telegram_id)
-    if not user:
+    # Sync time is recorded only when both payloads were received
+    digest = None
+    if customer_data and api_tickets is not None:
+        digest = payload_hash(customer_data, api_tickets)
+        if digest == user.tickets_payload_hash:
+            _sync_stats["unchanged"] += 1
+            async with unit_of_work(session):
+                user.tickets_synced_at = now
+            logger.info(f"API data of user {user.telegram_id} unchanged since last sync")
+            return []
+    
+    if customer_data:
+        async with unit_of_work(session):
+            await update_user_from_api_data(session, user, customer_data)
+    else:
+        logger.warning(f"No customer data from API for user {user.telegram_id}")
+    
+    if not customer_id:
+        logger.warning(f"User {user.telegram_id} has no external_id, cannot fetch tickets")
+        return []
+    
+    if api_tickets is None:
+        logger.error(f"Failed to fetch tickets from API for customer {customer_id}")
         return []
     
-    # Get tickets from database
-    tickets = await get_user_tickets(session, user.id, draw_id)
-    return tickets
+    changed_tickets = []
+    if api_tickets:
+        try:
+            async with unit_of_work(session):
+                changed_tickets = await sync_user_tickets_from_api(
+                    session, user.id, customer_id, api_tickets, commit=False
+                )
+        except Exception as e:
+            logger.error(f"Error syncing tickets for user {user.telegram_id}: {e}", exc_info=True)
+            # Rollback expires the user, callers keep using it
+            async with unit_of_work(session):
+                await session.refresh(user)
+            return []
+    
+    if digest:
+        async with unit_of_work(session):
+            user.tickets_synced_at = now
+            user.tickets_payload_hash = digest
+    _sync_stats["applied"] += 1
+    
+    logger.info(f"Synced {len(api_tickets)} tickets for user {user.telegram_id}, {len(changed_tickets)} changed")
+    return changed_tickets
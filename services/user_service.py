@@ -3,6 +3,7 @@ import re
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.crud import get_user_by_telegram_id, create_user, get_user_phone
+from db.database import unit_of_work
 
 logger = logging.getLogger(__name__)
 
@@ -98,8 +99,10 @@ async def sync_user_data_from_api(
     
     logger.info(f"Starting user data sync for telegram_id: {telegram_id}")
     
-    # Get user from database
-    user = await get_user_by_telegram_id(session, telegram_id)
+    # Get user from database (connection released before the API call)
+    async with unit_of_work(session):
+        user = await get_user_by_telegram_id(session, telegram_id)
+    
     if not user:
         logger.warning(f"User not found in DB for telegram_id: {telegram_id}")
         return False